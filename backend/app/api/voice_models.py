@@ -283,7 +283,8 @@ async def download_model(
             logger.error(f"❌ No download URL available for model: {model.name}")
             raise HTTPException(status_code=400, detail="No download URL available for this model")
         
-        # Run download in background
+        # Run download in background; subscribers see it as downloading from now on
+        voice_model_manager.publish_download_status(model, "downloading")
         logger.info(f"🚀 Starting background download task for model: {model.name}")
         background_tasks.add_task(voice_model_manager.download_model, db, model_id)
         
@@ -28,6 +28,81 @@ class Settings:
     OUTPUT_DIR: str = "outputs"
     MODELS_DIR: str = "models"
     
+    # RVC Inference
+    # Inputs longer than 1.5x the segment length are split at quiet points and
+    # converted in parallel; set RVC_SEGMENT_SECONDS=0 to disable segmentation
+    RVC_SEGMENT_SECONDS: float = float(os.getenv("RVC_SEGMENT_SECONDS", "30"))
+    RVC_SEGMENT_OVERLAP_SECONDS: float = float(os.getenv("RVC_SEGMENT_OVERLAP_SECONDS", "0.5"))
+    RVC_SEGMENT_WORKERS: int = int(os.getenv("RVC_SEGMENT_WORKERS", "0"))  # 0 = auto
+    # First segment of streamed conversions (/api/process/stream), so playback can start early
+    RVC_STREAM_FIRST_SEGMENT_SECONDS: float = float(os.getenv("RVC_STREAM_FIRST_SEGMENT_SECONDS", "5"))
+    
+    # ContentVec ONNX exports (vec-256-layer-9.onnx for v1, vec-768-layer-12.onnx for v2)
+    CONTENTVEC_DIR: str = os.getenv("CONTENTVEC_DIR", "models/pretrained")
+    CONTENTVEC_THREADS: int = int(os.getenv("CONTENTVEC_THREADS", "0"))  # 0 = all cores
+    CONTENTVEC_WINDOW_SECONDS: float = float(os.getenv("CONTENTVEC_WINDOW_SECONDS", "10"))
+    CONTENTVEC_BATCH_SIZE: int = int(os.getenv("CONTENTVEC_BATCH_SIZE", "8"))
+    
+    # Index retrieval: blend ratio, neighbours per frame and IVF cells probed
+    RVC_INDEX_RATE: float = float(os.getenv("RVC_INDEX_RATE", "0.75"))
+    RVC_INDEX_K: int = int(os.getenv("RVC_INDEX_K", "8"))
+    RVC_INDEX_NPROBE: int = int(os.getenv("RVC_INDEX_NPROBE", "1"))
+    
+    # Micro-batching of concurrent conversions per model (max size 1 disables it)
+    RVC_BATCH_MAX_SIZE: int = int(os.getenv("RVC_BATCH_MAX_SIZE", "8"))
+    RVC_BATCH_WAIT_MS: float = float(os.getenv("RVC_BATCH_WAIT_MS", "10"))
+    RVC_BATCH_MAX_FRAMES: int = int(os.getenv("RVC_BATCH_MAX_FRAMES", "12000"))
+    
+    # On-disk cache of decoded audio, F0 and content features (0 MB disables it)
+    ANALYSIS_CACHE_DIR: str = os.getenv("ANALYSIS_CACHE_DIR", "cache/analysis")
+    ANALYSIS_CACHE_MB: int = int(os.getenv("ANALYSIS_CACHE_MB", "2048"))
+    
+    # Default F0 backend: yin (fast, NumPy), pm, dio, harvest or pyin (slow)
+    RVC_F0_METHOD: str = os.getenv("RVC_F0_METHOD", "yin")
+    
+    # Synthesizer execution: eager, script (TorchScript saved next to the .pth), compile,
+    # or int8 (CPU quantization of RVC_QUANT_MODULES, calibrated on RVC_QUANT_CALIBRATION_DIR)
+    RVC_INFERENCE_MODE: str = os.getenv("RVC_INFERENCE_MODE", "eager")
+    RVC_QUANT_MODULES: str = os.getenv("RVC_QUANT_MODULES", "enc_p,flow")
+    RVC_QUANT_CALIBRATION_DIR: str = os.getenv("RVC_QUANT_CALIBRATION_DIR", "samples/calibration")
+    
+    # Synthesizer backend: torch, or onnx (exported next to the .pth on first load, F0 models only)
+    RVC_BACKEND: str = os.getenv("RVC_BACKEND", "torch")
+    RVC_ONNX_THREADS: int = int(os.getenv("RVC_ONNX_THREADS", "0"))  # 0 = all cores
+    
+    # RAM budget for loaded voice models (LRU eviction of unpinned models, 0 = unlimited)
+    RVC_MODEL_CACHE_MB: int = int(os.getenv("RVC_MODEL_CACHE_MB", "4096"))
+    
+    # Inference executor: workers splitting the cores (0 = cores // 4), torch/FAISS threads per
+    # worker (0 = cores // workers), jobs allowed to wait, and jobs running per model at once
+    # (0 = RVC_BATCH_MAX_SIZE; micro-batches only form from jobs running together, so a lower
+    # limit also caps the batch size)
+    RVC_INFERENCE_WORKERS: int = int(os.getenv("RVC_INFERENCE_WORKERS", "0"))
+    RVC_INFERENCE_THREADS: int = int(os.getenv("RVC_INFERENCE_THREADS", "0"))
+    RVC_INFERENCE_QUEUE: int = int(os.getenv("RVC_INFERENCE_QUEUE", "32"))
+    RVC_MODEL_CONCURRENCY: int = int(os.getenv("RVC_MODEL_CONCURRENCY", "0"))
+    
+    # Scheduling: inputs up to RVC_INTERACTIVE_SECONDS (and live recordings) run ahead of batch jobs,
+    # RVC_INTERACTIVE_RESERVE queue places are kept for them, and batch jobs waiting longer than
+    # RVC_BATCH_PROMOTE_SECONDS are promoted; users share the workers round-robin within a class
+    RVC_INTERACTIVE_SECONDS: float = float(os.getenv("RVC_INTERACTIVE_SECONDS", "15"))
+    RVC_INTERACTIVE_RESERVE: int = int(os.getenv("RVC_INTERACTIVE_RESERVE", "8"))
+    RVC_BATCH_PROMOTE_SECONDS: float = float(os.getenv("RVC_BATCH_PROMOTE_SECONDS", "120"))
+    
+    # Startup warm-up: the voices named in RVC_WARMUP_MODELS and pinned at the last shutdown, plus up
+    # to RVC_WARMUP_COUNT from the saved hot set and the most recently used voices (0 = named only)
+    RVC_WARMUP_MODELS: str = os.getenv("RVC_WARMUP_MODELS", "")
+    RVC_WARMUP_COUNT: int = int(os.getenv("RVC_WARMUP_COUNT", "3"))
+    RVC_HOT_SET_FILE: str = os.getenv("RVC_HOT_SET_FILE", "cache/hot_models.json")
+    
+    # Live streaming conversion: block size, rolling feature context and block crossfade
+    RVC_STREAM_BLOCK_SECONDS: float = float(os.getenv("RVC_STREAM_BLOCK_SECONDS", "0.25"))
+    RVC_STREAM_CONTEXT_SECONDS: float = float(os.getenv("RVC_STREAM_CONTEXT_SECONDS", "1.0"))
+    RVC_STREAM_CROSSFADE_SECONDS: float = float(os.getenv("RVC_STREAM_CROSSFADE_SECONDS", "0.02"))
+    # Live conversion latency bound (WebSocket sessions, live audio and live recording):
+    # input waiting beyond this is dropped, oldest first
+    RVC_LIVE_MAX_BACKLOG_SECONDS: float = float(os.getenv("RVC_LIVE_MAX_BACKLOG_SECONDS", "1.0"))
+    
     # Voice Models API
     VOICE_MODELS_BASE_URL: str = "https://voice-models.com"
 
@@ -2,7 +2,7 @@ from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from fastapi import HTTPException, status, Depends
+from fastapi import HTTPException, Request, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from app.models.user import User
@@ -14,6 +14,7 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # JWT token scheme
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
@@ -70,6 +71,24 @@ def get_current_user(
     
     return user
 
+def get_request_owner(
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+) -> str:
+    """Who a request is for, for fair scheduling: the user of a valid token, else the client address"""
+    return connection_owner(
+        credentials.credentials if credentials is not None else None,
+        request.client.host if request.client else None
+    )
+
+def connection_owner(token: Optional[str], host: Optional[str]) -> str:
+    """Owner of a connection for fair scheduling, from its bearer token (if valid) or client address"""
+    if token:
+        payload = verify_token(token)
+        if payload and payload.get("sub") is not None:
+            return f"user:{payload['sub']}"
+    return f"ip:{host or 'unknown'}"
+
 def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
     """Authenticate a user with email and password"""
     user = db.query(User).filter(User.email == email).first()
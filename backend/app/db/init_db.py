@@ -3,6 +3,7 @@ from app.db.database import SessionLocal, engine
 from app.db.base import Base
 from app.models.user import User
 from app.models.voice_model import VoiceModel
+from app.models.job import ProcessingJob
 from app.core.security import get_password_hash
 import logging
 
@@ -1,10 +1,11 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks, Query, Depends
+from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks, Query, Depends, Request, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from datetime import timedelta
 import uvicorn
 import os
+import math
 import tempfile
 import shutil
 import uuid
@@ -15,11 +16,15 @@ import logging
 
 # Import our modules
 from app.core.config import settings
-from app.db.database import get_db
+from app.db.database import get_db, SessionLocal
 from app.db.init_db import init_database
 from app.api.auth import router as auth_router
-from app.api.voice_models import router as voice_models_router
+from app.api.voice_models import router as voice_models_router, voice_model_manager
+from app.models.voice_model import VoiceModel
+from app.core.security import get_request_owner, connection_owner
 from app.services.rvc_processor import RVCProcessor
+from app.services.rvc_infer.inference_executor import InferenceQueueFull, PRIORITY_INTERACTIVE
+from app.services.event_bus import event_bus, sse_stream
 from app.schemas.user import ProcessingRequest, ProcessingStatus
 
 # Configure logging
@@ -40,6 +45,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Task-Id", "Retry-After"],
 )
 
 # Include routers
@@ -56,6 +62,16 @@ except Exception as e:
 # Initialize RVC processor
 rvc_processor = RVCProcessor()
 
+@app.on_event("startup")
+async def warm_up_models():
+    """Restore the hot set of voices in the background"""
+    rvc_processor.start_warm_up()
+
+@app.on_event("shutdown")
+async def shutdown_processor():
+    """Remember the loaded voices for the next start and stop the inference workers"""
+    rvc_processor.shutdown()
+
 # File upload directories
 UPLOAD_DIR = Path(settings.UPLOAD_DIR)
 OUTPUT_DIR = Path(settings.OUTPUT_DIR)
@@ -133,37 +149,124 @@ async def upload_file(file: UploadFile = File(...)):
         logger.error(f"File upload error: {e}")
         raise HTTPException(status_code=500, detail="File upload failed")
 
+def queue_full_response(error: InferenceQueueFull) -> HTTPException:
+    """429 for a rejected job, with the scheduler's estimate of when a queue place opens"""
+    logger.warning(f"Rejecting job: {error}")
+    return HTTPException(
+        status_code=429,
+        detail="Server busy, try again shortly",
+        headers={"Retry-After": str(math.ceil(error.retry_after))}
+    )
+
 # Audio processing endpoint
 @app.post("/api/process")
 async def process_audio(
     filename: str,
     request: dict,
-    background_tasks: BackgroundTasks
+    background_tasks: BackgroundTasks,
+    owner: str = Depends(get_request_owner)
 ):
-    """Process audio file with RVC model"""
+    """Queue an audio file for conversion with an RVC model; poll /api/status/{task_id}"""
     try:
         input_path = UPLOAD_DIR / filename
         if not input_path.exists():
             raise HTTPException(status_code=404, detail="File not found")
+        priority = rvc_processor.admit(str(input_path))
+        
+        params = {
+            "model_name": request.get("model_name"),
+            "enhance_quality": request.get("enhance_quality", True),
+            "noise_reduction": request.get("noise_reduction", True),
+            "pitch_shift": request.get("pitch_shift", 0),
+            "f0_method": request.get("f0_method")
+        }
+        task_id = rvc_processor.create_job("convert", {"filename": filename, **params})
         
-        # Start processing
-        result = await rvc_processor.process_audio(
+        # Run the conversion after the response is sent
+        background_tasks.add_task(
+            rvc_processor.process_audio,
+            task_id=task_id,
             input_file_path=str(input_path),
-            model_name=request.get("model_name"),
-            enhance_quality=request.get("enhance_quality", True),
-            noise_reduction=request.get("noise_reduction", True),
-            pitch_shift=request.get("pitch_shift", 0)
+            priority=priority,
+            owner=owner,
+            **params
         )
         
-        return result
+        return {
+            "task_id": task_id,
+            "status": "queued",
+            "priority": priority,
+            "message": "Audio processing queued"
+        }
         
+    except HTTPException:
+        raise
+    except InferenceQueueFull as e:
+        raise queue_full_response(e)
     except Exception as e:
         logger.error(f"Audio processing error: {e}")
         raise HTTPException(status_code=500, detail="Audio processing failed")
 
+@app.get("/api/process/stream")
+async def process_audio_stream(
+    filename: str,
+    model_name: str,
+    pitch_shift: int = 0,
+    f0_method: Optional[str] = None,
+    owner: str = Depends(get_request_owner)
+):
+    """
+    Convert an uploaded file and stream the result as a WAV of open length
+    
+    Output is sent as each segment finishes, so an audio element pointed at
+    this URL starts playing after the first one. The conversion is also
+    saved as a regular job (X-Task-Id header) and finishes even if the
+    client disconnects. Only inputs admitted as interactive (up to
+    RVC_INTERACTIVE_SECONDS) are streamed, so the response never waits
+    behind batch work; if conversion fails after audio was sent the
+    response is aborted instead of ending cleanly.
+    """
+    input_path = UPLOAD_DIR / filename
+    if not input_path.exists():
+        raise HTTPException(status_code=404, detail="File not found")
+    try:
+        priority = rvc_processor.admit(str(input_path))
+    except InferenceQueueFull as e:
+        raise queue_full_response(e)
+    if priority != PRIORITY_INTERACTIVE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Only inputs up to {settings.RVC_INTERACTIVE_SECONDS:g}s can be streamed; "
+                   "use /api/process and /api/events for longer ones"
+        )
+    
+    params = {"model_name": model_name, "pitch_shift": pitch_shift, "f0_method": f0_method}
+    task_id = rvc_processor.create_job("convert", {"filename": filename, "streamed": True, **params})
+    stream = rvc_processor.stream_audio(
+        task_id, str(input_path), priority=priority, owner=owner, **params
+    )
+    
+    # Wait for the header (sent with the first output) so failures still get a proper status
+    try:
+        header = await stream.__anext__()
+    except StopAsyncIteration:
+        status = rvc_processor.get_processing_status(task_id) or {}
+        raise HTTPException(status_code=500, detail=status.get("error") or "Audio processing failed")
+    
+    async def body():
+        yield header
+        async for chunk in stream:
+            yield chunk
+    
+    return StreamingResponse(body(), media_type="audio/wav", headers={"X-Task-Id": task_id})
+
 # Text-to-Speech endpoint
 @app.post("/api/text-to-speech")
-async def process_text_to_speech(request: dict, background_tasks: BackgroundTasks):
+async def process_text_to_speech(
+    request: dict,
+    background_tasks: BackgroundTasks,
+    owner: str = Depends(get_request_owner)
+):
     """Convert text to speech using selected voice model"""
     try:
         text = request.get("text", "")
@@ -174,8 +277,15 @@ async def process_text_to_speech(request: dict, background_tasks: BackgroundTask
         if not text or not model_name:
             raise HTTPException(status_code=400, detail="Text and model_name are required")
         
-        # Generate task ID
-        task_id = str(uuid.uuid4())
+        # Speech is generated on demand, so it is admitted as interactive work
+        rvc_processor.admit(priority=PRIORITY_INTERACTIVE)
+        
+        # Register the job
+        task_id = rvc_processor.create_job("tts", {
+            "model_name": model_name,
+            "tts_engine": request.get("tts_engine", "pyttsx3"),
+            "language": request.get("language", "en")
+        })
         
         # Start TTS processing in background
         background_tasks.add_task(
@@ -186,16 +296,21 @@ async def process_text_to_speech(request: dict, background_tasks: BackgroundTask
             enhance_quality=enhance_quality,
             noise_reduction=noise_reduction,
             tts_engine=request.get("tts_engine", "pyttsx3"),
-            language=request.get("language", "en")
+            language=request.get("language", "en"),
+            owner=owner
         )
         
         # Return task ID immediately
         return {
             "task_id": task_id,
-            "status": "processing",
+            "status": "queued",
             "message": "TTS processing started"
         }
         
+    except HTTPException:
+        raise
+    except InferenceQueueFull as e:
+        raise queue_full_response(e)
     except Exception as e:
         logger.error(f"Text-to-speech processing error: {e}")
         raise HTTPException(status_code=500, detail="Text-to-speech processing failed")
@@ -238,6 +353,53 @@ async def get_live_audio_status():
         logger.error(f"Live audio status error: {e}")
         raise HTTPException(status_code=500, detail="Failed to get live audio status")
 
+@app.websocket("/ws/live-convert")
+async def live_convert(
+    websocket: WebSocket,
+    model_name: str,
+    sample_rate: int = 48000,
+    format: str = "f32",
+    pitch_shift: int = 0,
+    f0_method: Optional[str] = None,
+    token: Optional[str] = None
+):
+    """
+    Live voice conversion of binary PCM frames from the browser
+    
+    Send mono `format` (f32 or s16, little-endian) PCM at `sample_rate` as
+    binary frames; converted audio comes back on the same socket as binary
+    frames with a sequence/timing header (see LiveConversionSession). The
+    optional `token` identifies the user for fair scheduling.
+    """
+    await websocket.accept()
+    owner = connection_owner(token, websocket.client.host if websocket.client else None)
+    if not 8000 <= sample_rate <= 192000:
+        await websocket.send_json({"type": "error", "message": "sample_rate must be between 8000 and 192000"})
+        await websocket.close(code=1008)
+        return
+    try:
+        session = await rvc_processor.open_live_session(
+            model_name, sample_rate, fmt=format, pitch_shift=pitch_shift, f0_method=f0_method, owner=owner
+        )
+    except InferenceQueueFull as e:
+        await websocket.send_json({"type": "busy", "retry_after": e.retry_after})
+        await websocket.close(code=1013)
+        return
+    except ValueError as e:
+        await websocket.send_json({"type": "error", "message": str(e)})
+        await websocket.close(code=1008)
+        return
+    except Exception as e:
+        logger.error(f"Live conversion setup error: {e}")
+        await websocket.send_json({"type": "error", "message": "Failed to start live conversion"})
+        await websocket.close(code=1011)
+        return
+    
+    try:
+        await session.run(websocket)
+    finally:
+        rvc_processor.close_live_session(session)
+
 # TTS Engine endpoints
 @app.get("/api/tts/voices")
 async def get_tts_voices():
@@ -251,17 +413,61 @@ async def get_tts_voices():
         raise HTTPException(status_code=500, detail="Failed to get TTS voices")
 
 # RVC Model endpoints
+@app.get("/api/rvc/executor")
+async def get_executor_stats():
+    """Inference workers, queue depth and running jobs per model"""
+    try:
+        return rvc_processor.get_executor_stats()
+        
+    except Exception as e:
+        logger.error(f"Executor stats error: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get executor stats")
+
 @app.get("/api/rvc/models/loaded")
 async def get_loaded_rvc_models():
-    """Get list of loaded RVC models"""
+    """Get loaded RVC models with footprint, pin state and the memory budget"""
     try:
-        models = rvc_processor.get_loaded_models()
-        return {"loaded_models": models}
+        loaded = rvc_processor.get_loaded_models()
+        return {"loaded_models": loaded["models"], "total_mb": loaded["total_mb"], "budget_mb": loaded["budget_mb"]}
         
     except Exception as e:
         logger.error(f"Loaded models error: {e}")
         raise HTTPException(status_code=500, detail="Failed to get loaded models")
 
+@app.post("/api/rvc/models/pin")
+async def pin_rvc_model(request: dict, owner: str = Depends(get_request_owner)):
+    """Keep a voice loaded regardless of the model memory budget"""
+    try:
+        model_name = request.get("model_name", "")
+        if not model_name:
+            raise HTTPException(status_code=400, detail="model_name is required")
+        
+        return await rvc_processor.pin_model(model_name, pinned=True, owner=owner)
+        
+    except HTTPException:
+        raise
+    except InferenceQueueFull as e:
+        raise queue_full_response(e)
+    except Exception as e:
+        logger.error(f"Pin model error: {e}")
+        raise HTTPException(status_code=500, detail="Failed to pin model")
+
+@app.post("/api/rvc/models/unpin")
+async def unpin_rvc_model(request: dict):
+    """Let a pinned voice be evicted again"""
+    try:
+        model_name = request.get("model_name", "")
+        if not model_name:
+            raise HTTPException(status_code=400, detail="model_name is required")
+        
+        return await rvc_processor.pin_model(model_name, pinned=False)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Unpin model error: {e}")
+        raise HTTPException(status_code=500, detail="Failed to unpin model")
+
 # Microphone endpoints
 @app.get("/api/microphone/devices")
 async def get_microphone_devices():
@@ -390,11 +596,62 @@ async def get_processing_status(task_id: str):
     """Get processing status for a task"""
     try:
         status = rvc_processor.get_processing_status(task_id)
-        return status
-        
     except Exception as e:
         logger.error(f"Status check error: {e}")
         raise HTTPException(status_code=500, detail="Failed to get processing status")
+    
+    if status is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return status
+
+# Result by task id
+@app.get("/api/result/{task_id}")
+async def get_task_result(task_id: str):
+    """Download the output of a finished task"""
+    result_path = rvc_processor.get_result_path(task_id)
+    if result_path is None or not result_path.exists():
+        raise HTTPException(status_code=404, detail="Result not available")
+    return FileResponse(path=str(result_path), filename=result_path.name, media_type="audio/wav")
+
+# Progress events endpoint
+MAX_EVENT_TOPICS = 100
+
+def event_snapshot(topic: str) -> Optional[dict]:
+    """Current state of a task or download the event bus no longer holds"""
+    kind, key = topic.split(":", 1)
+    if kind == "task":
+        return rvc_processor.get_processing_status(key)
+    db = SessionLocal()
+    try:
+        model = db.query(VoiceModel).filter(VoiceModel.id == int(key)).first()
+        return voice_model_manager.download_status(model) if model else None
+    finally:
+        db.close()
+
+@app.get("/api/events")
+async def stream_events(request: Request, tasks: str = "", downloads: str = ""):
+    """
+    Server-Sent Events with the progress of conversion/TTS tasks and model downloads
+    
+    `tasks` and `downloads` are comma-separated task and model ids; every id
+    first gets its current state, then each change, and the stream ends with
+    an `end` event once all of them are done or failed.
+    """
+    task_ids = [t for t in tasks.split(",") if t]
+    download_ids = [d for d in downloads.split(",") if d]
+    if not task_ids and not download_ids:
+        raise HTTPException(status_code=400, detail="No tasks or downloads given")
+    if len(task_ids) + len(download_ids) > MAX_EVENT_TOPICS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_EVENT_TOPICS} ids per stream")
+    if not all(d.isdigit() for d in download_ids):
+        raise HTTPException(status_code=400, detail="Download ids must be model ids")
+    
+    topics = [f"task:{t}" for t in task_ids] + [f"download:{d}" for d in download_ids]
+    return StreamingResponse(
+        sse_stream(event_bus, topics, event_snapshot, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 # Download result endpoint
 @app.get("/api/download/{filename}")
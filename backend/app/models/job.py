@@ -0,0 +1,30 @@
+from sqlalchemy import Column, String, Text, DateTime, Float
+from datetime import datetime
+from app.db.base import Base
+
+class ProcessingJob(Base):
+    __tablename__ = "processing_jobs"
+
+    id = Column(String(36), primary_key=True, index=True)  # task id (uuid4)
+    kind = Column(String(20), nullable=False)  # convert, tts
+    state = Column(String(20), nullable=False, default="queued", index=True)  # queued, running, done, failed
+
+    # Progress
+    stage = Column(String(50))  # current stage, e.g. "converting"
+    stage_progress = Column(Float, default=0.0)  # 0.0 to 1.0 within the stage
+    progress = Column(Float, default=0.0)  # 0.0 to 1.0 overall
+    message = Column(Text)
+
+    # Request and result
+    params = Column(Text)  # JSON string of the request parameters
+    result_file = Column(String(500))  # Output filename in OUTPUT_DIR
+    error = Column(Text)  # Error message if the job failed
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
+    def __repr__(self):
+        return f"<ProcessingJob(id='{self.id}', kind='{self.kind}', state='{self.state}')>"
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+
+import json
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+# Event statuses after which a topic publishes nothing more
+TERMINAL_STATUSES = ("done", "failed")
+
+
+class Subscription:
+    """
+    Events of a set of topics, delivered to one asyncio consumer
+
+    Events carry full state, so undelivered events are coalesced per topic:
+    a slow consumer gets the newest state of each topic and never more than
+    one pending event per topic.
+    """
+
+    def __init__(self, bus: "EventBus", topics: Iterable[str], loop: asyncio.AbstractEventLoop):
+        self.bus = bus
+        self.topics = list(dict.fromkeys(topics))
+        self._loop = loop
+        self._pending: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._ready = asyncio.Event()
+
+    def put(self, topic: str, event: Dict[str, Any]):
+        """Deliver an event; callable from any thread"""
+        try:
+            self._loop.call_soon_threadsafe(self._offer, topic, event)
+        except RuntimeError:
+            pass  # the consumer's loop is closed
+
+    def _offer(self, topic: str, event: Dict[str, Any]):
+        self._pending[topic] = event
+        self._pending.move_to_end(topic)
+        self._ready.set()
+
+    async def get(self, timeout: float) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Next (topic, event), or None after `timeout` seconds without one"""
+        if not self._pending:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        item = self._pending.popitem(last=False)
+        if not self._pending:
+            self._ready.clear()
+        return item
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+
+class EventBus:
+    """
+    In-process publish/subscribe for job and download progress
+
+    Publishers (the job store from inference worker threads, the model
+    downloader on the event loop) post full-state events on topics such as
+    "task:<id>" and "download:<model id>". The latest event of the most
+    recent `max_topics` topics is kept, so a new subscriber starts from the
+    current state without a database read.
+    """
+
+    def __init__(self, max_topics: int = 4096):
+        self.max_topics = max_topics
+        self._lock = threading.Lock()
+        self._latest: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+
+    def publish(self, topic: str, event: Dict[str, Any]):
+        """Post an event to every subscriber of `topic`; thread-safe"""
+        with self._lock:
+            self._latest[topic] = event
+            self._latest.move_to_end(topic)
+            while len(self._latest) > self.max_topics:
+                self._latest.popitem(last=False)
+            subscribers = list(self._subscribers.get(topic, ()))
+        for subscription in subscribers:
+            subscription.put(topic, event)
+
+    def latest(self, topic: str) -> Optional[Dict[str, Any]]:
+        """Last event published on `topic`, if still kept"""
+        with self._lock:
+            return self._latest.get(topic)
+
+    def subscribe(self, topics: Iterable[str]) -> Subscription:
+        """Subscribe the running event loop to `topics`"""
+        subscription = Subscription(self, topics, asyncio.get_running_loop())
+        with self._lock:
+            for topic in subscription.topics:
+                self._subscribers.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            for topic in subscription.topics:
+                subscribers = self._subscribers.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[topic]
+
+
+def format_sse(event: str, data: Dict[str, Any], event_id: Optional[int] = None) -> str:
+    """One Server-Sent Events message"""
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def sse_stream(
+    bus: EventBus,
+    topics: List[str],
+    snapshot: Callable[[str], Optional[Dict[str, Any]]],
+    is_disconnected: Callable[[], Any],
+    heartbeat: float = 15.0
+) -> AsyncIterator[str]:
+    """
+    Server-Sent Events for `topics` on one connection
+
+    Starts with the current state of every topic (from the bus, else from
+    `snapshot(topic)`, which runs in the thread pool as it may query the
+    database; unknown topics get a `missing` event), then streams
+    each published event as `event: <topic kind>`. A comment is sent every
+    `heartbeat` seconds to keep proxies from closing the connection, and
+    the stream ends with `event: end` once every topic is done or failed.
+    """
+    subscription = bus.subscribe(topics)
+    event_id = 0
+    pending = set(subscription.topics)
+    try:
+        for topic in subscription.topics:
+            state = bus.latest(topic) or await run_in_threadpool(snapshot, topic)
+            if state is None:
+                pending.discard(topic)
+                yield format_sse("missing", {"topic": topic})
+                continue
+            event_id += 1
+            yield format_sse(topic.split(":", 1)[0], {"topic": topic, **state}, event_id)
+            if state.get("status") in TERMINAL_STATUSES:
+                pending.discard(topic)
+
+        while pending:
+            item = await subscription.get(heartbeat)
+            if await is_disconnected():
+                return
+            if item is None:
+                yield ": keep-alive\n\n"
+                continue
+            topic, state = item
+            event_id += 1
+            yield format_sse(topic.split(":", 1)[0], {"topic": topic, **state}, event_id)
+            if state.get("status") in TERMINAL_STATUSES:
+                pending.discard(topic)
+
+        yield format_sse("end", {})
+    finally:
+        subscription.close()
+
+
+# Process-wide bus shared by the job store, the downloader and the SSE endpoint
+event_bus = EventBus()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+
+import json
+import uuid
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from app.db.database import SessionLocal
+from app.models.job import ProcessingJob
+from app.services.event_bus import EventBus, event_bus
+
+logger = logging.getLogger(__name__)
+
+JOB_STATES = ("queued", "running", "done", "failed")
+
+# Stages of each job kind in order, with their share of the overall progress
+JOB_STAGES: Dict[str, Tuple[Tuple[str, float], ...]] = {
+    "convert": (("loading_model", 0.10), ("decoding", 0.05), ("converting", 0.80), ("saving", 0.05)),
+    "tts": (
+        ("synthesizing_speech", 0.20), ("loading_model", 0.05), ("decoding", 0.05),
+        ("converting", 0.65), ("saving", 0.05)
+    ),
+}
+
+STAGE_MESSAGES = {
+    "synthesizing_speech": "Generating speech from text...",
+    "loading_model": "Loading voice model...",
+    "decoding": "Decoding audio...",
+    "converting": "Applying voice cloning...",
+    "saving": "Saving result...",
+}
+
+
+def overall_progress(kind: str, stage: str, fraction: float) -> float:
+    """Overall progress (0.0 to 1.0) of a job of `kind` that is `fraction` through `stage`"""
+    done = 0.0
+    for name, weight in JOB_STAGES.get(kind, ()):
+        if name == stage:
+            return min(done + weight * max(0.0, min(fraction, 1.0)), 1.0)
+        done += weight
+    return 0.0
+
+
+class JobStore:
+    """
+    Processing jobs persisted in the application database
+
+    A job is created `queued`, becomes `running` on its first stage update
+    and ends `done` (with a result file in OUTPUT_DIR) or `failed`. Every
+    call uses its own short session, so stage updates may come from the
+    inference worker threads. Each change is also published on the event
+    bus as topic "task:<id>" with the job's status.
+    """
+
+    def __init__(self, session_factory=SessionLocal, bus: EventBus = event_bus):
+        self._session_factory = session_factory
+        self._bus = bus
+
+    def create(self, kind: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Add a queued job and return its id"""
+        job_id = str(uuid.uuid4())
+        db = self._session_factory()
+        try:
+            job = ProcessingJob(
+                id=job_id,
+                kind=kind,
+                state="queued",
+                progress=0.0,
+                message="Waiting for a worker...",
+                params=json.dumps(params or {})
+            )
+            db.add(job)
+            db.flush()
+            status = self._to_status(job)
+            db.commit()
+        finally:
+            db.close()
+        self._bus.publish(f"task:{job_id}", status)
+        return job_id
+
+    def update(self, job_id: str, stage: str, fraction: float = 0.0, message: Optional[str] = None):
+        """Record that a job is `fraction` through `stage`; the first update marks it running"""
+        try:
+            self._modify(job_id, lambda job: self._set_stage(job, stage, fraction, message))
+        except Exception as e:
+            # Progress is advisory; never fail a conversion over it
+            logger.warning(f"Failed to update job {job_id}: {e}")
+
+    def finish(self, job_id: str, result_file: str, message: str = "Processing completed successfully"):
+        """Mark a job done with its output filename"""
+        def apply(job: ProcessingJob):
+            job.state = "done"
+            job.stage = None
+            job.stage_progress = 1.0
+            job.progress = 1.0
+            job.result_file = result_file
+            job.message = message
+            job.finished_at = datetime.utcnow()
+
+        self._modify(job_id, apply)
+
+    def fail(self, job_id: str, error: str):
+        """Mark a job failed, keeping the stage it failed in"""
+        def apply(job: ProcessingJob):
+            job.state = "failed"
+            job.error = error
+            job.message = f"Processing failed: {error}"
+            job.finished_at = datetime.utcnow()
+
+        self._modify(job_id, apply)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Status of a job, or None if there is no such job; recent jobs are served from the event bus"""
+        status = self._bus.latest(f"task:{job_id}")
+        if status is not None:
+            return status
+        db = self._session_factory()
+        try:
+            job = db.query(ProcessingJob).filter(ProcessingJob.id == job_id).first()
+            return self._to_status(job) if job else None
+        finally:
+            db.close()
+
+    def fail_interrupted(self) -> int:
+        """Fail the jobs a previous run left queued or running; returns how many"""
+        db = self._session_factory()
+        try:
+            jobs = db.query(ProcessingJob).filter(ProcessingJob.state.in_(("queued", "running"))).all()
+            for job in jobs:
+                job.state = "failed"
+                job.error = "Interrupted by a server restart"
+                job.message = "Processing failed: interrupted by a server restart"
+                job.finished_at = datetime.utcnow()
+            db.flush()
+            statuses = [self._to_status(job) for job in jobs]
+            db.commit()
+            for status in statuses:
+                self._bus.publish(f"task:{status['task_id']}", status)
+            if jobs:
+                logger.info(f"Marked {len(jobs)} interrupted jobs as failed")
+            return len(jobs)
+        except Exception as e:
+            logger.warning(f"Failed to recover interrupted jobs: {e}")
+            db.rollback()
+            return 0
+        finally:
+            db.close()
+
+    def _modify(self, job_id: str, apply):
+        db = self._session_factory()
+        try:
+            job = db.query(ProcessingJob).filter(ProcessingJob.id == job_id).first()
+            if job is None:
+                raise KeyError(f"Unknown job: {job_id}")
+            apply(job)
+            db.flush()
+            status = self._to_status(job)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        self._bus.publish(f"task:{job_id}", status)
+
+    @staticmethod
+    def _set_stage(job: ProcessingJob, stage: str, fraction: float, message: Optional[str]):
+        if job.state == "queued":
+            job.state = "running"
+            job.started_at = datetime.utcnow()
+        job.stage = stage
+        job.stage_progress = max(0.0, min(fraction, 1.0))
+        job.progress = max(job.progress or 0.0, overall_progress(job.kind, stage, fraction))
+        job.message = message or STAGE_MESSAGES.get(stage, stage)
+
+    @staticmethod
+    def _to_status(job: ProcessingJob) -> Dict[str, Any]:
+        return {
+            "task_id": job.id,
+            "kind": job.kind,
+            "status": job.state,
+            "stage": job.stage,
+            "stage_progress": round((job.stage_progress or 0.0) * 100),
+            "progress": round((job.progress or 0.0) * 100),
+            "message": job.message,
+            "result_file": job.result_file,
+            "error": job.error,
+            "created_at": job.created_at.isoformat() if job.created_at else None,
+            "updated_at": job.updated_at.isoformat() if job.updated_at else None,
+            "started_at": job.started_at.isoformat() if job.started_at else None,
+            "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        }
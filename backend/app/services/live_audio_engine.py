@@ -1,8 +1,8 @@
 import asyncio
 import logging
 import threading
-import queue
 import time
+import struct
 import numpy as np
 import soundfile as sf
 import torch
@@ -11,20 +11,43 @@ import json
 from pathlib import Path
 import tempfile
 import io
+from collections import deque
+
+from app.core.config import settings
+from .rvc_infer.inference_executor import InferenceQueueFull, PRIORITY_INTERACTIVE
+from .rvc_infer.streaming import pcm16_bytes
+from .rvc_infer.infer_pack.F0Predictor import F0_PREDICTORS
+from .rvc_infer.ring_buffer import SampleRingBuffer
 
 logger = logging.getLogger(__name__)
 
+# Sample formats of binary live-conversion frames (mono, little-endian)
+PCM_FORMATS = {"f32": np.dtype("<f4"), "s16": np.dtype("<i2")}
+
+# Header of each converted frame: sequence number, sequence number of the last
+# input frame it includes, server send time (unix seconds), milliseconds the
+# input waited for a worker, milliseconds the conversion took
+OUTPUT_FRAME_HEADER = struct.Struct("<IIdff")
+
+# Control messages a live-conversion client may have waiting at once; more are ignored
+MAX_PENDING_CONTROLS = 16
+
 class LiveAudioProcessor:
     """Real-time audio processing for live voice cloning"""
     
-    def __init__(self, rvc_engine, sample_rate: int = 44100, chunk_size: int = 1024):
+    def __init__(self, rvc_engine, sample_rate: int = 44100, chunk_size: int = 1024, max_latency_seconds: float = 1.0):
         self.rvc_engine = rvc_engine
         self.sample_rate = sample_rate
         self.chunk_size = chunk_size
+        self.max_latency_seconds = max_latency_seconds
         self.is_processing = False
         self.current_model = None
-        self.audio_buffer = queue.Queue()
-        self.output_buffer = queue.Queue()
+        self.converter = None
+        self.output_sample_rate = sample_rate
+        # Input and converted samples; rings hold twice the latency bound so writers never wait on readers
+        self.audio_buffer = self._ring(sample_rate)
+        self.output_buffer = self._ring(sample_rate)
+        self.dropped_samples = 0
         self.processing_thread = None
         self.websocket_clients = set()
         
@@ -34,6 +57,10 @@ class LiveAudioProcessor:
         """Set the RVC model for live processing"""
         try:
             self.current_model = self.rvc_engine.load_rvc_model(model_path, index_path)
+            self.converter = self.rvc_engine.create_streaming_converter(
+                model_path, index_path, input_sr=self.sample_rate
+            )
+            self.output_sample_rate = self.converter.sample_rate
             logger.info(f"Live processing model set: {model_path}")
         except Exception as e:
             logger.error(f"Failed to set live processing model: {e}")
@@ -48,6 +75,9 @@ class LiveAudioProcessor:
         if not self.current_model:
             raise ValueError("No model set for live processing")
         
+        self.audio_buffer = self._ring(self.sample_rate)
+        self.output_buffer = self._ring(self.output_sample_rate)
+        self.dropped_samples = 0
         self.is_processing = True
         self.processing_thread = threading.Thread(target=self._processing_loop)
         self.processing_thread.daemon = True
@@ -58,106 +88,266 @@ class LiveAudioProcessor:
     def stop_processing(self):
         """Stop live audio processing"""
         self.is_processing = False
+        self.audio_buffer.close()
         if self.processing_thread:
             self.processing_thread.join(timeout=2.0)
         
         # Clear buffers
-        while not self.audio_buffer.empty():
-            self.audio_buffer.get()
-        while not self.output_buffer.empty():
-            self.output_buffer.get()
+        self.audio_buffer.clear()
+        self.output_buffer.clear()
+        if self.converter:
+            self.converter.reset()
         
         logger.info("Live audio processing stopped")
     
     def add_audio_chunk(self, audio_data: np.ndarray):
-        """Add audio chunk for processing"""
+        """Add audio chunk for processing (from a single producer thread)"""
         if self.is_processing:
-            self.audio_buffer.put(audio_data)
+            self.audio_buffer.write(audio_data)
     
-    def get_processed_chunk(self) -> Optional[np.ndarray]:
-        """Get processed audio chunk"""
-        try:
-            return self.output_buffer.get_nowait()
-        except queue.Empty:
+    def get_processed_chunk(self, out: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """
+        Get processed audio chunk (chunk_size samples at output_sample_rate)
+        
+        Pass a preallocated float32 `out` of chunk_size samples to avoid an
+        allocation per chunk. Output the reader fell more than
+        `max_latency_seconds` behind on is skipped.
+        """
+        self.dropped_samples += self.output_buffer.discard_oldest(
+            int(self.max_latency_seconds * self.output_sample_rate)
+        )
+        if len(self.output_buffer) < self.chunk_size:
             return None
+        if out is None:
+            out = np.empty(self.chunk_size, dtype=np.float32)
+        self.output_buffer.read_into(out[:self.chunk_size])
+        return out
     
     def _processing_loop(self):
         """Main processing loop for live audio"""
-        audio_chunks = []
-        buffer_size = self.chunk_size * 4  # Buffer for smoother processing
+        # One converter block at a time, read into the same array
+        block = np.empty(self.converter.block_samples, dtype=np.float32)
+        max_backlog = max(int(self.max_latency_seconds * self.sample_rate), len(block))
         
         while self.is_processing:
+            if not self.audio_buffer.wait(len(block), timeout=0.1):
+                continue
+            
             try:
-                # Collect audio chunks
-                while len(audio_chunks) < buffer_size and not self.audio_buffer.empty():
-                    chunk = self.audio_buffer.get(timeout=0.1)
-                    audio_chunks.append(chunk)
+                # Fell behind: skip to the newest input so latency stays bounded
+                self.dropped_samples += self.audio_buffer.discard_oldest(max_backlog)
+                self.audio_buffer.read_into(block)
                 
-                # Process when we have enough data
-                if len(audio_chunks) >= buffer_size:
-                    # Combine chunks
-                    combined_audio = np.concatenate(audio_chunks)
-                    
-                    # Process with RVC
-                    processed_audio = self._process_chunk(combined_audio)
-                    
-                    # Split back into chunks and add to output buffer
-                    chunk_size = self.chunk_size
-                    for i in range(0, len(processed_audio), chunk_size):
-                        chunk = processed_audio[i:i + chunk_size]
-                        if len(chunk) == chunk_size:  # Only add complete chunks
-                            self.output_buffer.put(chunk)
-                    
-                    # Keep some overlap for smoother processing
-                    overlap_size = self.chunk_size // 2
-                    audio_chunks = audio_chunks[-overlap_size:] if overlap_size < len(audio_chunks) else []
+                # The converter only synthesizes the frames of each new block
+                self.output_buffer.write(self.converter.push(block))
                 
-                time.sleep(0.01)  # Small delay to prevent busy waiting
-                
-            except queue.Empty:
-                continue
             except Exception as e:
                 logger.error(f"Error in processing loop: {e}")
                 time.sleep(0.1)
     
-    def _process_chunk(self, audio_chunk: np.ndarray) -> np.ndarray:
-        """Process a single audio chunk with RVC"""
+    def _ring(self, sample_rate: int) -> SampleRingBuffer:
+        block = self.converter.block_samples if self.converter else 0
+        return SampleRingBuffer(max(int(2 * self.max_latency_seconds * sample_rate), 2 * max(self.chunk_size, block)))
+
+class LiveConversionSession:
+    """
+    Live conversion for one WebSocket connection
+
+    The client sends mono PCM at `input_sr` as binary frames of any size in
+    `fmt` (see PCM_FORMATS). The session's own StreamingConverter converts
+    them on the inference executor as interactive work, and each non-empty
+    output goes back as one binary frame: OUTPUT_FRAME_HEADER followed by
+    PCM in the same format at the model's sample rate. Frames arriving
+    during a conversion are converted together next; as soon as more than
+    `max_backlog_seconds` of input is waiting the oldest is dropped, so the
+    delay and the memory held stay bounded when conversion cannot keep up.
+    A single frame longer than that closes the connection (code 1009).
+
+    Text frames are JSON control messages: {"type": "flush"} converts the
+    held-back tail (e.g. at the end of an utterance) and {"type": "reset"}
+    drops all context. The server sends {"type": "ready", ...} first and
+    {"type": "busy", "retry_after": ...} for input it had to drop because
+    the inference queue was full.
+    """
+
+    def __init__(
+        self,
+        rvc_engine,
+        converter,
+        model_key: str,
+        fmt: str = "f32",
+        owner: Optional[str] = None,
+        max_backlog_seconds: float = 1.0
+    ):
+        if fmt not in PCM_FORMATS:
+            raise ValueError(f"Unknown PCM format: {fmt} (available: {', '.join(PCM_FORMATS)})")
+        self.rvc_engine = rvc_engine
+        self.converter = converter
+        self.model_key = model_key
+        self.fmt = fmt
+        self.dtype = PCM_FORMATS[fmt]
+        self.owner = owner
+        self.input_sr = converter.input_sr
+        self.max_backlog = int(max_backlog_seconds * self.input_sr)
+
+        self.sequence = 0
+        self.input_sequence = 0
+        self.dropped_samples = 0
+        # (kind, samples, received at, input sequence); None once the client is gone
+        self._inbox: deque = deque()
+        self._inbox_ready = asyncio.Event()
+        self._queued_samples = 0
+        self._queued_controls = 0
+
+    def decode(self, payload: bytes) -> np.ndarray:
+        """Samples of a binary input frame as float32 in [-1, 1]"""
+        usable = len(payload) - len(payload) % self.dtype.itemsize
+        samples = np.frombuffer(payload, dtype=self.dtype, count=usable // self.dtype.itemsize)
+        if self.dtype.kind == "i":
+            return samples.astype(np.float32) / 32768.0
+        return samples.astype(np.float32, copy=False)
+
+    def encode(self, samples: np.ndarray, input_sequence: int, queue_ms: float, convert_ms: float) -> bytes:
+        """Binary output frame for converted samples"""
+        header = OUTPUT_FRAME_HEADER.pack(self.sequence, input_sequence, time.time(), queue_ms, convert_ms)
+        self.sequence += 1
+        if self.dtype.kind == "i":
+            return header + pcm16_bytes(samples)
+        return header + np.asarray(samples, dtype=self.dtype).tobytes()
+
+    async def run(self, websocket):
+        """Serve the connection until the client disconnects"""
+        await websocket.send_json({
+            "type": "ready",
+            "format": self.fmt,
+            "input_sample_rate": self.input_sr,
+            "sample_rate": self.converter.sample_rate,
+            "block_samples": self.converter.block_samples,
+            "header_bytes": OUTPUT_FRAME_HEADER.size,
+        })
+        receiver = asyncio.create_task(self._receive(websocket))
         try:
-            # Preprocess
-            audio_chunk = self.rvc_engine.preprocess_audio(audio_chunk, self.sample_rate)
-            
-            # Convert to tensor
-            audio_tensor = torch.from_numpy(audio_chunk).float().unsqueeze(0)
-            
-            # Process with RVC model
-            with torch.no_grad():
-                audio_tensor = audio_tensor.to(self.rvc_engine.device)
-                
-                if hasattr(self.current_model.model, 'forward'):
-                    processed_tensor = self.current_model.model(audio_tensor)
-                else:
-                    processed_tensor = audio_tensor
-                
-                processed_audio = processed_tensor.squeeze(0).cpu().numpy()
-            
-            # Postprocess
-            processed_audio = self.rvc_engine.postprocess_audio(processed_audio, self.sample_rate)
-            
-            return processed_audio
-            
+            while True:
+                await self._inbox_ready.wait()
+                self._inbox_ready.clear()
+                batch = list(self._inbox)
+                self._inbox.clear()
+                self._queued_samples = self._queued_controls = 0
+                if not await self._handle(websocket, batch):
+                    return
         except Exception as e:
-            logger.error(f"Chunk processing failed: {e}")
-            return audio_chunk  # Return original if processing fails
+            # Sending to a closed socket ends the session like a disconnect
+            logger.info(f"Live conversion session ended: {e}")
+        finally:
+            receiver.cancel()
+
+    async def _receive(self, websocket):
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                if message.get("bytes") is not None:
+                    if len(message["bytes"]) > self.max_backlog * self.dtype.itemsize:
+                        await websocket.send_json({
+                            "type": "error",
+                            "message": f"Frames may hold at most {self.max_backlog} samples"
+                        })
+                        await websocket.close(code=1009)
+                        break
+                    self.input_sequence += 1
+                    samples = self.decode(message["bytes"])
+                    self._put(("audio", samples, time.perf_counter(), self.input_sequence))
+                elif message.get("text") is not None and len(message["text"]) <= 1024:
+                    try:
+                        kind = json.loads(message["text"]).get("type")
+                    except (ValueError, AttributeError):
+                        kind = None
+                    if kind in ("flush", "reset") and self._queued_controls < MAX_PENDING_CONTROLS:
+                        self._queued_controls += 1
+                        self._put((kind, None, time.perf_counter(), self.input_sequence))
+        finally:
+            self._put(None)
+
+    def _put(self, item):
+        """Queue a message for the converter, dropping the oldest input beyond the backlog"""
+        self._inbox.append(item)
+        if item is not None and item[0] == "audio":
+            self._queued_samples += len(item[1])
+            excess = self._queued_samples - self.max_backlog
+            # Oldest audio goes first; control messages keep their place in front of what is left
+            controls = []
+            while excess > 0:
+                queued = self._inbox.popleft()
+                if queued[0] != "audio":
+                    controls.append(queued)
+                    continue
+                drop = min(excess, len(queued[1]))
+                self._queued_samples -= drop
+                self.dropped_samples += drop
+                excess -= drop
+                if drop < len(queued[1]):
+                    self._inbox.appendleft((queued[0], queued[1][drop:], queued[2], queued[3]))
+            self._inbox.extendleft(reversed(controls))
+        self._inbox_ready.set()
+
+    async def _handle(self, websocket, batch) -> bool:
+        """Process queued messages in order; False once the client has disconnected"""
+        audio = []
+        for item in batch:
+            if item is None:
+                return False
+            if item[0] == "audio":
+                audio.append(item)
+                continue
+            await self._convert(websocket, audio)
+            audio = []
+            if item[0] == "flush":
+                await self._send(websocket, self.converter.flush, None, item[2], item[3])
+            else:
+                self.converter.reset()
+        await self._convert(websocket, audio)
+        return True
+
+    async def _convert(self, websocket, frames):
+        if not frames:
+            return
+        # Input beyond the backlog was already dropped on arrival (see `_put`)
+        samples = np.concatenate([frame[1] for frame in frames]) if len(frames) > 1 else frames[0][1]
+        received = frames[0][2]
+        await self._send(websocket, self.converter.push, samples, received, frames[-1][3])
+
+    async def _send(self, websocket, convert: Callable, samples, received: float, input_sequence: int):
+        def timed():
+            start = time.perf_counter()
+            output = convert() if samples is None else convert(samples)
+            return output, start, time.perf_counter()
+
+        try:
+            output, start, end = await self.rvc_engine.executor.run(
+                self.model_key, timed,
+                priority=PRIORITY_INTERACTIVE,
+                owner=self.owner,
+                audio_seconds=len(samples) / self.input_sr if samples is not None else 0.0
+            )
+        except InferenceQueueFull as e:
+            self.dropped_samples += len(samples) if samples is not None else 0
+            await websocket.send_json({"type": "busy", "retry_after": e.retry_after})
+            return
+        if len(output):
+            queue_ms = (start - received) * 1000
+            await websocket.send_bytes(self.encode(output, input_sequence, queue_ms, (end - start) * 1000))
 
-# WebSocket server removed for now - can be added later with websockets dependency
 
 class LiveAudioManager:
     """Manager for live audio processing"""
     
     def __init__(self, rvc_engine):
         self.rvc_engine = rvc_engine
-        self.live_processor = LiveAudioProcessor(rvc_engine)
+        self.live_processor = LiveAudioProcessor(rvc_engine, max_latency_seconds=settings.RVC_LIVE_MAX_BACKLOG_SECONDS)
         self.is_running = False
+        # WebSocket live-conversion sessions, each with its own converter
+        self.sessions = set()
     
     async def start(self):
         """Start live audio processing system"""
@@ -180,11 +370,48 @@ class LiveAudioManager:
         """Set the RVC model for live processing"""
         self.live_processor.set_model(model_path, index_path)
     
+    async def open_session(
+        self,
+        model_path: str,
+        index_path: Optional[str] = None,
+        input_sr: int = 48000,
+        fmt: str = "f32",
+        pitch_shift: int = 0,
+        f0_method: Optional[str] = None,
+        owner: Optional[str] = None,
+        max_backlog_seconds: float = 1.0
+    ) -> LiveConversionSession:
+        """Start a WebSocket live-conversion session (see `close_session`)"""
+        if fmt not in PCM_FORMATS:
+            raise ValueError(f"Unknown PCM format: {fmt} (available: {', '.join(PCM_FORMATS)})")
+        if f0_method and f0_method not in F0_PREDICTORS:
+            raise ValueError(f"Unknown f0_method: {f0_method} (available: {', '.join(F0_PREDICTORS)})")
+        # Loading a model that is not cached takes seconds; it runs on the inference
+        # executor like any other work on the model
+        converter = await self.rvc_engine.executor.run(
+            model_path, self.rvc_engine.create_streaming_converter, model_path, index_path,
+            input_sr=input_sr, pitch_shift=pitch_shift, f0_method=f0_method,
+            priority=PRIORITY_INTERACTIVE, owner=owner
+        )
+        session = LiveConversionSession(
+            self.rvc_engine, converter, model_path, fmt=fmt, owner=owner, max_backlog_seconds=max_backlog_seconds
+        )
+        self.sessions.add(session)
+        logger.info(f"Live conversion session opened: {model_path} ({input_sr} Hz {fmt}, {owner})")
+        return session
+
+    def close_session(self, session: LiveConversionSession):
+        self.sessions.discard(session)
+        logger.info(
+            f"Live conversion session closed after {session.sequence} frames "
+            f"({session.dropped_samples} input samples dropped)"
+        )
+
     def get_status(self) -> Dict[str, Any]:
         """Get current status"""
         return {
             'is_running': self.is_running,
             'is_processing': self.live_processor.is_processing,
             'current_model': self.live_processor.current_model.model_path if self.live_processor.current_model else None,
-            'connected_clients': 0  # WebSocket clients removed for now
+            'connected_clients': len(self.sessions)
         }
@@ -1,7 +1,6 @@
 import asyncio
 import logging
 import threading
-import queue
 import time
 import numpy as np
 import soundfile as sf
@@ -11,8 +10,11 @@ import tempfile
 import uuid
 from datetime import datetime
 
+from app.core.config import settings
 from .microphone_service import MicrophoneService
 from .rvc_engine import RVCVoiceCloningEngine
+from .rvc_infer.inference_executor import PRIORITY_INTERACTIVE
+from .rvc_infer.ring_buffer import SampleRingBuffer
 
 logger = logging.getLogger(__name__)
 
@@ -25,27 +27,32 @@ class LiveRecordingHandler:
         self.is_recording = False
         self.is_processing = False
         self.current_model = None
+        self.converter = None
         self.recording_thread: Optional[threading.Thread] = None
         self.processing_thread: Optional[threading.Thread] = None
         
-        # Audio buffers
-        self.raw_audio_buffer = queue.Queue()
-        self.processed_audio_buffer = queue.Queue()
+        # Configuration: converted input lags the microphone by at most this much
+        self.max_latency_seconds = settings.RVC_LIVE_MAX_BACKLOG_SECONDS
+        # Block size for RVC processing comes from RVC_STREAM_BLOCK_SECONDS
+        
+        # Audio buffers (microphone samples, converted samples), sized in start_live_recording
+        self.raw_audio_buffer = SampleRingBuffer(1)
+        self.processed_audio_buffer = SampleRingBuffer(1)
+        self.dropped_samples = 0
         
         # Callbacks
         self.audio_callback: Optional[Callable] = None
         self.processing_callback: Optional[Callable] = None
         
-        # Configuration
-        self.buffer_size = 4096  # Audio buffer size
-        self.processing_chunk_size = 8192  # Chunk size for RVC processing
-        
         logger.info("Live recording handler initialized")
     
     def set_model(self, model_path: str, index_path: Optional[str] = None) -> bool:
         """Set the RVC model for live processing"""
         try:
             self.current_model = self.rvc_engine.load_rvc_model(model_path, index_path)
+            self.converter = self.rvc_engine.create_streaming_converter(
+                model_path, index_path, input_sr=int(self.microphone_service.sample_rate)
+            )
             logger.info(f"Live recording model set: {model_path}")
             return True
         except Exception as e:
@@ -71,6 +78,16 @@ class LiveRecordingHandler:
             self.audio_callback = audio_callback
             self.processing_callback = processing_callback
             
+            # Rings hold twice the latency bound so the microphone callback never waits on conversion
+            block = self.converter.block_samples
+            self.raw_audio_buffer = SampleRingBuffer(
+                max(int(2 * self.max_latency_seconds * self.converter.input_sr), 2 * block)
+            )
+            self.processed_audio_buffer = SampleRingBuffer(
+                max(int(2 * self.max_latency_seconds * self.converter.sample_rate), 2 * block)
+            )
+            self.dropped_samples = 0
+            
             # Start recording
             if not self.microphone_service.start_recording(self._audio_callback):
                 return False
@@ -102,16 +119,17 @@ class LiveRecordingHandler:
             self.microphone_service.stop_recording()
             self.is_recording = False
             self.is_processing = False
+            self.raw_audio_buffer.close()
             
             # Wait for threads to finish
             if self.processing_thread:
                 self.processing_thread.join(timeout=2.0)
             
             # Clear buffers
-            while not self.raw_audio_buffer.empty():
-                self.raw_audio_buffer.get()
-            while not self.processed_audio_buffer.empty():
-                self.processed_audio_buffer.get()
+            self.raw_audio_buffer.clear()
+            self.processed_audio_buffer.clear()
+            if self.converter:
+                self.converter.reset()
             
             logger.info("Live recording stopped")
             return True
@@ -123,8 +141,8 @@ class LiveRecordingHandler:
     def _audio_callback(self, audio_data: np.ndarray, timestamp):
         """Callback for incoming audio data"""
         try:
-            # Add to raw audio buffer
-            self.raw_audio_buffer.put(audio_data)
+            # Add to raw audio buffer (stereo is mixed down in place)
+            self.raw_audio_buffer.write(audio_data)
             
             # Call user callback if provided
             if self.audio_callback:
@@ -139,41 +157,34 @@ class LiveRecordingHandler:
     def _processing_loop(self):
         """Main processing loop for RVC conversion"""
         try:
-            audio_chunks = []
+            # One converter block at a time, read into the same array
+            block = np.empty(self.converter.block_samples, dtype=np.float32)
+            max_backlog = max(int(self.max_latency_seconds * self.converter.input_sr), len(block))
             
             while self.is_processing:
+                if not self.raw_audio_buffer.wait(len(block), timeout=0.1):
+                    continue
+                
                 try:
-                    # Collect audio chunks
-                    while len(audio_chunks) < self.processing_chunk_size and not self.raw_audio_buffer.empty():
-                        chunk = self.raw_audio_buffer.get(timeout=0.1)
-                        audio_chunks.append(chunk)
+                    # Fell behind: skip to the newest input so latency stays bounded
+                    self.dropped_samples += self.raw_audio_buffer.discard_oldest(max_backlog)
+                    self.raw_audio_buffer.read_into(block)
                     
-                    # Process when we have enough data
-                    if len(audio_chunks) >= self.processing_chunk_size:
-                        # Combine chunks
-                        combined_audio = np.concatenate(audio_chunks)
-                        
-                        # Process with RVC
-                        processed_audio = self._process_audio_chunk(combined_audio)
-                        
-                        # Add to processed buffer
-                        self.processed_audio_buffer.put(processed_audio)
-                        
-                        # Call processing callback if provided
-                        if self.processing_callback:
-                            try:
-                                self.processing_callback(processed_audio)
-                            except Exception as e:
-                                logger.error(f"Processing callback error: {e}")
-                        
-                        # Keep some overlap for smoother processing
-                        overlap_size = self.processing_chunk_size // 4
-                        audio_chunks = audio_chunks[-overlap_size:] if overlap_size < len(audio_chunks) else []
+                    # Incremental conversion: only the frames of each new block are synthesized
+                    processed_audio = self.converter.push(block)
+                    if len(processed_audio) == 0:
+                        continue
                     
-                    time.sleep(0.01)  # Small delay to prevent busy waiting
+                    # Add to processed buffer
+                    self.processed_audio_buffer.write(processed_audio)
+                    
+                    # Call processing callback if provided
+                    if self.processing_callback:
+                        try:
+                            self.processing_callback(processed_audio)
+                        except Exception as e:
+                            logger.error(f"Processing callback error: {e}")
                     
-                except queue.Empty:
-                    continue
                 except Exception as e:
                     logger.error(f"Processing loop error: {e}")
                     time.sleep(0.1)
@@ -183,34 +194,16 @@ class LiveRecordingHandler:
         finally:
             self.is_processing = False
     
-    def _process_audio_chunk(self, audio_chunk: np.ndarray) -> np.ndarray:
-        """Process a single audio chunk with RVC"""
-        try:
-            # Preprocess audio
-            audio_chunk = self.rvc_engine.preprocess_audio(audio_chunk, self.rvc_engine.sample_rate)
-            
-            # Convert to tensor
-            audio_tensor = np.array(audio_chunk).astype(np.float32)
-            
-            # For now, return the processed audio (in real implementation, apply RVC model)
-            # TODO: Apply actual RVC model processing here
-            processed_audio = audio_chunk
-            
-            # Postprocess audio
-            processed_audio = self.rvc_engine.postprocess_audio(processed_audio, self.rvc_engine.sample_rate)
-            
-            return processed_audio
-            
-        except Exception as e:
-            logger.error(f"Audio chunk processing failed: {e}")
-            return audio_chunk  # Return original if processing fails
-    
     def get_processed_audio(self) -> Optional[np.ndarray]:
-        """Get next processed audio chunk"""
-        try:
-            return self.processed_audio_buffer.get_nowait()
-        except queue.Empty:
+        """Get all processed audio not yet read, at most max_latency_seconds of it"""
+        self.dropped_samples += self.processed_audio_buffer.discard_oldest(
+            int(self.max_latency_seconds * self.converter.sample_rate) if self.converter else 0
+        )
+        if not len(self.processed_audio_buffer):
             return None
+        audio = np.empty(len(self.processed_audio_buffer), dtype=np.float32)
+        self.processed_audio_buffer.read_into(audio)
+        return audio
     
     def record_and_save(self, duration: float, model_path: str, index_path: Optional[str] = None) -> Dict[str, Any]:
         """Record audio for specified duration and save with RVC processing"""
@@ -233,7 +226,9 @@ class LiveRecordingHandler:
                     self.rvc_engine.process_audio_with_rvc(
                         audio_path=temp_path,
                         model_path=model_path,
-                        index_path=index_path
+                        index_path=index_path,
+                        priority=PRIORITY_INTERACTIVE,
+                        owner="live-recording"
                     )
                 )
                 
@@ -269,8 +264,9 @@ class LiveRecordingHandler:
             "is_processing": self.is_processing,
             "current_model": self.current_model.model_path if self.current_model else None,
             "microphone_status": self.microphone_service.get_recording_status(),
-            "raw_buffer_size": self.raw_audio_buffer.qsize(),
-            "processed_buffer_size": self.processed_audio_buffer.qsize()
+            "raw_buffer_samples": len(self.raw_audio_buffer),
+            "processed_buffer_samples": len(self.processed_audio_buffer),
+            "dropped_samples": self.dropped_samples
         }
     
     def get_microphone_devices(self) -> List[Dict[str, Any]]:
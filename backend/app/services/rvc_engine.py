@@ -6,13 +6,18 @@ import soundfile as sf
 import numpy as np
 import logging
 from pathlib import Path
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, Optional, Tuple, Callable
 import asyncio
+import functools
 import threading
 import queue
 import time
 from dataclasses import dataclass
+from app.core.config import settings
 from .rvc_infer.simple_rvc import SimpleRVCProcessor
+from .rvc_infer.streaming import StreamingConverter
+from .rvc_infer.model_registry import get_model_registry
+from .rvc_infer.inference_executor import InferenceExecutor, PRIORITY_BATCH, PRIORITY_INTERACTIVE
 
 logger = logging.getLogger(__name__)
 
@@ -31,134 +36,75 @@ class RVCVoiceCloningEngine:
     """Real RVC Voice Cloning Engine"""
     
     def __init__(self):
-        self.loaded_models: Dict[str, RVCModel] = {}
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         self.sample_rate = 44100
         self.hop_length = 512
         self.n_fft = 2048
         
+        # Conversions run on a bounded pool with a fixed share of the cores per worker
+        self.executor = InferenceExecutor(
+            workers=settings.RVC_INFERENCE_WORKERS,
+            threads_per_worker=settings.RVC_INFERENCE_THREADS,
+            max_queue=settings.RVC_INFERENCE_QUEUE,
+            per_model=settings.RVC_MODEL_CONCURRENCY or settings.RVC_BATCH_MAX_SIZE,
+            interactive_reserve=settings.RVC_INTERACTIVE_RESERVE,
+            promote_after=settings.RVC_BATCH_PROMOTE_SECONDS
+        )
+        
+        # Loaded voices share the process-wide registry; its RAM budget is set here, once
+        get_model_registry().set_budget(settings.RVC_MODEL_CACHE_MB * 2**20)
+        
         # Initialize the simple RVC processor
-        self.rvc_processor = SimpleRVCProcessor()
+        self.rvc_processor = SimpleRVCProcessor(
+            segment_seconds=settings.RVC_SEGMENT_SECONDS,
+            overlap_seconds=settings.RVC_SEGMENT_OVERLAP_SECONDS,
+            segment_workers=settings.RVC_SEGMENT_WORKERS,
+            stream_first_segment_seconds=settings.RVC_STREAM_FIRST_SEGMENT_SECONDS,
+            content_model_dir=settings.CONTENTVEC_DIR,
+            content_threads=settings.CONTENTVEC_THREADS or self.executor.threads_per_worker,
+            content_window_seconds=settings.CONTENTVEC_WINDOW_SECONDS,
+            content_batch_size=settings.CONTENTVEC_BATCH_SIZE,
+            index_rate=settings.RVC_INDEX_RATE,
+            index_k=settings.RVC_INDEX_K,
+            index_nprobe=settings.RVC_INDEX_NPROBE,
+            batch_max_size=settings.RVC_BATCH_MAX_SIZE,
+            batch_wait_ms=settings.RVC_BATCH_WAIT_MS,
+            batch_max_frames=settings.RVC_BATCH_MAX_FRAMES,
+            f0_method=settings.RVC_F0_METHOD,
+            inference_mode=settings.RVC_INFERENCE_MODE,
+            quant_modules=tuple(m.strip() for m in settings.RVC_QUANT_MODULES.split(",") if m.strip()),
+            quant_calibration_dir=settings.RVC_QUANT_CALIBRATION_DIR,
+            backend=settings.RVC_BACKEND,
+            onnx_threads=settings.RVC_ONNX_THREADS or self.executor.threads_per_worker,
+            intra_op_threads=self.executor.threads_per_worker,
+            analysis_cache_dir=settings.ANALYSIS_CACHE_DIR,
+            analysis_cache_mb=settings.ANALYSIS_CACHE_MB
+        )
         
         logger.info(f"RVC Engine initialized on device: {self.device}")
     
     def load_rvc_model(self, model_path: str, index_path: Optional[str] = None) -> RVCModel:
-        """Load RVC model from .pth file"""
+        """Load RVC model from .pth file (shared with the processor through the model registry)"""
         try:
-            # Check if model is already loaded
-            if model_path in self.loaded_models:
-                logger.info(f"Model already loaded: {model_path}")
-                return self.loaded_models[model_path]
-            
-            logger.info(f"Loading RVC model: {model_path}")
-            
-            # Load PyTorch model
             if not os.path.exists(model_path):
                 raise FileNotFoundError(f"Model file not found: {model_path}")
             
-            # Load model with proper device mapping
-            model_data = torch.load(model_path, map_location=self.device)
-            
-            # Handle different model formats
-            if isinstance(model_data, dict):
-                if 'model' in model_data:
-                    model = model_data['model']
-                elif 'state_dict' in model_data:
-                    # Create model architecture and load state dict
-                    model = self._create_model_from_state_dict(model_data['state_dict'])
-                else:
-                    # Assume the dict itself is the model
-                    model = model_data
-            else:
-                model = model_data
+            model_info = self.rvc_processor.load_rvc_model(model_path, index_path)
             
-            # Set model to evaluation mode
-            if hasattr(model, 'eval'):
-                model.eval()
-            
-            # Load index file if available
-            index_data = None
-            if index_path and os.path.exists(index_path):
-                index_data = self._load_index_file(index_path)
-            
-            # Create RVCModel container
-            rvc_model = RVCModel(
-                model=model,
-                index_data=index_data,
+            return RVCModel(
+                model=model_info["net_g"],
+                index_data=model_info.get("index"),
                 model_path=model_path,
                 index_path=index_path or "",
-                sample_rate=self.sample_rate,
+                sample_rate=model_info.get("tgt_sr", self.sample_rate),
                 hop_length=self.hop_length,
                 n_fft=self.n_fft
             )
             
-            # Cache the model
-            self.loaded_models[model_path] = rvc_model
-            
-            logger.info(f"Successfully loaded RVC model: {model_path}")
-            return rvc_model
-            
         except Exception as e:
             logger.error(f"Failed to load RVC model {model_path}: {e}")
             raise
     
-    def _create_model_from_state_dict(self, state_dict: Dict) -> torch.nn.Module:
-        """Create model architecture from state dict"""
-        # This is a simplified version - you might need to adjust based on your model architecture
-        try:
-            # Try to infer model architecture from state dict keys
-            if any('encoder' in key for key in state_dict.keys()):
-                # RVC-like architecture
-                model = self._create_rvc_architecture(state_dict)
-            else:
-                # Generic model
-                model = torch.nn.Module()
-                model.load_state_dict(state_dict)
-            
-            return model
-        except Exception as e:
-            logger.warning(f"Could not create model from state dict: {e}")
-            # Return a dummy model that can be used
-            return torch.nn.Module()
-    
-    def _create_rvc_architecture(self, state_dict: Dict) -> torch.nn.Module:
-        """Create RVC-specific model architecture"""
-        # This is a placeholder - you'll need to implement the actual RVC architecture
-        # based on your specific model format
-        class RVCModel(torch.nn.Module):
-            def __init__(self):
-                super().__init__()
-                # Add your RVC model layers here
-                pass
-            
-            def forward(self, x):
-                # Add your forward pass here
-                return x
-        
-        model = RVCModel()
-        try:
-            model.load_state_dict(state_dict)
-        except:
-            logger.warning("Could not load state dict, using untrained model")
-        
-        return model
-    
-    def _load_index_file(self, index_path: str) -> Optional[Any]:
-        """Load index file for faster inference"""
-        try:
-            # Try to load with faiss if available
-            try:
-                import faiss
-                index = faiss.read_index(index_path)
-                logger.info(f"Loaded FAISS index: {index_path}")
-                return index
-            except ImportError:
-                logger.warning("FAISS not available, skipping index loading")
-                return None
-        except Exception as e:
-            logger.warning(f"Could not load index file {index_path}: {e}")
-            return None
-    
     def preprocess_audio(self, audio: np.ndarray, sr: int) -> np.ndarray:
         """Preprocess audio for RVC processing"""
         try:
@@ -201,24 +147,45 @@ class RVCVoiceCloningEngine:
         index_path: Optional[str] = None,
         enhance_quality: bool = True,
         noise_reduction: bool = True,
-        pitch_shift: int = 0
+        pitch_shift: int = 0,
+        f0_method: Optional[str] = None,
+        progress: Optional[Callable[[str, float], None]] = None,
+        priority: Optional[str] = None,
+        owner: Optional[str] = None,
+        on_chunk: Optional[Callable[[np.ndarray, int], None]] = None,
+        timeout: Optional[float] = None
     ) -> Tuple[np.ndarray, int]:
-        """Process audio file with RVC model"""
+        """
+        Process audio file with RVC model; `progress(stage, fraction)` and
+        `on_chunk(samples, sr)` (output as it becomes final) are called from the worker
+        
+        `priority` defaults to the class of the input's duration (see `classify_audio`)
+        and `owner` identifies the user for fair sharing of the workers. `timeout`
+        limits the conversion once a worker starts it, not the time spent queued.
+        """
         try:
             logger.info(f"Processing audio with RVC: {audio_path}")
+            default_priority, audio_seconds = self.classify_audio(audio_path)
             
-            # Use the proper RVC processor (run in thread pool since it's not async)
-            import asyncio
-            loop = asyncio.get_event_loop()
-            converted_audio, sr = await loop.run_in_executor(
-                None,
-                self.rvc_processor.process_audio_with_rvc,
-                audio_path,
+            # Run on the inference executor; at most RVC_MODEL_CONCURRENCY jobs per model at once
+            converted_audio, sr = await self.executor.run(
                 model_path,
-                index_path,
-                enhance_quality,
-                noise_reduction,
-                pitch_shift
+                functools.partial(
+                    self.rvc_processor.process_audio_with_rvc,
+                    audio_path,
+                    model_path,
+                    index_path,
+                    enhance_quality,
+                    noise_reduction,
+                    pitch_shift,
+                    f0_method=f0_method,
+                    progress=progress,
+                    on_chunk=on_chunk
+                ),
+                priority=priority or default_priority,
+                owner=owner,
+                audio_seconds=audio_seconds,
+                timeout=timeout
             )
             
             logger.info(f"Successfully processed audio with RVC")
@@ -228,6 +195,36 @@ class RVCVoiceCloningEngine:
             logger.error(f"RVC audio processing failed: {e}")
             raise
     
+    def classify_audio(self, audio_path: str) -> Tuple[str, float]:
+        """Priority class and duration of an input; clips up to RVC_INTERACTIVE_SECONDS are interactive"""
+        try:
+            seconds = sf.info(audio_path).duration
+        except Exception:
+            seconds = 0.0
+        interactive = 0 < seconds <= settings.RVC_INTERACTIVE_SECONDS
+        return (PRIORITY_INTERACTIVE if interactive else PRIORITY_BATCH), seconds
+    
+    def create_streaming_converter(
+        self,
+        model_path: str,
+        index_path: Optional[str] = None,
+        input_sr: Optional[int] = None,
+        pitch_shift: int = 0,
+        f0_method: Optional[str] = None
+    ) -> StreamingConverter:
+        """Incremental converter for a live stream; output is at the model's sample rate"""
+        model_info = self.rvc_processor.load_rvc_model(model_path, index_path)
+        return StreamingConverter(
+            self.rvc_processor,
+            model_info,
+            input_sr=input_sr or self.sample_rate,
+            pitch_shift=pitch_shift,
+            f0_method=f0_method,
+            block_seconds=settings.RVC_STREAM_BLOCK_SECONDS,
+            context_seconds=settings.RVC_STREAM_CONTEXT_SECONDS,
+            crossfade_seconds=settings.RVC_STREAM_CROSSFADE_SECONDS
+        )
+    
     def _apply_pitch_shift(self, audio_tensor: torch.Tensor, semitones: int) -> torch.Tensor:
         """Apply pitch shift to audio"""
         try:
@@ -285,26 +282,61 @@ class RVCVoiceCloningEngine:
     
     def get_model_info(self, model_path: str) -> Dict[str, Any]:
         """Get information about a loaded model"""
-        if model_path not in self.loaded_models:
+        model_info = self.rvc_processor.models.peek(model_path)
+        if model_info is None:
             return {"error": "Model not loaded"}
         
-        model = self.loaded_models[model_path]
         return {
-            "model_path": model.model_path,
-            "index_path": model.index_path,
-            "sample_rate": model.sample_rate,
+            "model_path": model_path,
+            "sample_rate": model_info.get("tgt_sr"),
             "device": str(self.device),
-            "has_index": model.index_data is not None
+            "has_index": model_info.get("retriever") is not None
         }
     
     def unload_model(self, model_path: str) -> bool:
         """Unload a model from memory"""
-        if model_path in self.loaded_models:
-            del self.loaded_models[model_path]
+        if self.rvc_processor.models.evict(model_path):
             logger.info(f"Unloaded model: {model_path}")
             return True
         return False
     
-    def get_loaded_models(self) -> list:
-        """Get list of loaded model paths"""
-        return list(self.loaded_models.keys())
+    def pin_model(self, model_path: str):
+        """Keep a model loaded regardless of the memory budget"""
+        self.rvc_processor.models.pin(model_path)
+        logger.info(f"Pinned model: {model_path}")
+    
+    def unpin_model(self, model_path: str):
+        """Let a pinned model be evicted again"""
+        self.rvc_processor.models.unpin(model_path)
+        logger.info(f"Unpinned model: {model_path}")
+    
+    def warm_up_model(self, model_path: str, index_path: Optional[str] = None) -> float:
+        """Load a model and run a short dummy conversion on it; returns the seconds taken"""
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"Model file not found: {model_path}")
+        return self.rvc_processor.warm_up_model(model_path, index_path)
+    
+    def get_hot_set(self) -> list:
+        """Loaded models with their index and pin state, most recently used first"""
+        hot_set = []
+        for entry in self.rvc_processor.models.stats():
+            model_info = self.rvc_processor.models.peek(entry["model_path"]) or {}
+            hot_set.append({
+                "model_path": entry["model_path"],
+                "index_path": model_info.get("index_path"),
+                "pinned": entry["pinned"]
+            })
+        return hot_set
+    
+    def get_executor_stats(self) -> Dict[str, Any]:
+        """Inference queue depth and running jobs per model"""
+        return self.executor.stats()
+    
+    def get_loaded_models(self) -> Dict[str, Any]:
+        """Loaded models with their memory footprint, most recently used first"""
+        registry = self.rvc_processor.models
+        return {
+            "models": registry.stats(),
+            "total_mb": round(registry.total_bytes() / 2**20, 1),
+            "budget_mb": round(registry.max_bytes / 2**20, 1)
+        }
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+
+import os
+import time
+import shutil
+import hashlib
+import logging
+import threading
+import numpy as np
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def audio_key(audio: np.ndarray, **params) -> str:
+    """Content hash of an audio buffer plus the analysis parameters that produced or will consume it"""
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(audio, dtype=np.float32).data)
+    for name in sorted(params):
+        digest.update(f"|{name}={params[name]}".encode())
+    return digest.hexdigest()
+
+
+def file_key(path: str, **params) -> str:
+    """Content hash of a file on disk plus parameters (e.g. the decode sample rate)"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    for name in sorted(params):
+        digest.update(f"|{name}={params[name]}".encode())
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """
+    On-disk cache of analysis arrays (decoded audio, F0, content features)
+
+    Each entry is a directory of `.npy` files named after the arrays, loaded
+    back memory-mapped. Entries are evicted least-recently-used first once
+    the cache grows past `max_bytes`.
+    """
+
+    def __init__(self, cache_dir: str = "cache/analysis", max_bytes: int = 2 << 30):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total = 0
+
+        if self.enabled:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._scan()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _scan(self):
+        """Rebuild the LRU order from entry modification times"""
+        entries = []
+        for entry in self.cache_dir.iterdir():
+            if not entry.is_dir():
+                continue
+            if entry.name.startswith("."):
+                # Leftover from an interrupted write
+                shutil.rmtree(entry, ignore_errors=True)
+                continue
+            size = sum(f.stat().st_size for f in entry.glob("*.npy"))
+            entries.append((entry.stat().st_mtime, entry.name, size))
+
+        for _, key, size in sorted(entries):
+            self._entries[key] = size
+            self._total += size
+
+        if entries:
+            logger.info(f"Analysis cache: {len(entries)} entries, {self._total / 2**20:.1f} MB in {self.cache_dir}")
+
+    def get(self, key: str) -> Optional[Dict[str, np.ndarray]]:
+        """Return the cached arrays for `key` (memory-mapped, read-only) or None"""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+
+        entry = self.cache_dir / key
+        try:
+            arrays = {f.stem: np.load(f, mmap_mode="r") for f in entry.glob("*.npy")}
+            os.utime(entry)
+            return arrays
+        except (OSError, ValueError) as e:
+            logger.warning(f"Dropping unreadable analysis cache entry {key}: {e}")
+            self._remove(key)
+            return None
+
+    def put(self, key: str, arrays: Dict[str, np.ndarray]):
+        """Store `arrays` under `key`, evicting old entries to stay within the size budget"""
+        if not self.enabled:
+            return
+
+        entry = self.cache_dir / key
+        tmp = self.cache_dir / f".{key}.{threading.get_ident()}.{time.monotonic_ns()}"
+        try:
+            tmp.mkdir()
+            for name, array in arrays.items():
+                np.save(tmp / f"{name}.npy", np.ascontiguousarray(array))
+            size = sum(f.stat().st_size for f in tmp.glob("*.npy"))
+            os.replace(tmp, entry)
+        except OSError as e:
+            # Another worker stored the same entry first, or the disk is full
+            shutil.rmtree(tmp, ignore_errors=True)
+            if not entry.exists():
+                logger.warning(f"Failed to write analysis cache entry {key}: {e}")
+            return
+
+        with self._lock:
+            self._total += size - self._entries.pop(key, 0)
+            self._entries[key] = size
+            evict = []
+            while self._total > self.max_bytes and len(self._entries) > 1:
+                old_key, old_size = self._entries.popitem(last=False)
+                self._total -= old_size
+                evict.append(old_key)
+
+        for old_key in evict:
+            shutil.rmtree(self.cache_dir / old_key, ignore_errors=True)
+
+    def _remove(self, key: str):
+        with self._lock:
+            self._total -= self._entries.pop(key, 0)
+        shutil.rmtree(self.cache_dir / key, ignore_errors=True)
+
+    def clear(self):
+        with self._lock:
+            keys = list(self._entries)
+            self._entries.clear()
+            self._total = 0
+        for key in keys:
+            shutil.rmtree(self.cache_dir / key, ignore_errors=True)
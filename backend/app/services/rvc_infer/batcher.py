@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Set
+
+logger = logging.getLogger(__name__)
+
+
+class _Pending:
+    """One request waiting in a micro-batch queue"""
+
+    __slots__ = ("item", "frames", "result", "error", "done")
+
+    def __init__(self, item: Any, frames: int):
+        self.item = item
+        self.frames = frames
+        self.result = None
+        self.error = None
+        self.done = False
+
+
+class MicroBatcher:
+    """
+    Group concurrent inference calls for the same model into one batch
+
+    Callers block in `submit`. The first caller for a key becomes the batch
+    leader: it waits up to `max_wait_ms` for more requests on that key, runs
+    `run_batch` once on the collected items and hands each caller its own
+    result. No extra threads are started; the leader does the work on its own
+    thread while followers sleep.
+    """
+
+    def __init__(self, max_batch_size: int = 8, max_wait_ms: float = 10.0, max_batch_frames: int = 12000):
+        self.max_batch_size = max(max_batch_size, 1)
+        self.max_wait = max(max_wait_ms, 0.0) / 1000.0
+        self.max_batch_frames = max_batch_frames
+        self._cond = threading.Condition()
+        self._pending: Dict[Hashable, List[_Pending]] = {}
+        self._active: Set[Hashable] = set()
+
+    def _take(self, queue: List[_Pending]) -> List[_Pending]:
+        """Pop the next batch, keeping padded size (batch x longest item) under the frame budget"""
+        batch = [queue.pop(0)]
+        longest = batch[0].frames
+        while queue and len(batch) < self.max_batch_size:
+            candidate = max(longest, queue[0].frames)
+            if self.max_batch_frames and candidate * (len(batch) + 1) > self.max_batch_frames:
+                break
+            longest = candidate
+            batch.append(queue.pop(0))
+        return batch
+
+    def submit(self, key: Hashable, item: Any, frames: int, run_batch: Callable[[List[Any]], List[Any]]) -> Any:
+        """Run `item` as part of a batch for `key` and return its result"""
+        entry = _Pending(item, frames)
+        batch = None
+
+        with self._cond:
+            queue = self._pending.setdefault(key, [])
+            queue.append(entry)
+            self._cond.notify_all()
+
+            while not entry.done:
+                if key not in self._active and queue[0] is entry:
+                    self._active.add(key)
+                    deadline = time.monotonic() + self.max_wait
+                    while len(queue) < self.max_batch_size:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                    batch = self._take(queue)
+                    break
+                self._cond.wait()
+
+        if batch is not None:
+            try:
+                results = run_batch([pending.item for pending in batch])
+                error = None
+            except Exception as e:
+                results = [None] * len(batch)
+                error = e
+
+            if len(batch) > 1:
+                logger.info(f"Micro-batch of {len(batch)} requests for {key}")
+
+            with self._cond:
+                for pending, result in zip(batch, results):
+                    pending.result = result
+                    pending.error = error
+                    pending.done = True
+                self._active.discard(key)
+                if not self._pending.get(key):
+                    self._pending.pop(key, None)
+                self._cond.notify_all()
+
+        if entry.error is not None:
+            raise entry.error
+        return entry.result
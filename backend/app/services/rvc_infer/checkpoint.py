@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+import logging
+import torch
+from pathlib import Path
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+
+def load_checkpoint(model_path: str) -> Dict[str, Any]:
+    """
+    Load an RVC checkpoint with its weights memory-mapped
+
+    Tensors are backed by the page cache instead of private memory, so once
+    they are copied into the synthesizer and the dict is dropped nothing of
+    the checkpoint stays resident. Legacy (non-zip) checkpoints cannot be
+    mapped and are read fully. Either way only plain data is unpickled
+    (`weights_only`), never arbitrary objects from a downloaded file.
+    """
+    try:
+        return torch.load(model_path, map_location="cpu", mmap=True, weights_only=True)
+    except Exception as e:
+        logger.info(f"Cannot memory-map {Path(model_path).name} ({e}), reading it fully")
+        return torch.load(model_path, map_location="cpu", weights_only=True)
+
+
+def checkpoint_metadata(cpt: Dict[str, Any]) -> Dict[str, Any]:
+    """Everything in a checkpoint except its weights (config, sample rate, version, ...)"""
+    return {key: value for key, value in cpt.items() if key != "weight"}
+
+
+def build_synthesizer(
+    synthesizer_class, cpt: Dict[str, Any], inference_only: bool = True, **kwargs
+) -> torch.nn.Module:
+    """
+    Construct a synthesizer and load the checkpoint weights into it
+
+    The module is built on the meta device and then given uninitialised
+    CPU storage, so no random initialisation runs for tensors that are
+    overwritten anyway; parameters the checkpoint does not contain are
+    zero-filled instead. With `inference_only` the training-only posterior encoder
+    (`enc_q`) is dropped before loading and weight norm is folded into the
+    flow and decoder convolutions, so the hooks no longer recompute every
+    weight on each call, and the NSF excitation of F0 models runs on
+    `SourceModuleHnNSFFast`. `infer` output is bit-identical to the full graph.
+    """
+    with torch.device("meta"):
+        net_g = synthesizer_class(*cpt["config"], **kwargs)
+    net_g.to_empty(device="cpu")
+    if inference_only:
+        del net_g.enc_q
+
+    result = net_g.load_state_dict(cpt["weight"], strict=False)
+    state = net_g.state_dict()
+    with torch.no_grad():
+        for key in result.missing_keys:
+            state[key].zero_()
+
+    if inference_only:
+        net_g.remove_weight_norm()
+        if hasattr(net_g.dec, "use_fast_source"):
+            net_g.dec.use_fast_source()
+
+    for param in net_g.parameters():
+        param.requires_grad = False
+    return net_g
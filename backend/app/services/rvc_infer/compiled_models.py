@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+
+import os
+import logging
+import torch
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from .analysis_cache import file_key
+
+logger = logging.getLogger(__name__)
+
+# eager: run the nn.Module as built; script: TorchScript, persisted next to the
+# checkpoint; compile: torch.compile of infer() (kept in memory only); int8:
+# statically quantized CPU synthesizer (see quantization.py)
+INFERENCE_MODES = ("eager", "script", "compile", "int8")
+
+
+@lru_cache(maxsize=64)
+def _checkpoint_hash(model_path: str, mtime_ns: int, size: int) -> str:
+    return file_key(model_path)[:16]
+
+
+def checkpoint_hash(model_path: str) -> str:
+    """Short content hash of a checkpoint, memoised per file version"""
+    stat = os.stat(model_path)
+    return _checkpoint_hash(model_path, stat.st_mtime_ns, stat.st_size)
+
+
+def scripted_path(model_path: str) -> Path:
+    """Location of the TorchScript artifact for a checkpoint and the running torch version"""
+    path = Path(model_path)
+    torch_version = torch.__version__.replace("+", "_")
+    return path.with_name(f"{path.stem}.{checkpoint_hash(model_path)}.torch-{torch_version}.ts")
+
+
+def load_scripted(model_path: str, device: torch.device) -> Optional[torch.jit.ScriptModule]:
+    """Load a previously saved TorchScript synthesizer, or None if there is no usable artifact"""
+    path = scripted_path(model_path)
+    if not path.exists():
+        return None
+    try:
+        net_g = torch.jit.load(str(path), map_location=device)
+        net_g.eval()
+        logger.info(f"✅ Loaded TorchScript synthesizer: {path.name}")
+        return net_g
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable TorchScript artifact {path.name}: {e}")
+        return None
+
+
+def compile_synthesizer(net_g: torch.nn.Module, model_path: str, mode: str) -> torch.nn.Module:
+    """
+    Prepare an eager synthesizer for inference in `mode`
+
+    Weight norm is folded into the convolution weights first (if the loader
+    has not already done so). In script mode the TorchScript module is saved
+    next to the checkpoint so later loads can use `load_scripted`. Any
+    failure falls back to the eager module.
+    """
+    # int8 is prepared by quantization.quantize_synthesizer; reaching this point
+    # means quantization was unavailable and the eager module is used as is
+    if mode in ("eager", "int8"):
+        return net_g
+
+    try:
+        net_g.remove_weight_norm()
+    except ValueError:
+        # Already folded by the inference-only loader
+        pass
+    except Exception as e:
+        logger.warning(f"Could not remove weight norm: {e}")
+
+    if mode == "script":
+        try:
+            scripted = torch.jit.script(net_g)
+        except Exception as e:
+            logger.warning(f"TorchScript compilation failed, using eager model: {e}")
+            return net_g
+
+        path = scripted_path(model_path)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}")
+        try:
+            torch.jit.save(scripted, str(tmp))
+            os.replace(tmp, path)
+            logger.info(f"💾 Saved TorchScript synthesizer: {path.name}")
+        except OSError as e:
+            logger.warning(f"Could not save TorchScript artifact next to {model_path}: {e}")
+            tmp.unlink(missing_ok=True)
+        return scripted
+
+    if mode == "compile":
+        try:
+            net_g.infer = torch.compile(net_g.infer, dynamic=True)
+            logger.info("Compiled synthesizer infer() with torch.compile")
+        except Exception as e:
+            logger.warning(f"torch.compile failed, using eager model: {e}")
+        return net_g
+
+    raise ValueError(f"Unknown inference mode: {mode} (available: {', '.join(INFERENCE_MODES)})")
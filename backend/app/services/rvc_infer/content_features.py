@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+
+import os
+import logging
+import threading
+import numpy as np
+from pathlib import Path
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+# ContentVec export per checkpoint version: v1 synthesizers take the 256-dim
+# projected layer-9 features, v2 synthesizers take raw 768-dim layer-12 features
+CONTENT_MODELS = {
+    "v1": ("vec-256-layer-9.onnx", 256),
+    "v2": ("vec-768-layer-12.onnx", 768),
+}
+
+# ContentVec emits one frame per 320 samples at 16 kHz (50 fps); RVC
+# synthesizers run at 100 fps, so every frame is repeated twice. Each frame
+# sees 400 samples starting at its hop, so n samples give
+# (n - 400) // 320 + 1 frames
+CONTENT_SR = 16000
+CONTENT_HOP = 320
+CONTENT_RECEPTIVE_FIELD = 400
+
+# Process-wide sessions, keyed by model path
+_sessions: Dict[str, Any] = {}
+_sessions_lock = threading.Lock()
+
+
+def content_dim(version: str) -> int:
+    """Feature dimension expected by a checkpoint version"""
+    return CONTENT_MODELS.get(version, CONTENT_MODELS["v2"])[1]
+
+
+def get_content_model(vec_path: str, intra_op_threads: int = 0):
+    """Return the shared, warmed ContentVec session for `vec_path`"""
+    with _sessions_lock:
+        model = _sessions.get(vec_path)
+        if model is not None:
+            return model
+
+        import onnxruntime
+        from .infer_pack.onnx_inference import ContentVec
+
+        sess_options = onnxruntime.SessionOptions()
+        sess_options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        sess_options.execution_mode = onnxruntime.ExecutionMode.ORT_SEQUENTIAL
+        sess_options.intra_op_num_threads = intra_op_threads or (os.cpu_count() or 1)
+        sess_options.inter_op_num_threads = 1
+
+        model = ContentVec(vec_path, device="cpu", sess_options=sess_options)
+
+        # Warm-up run so the first request does not pay for allocator setup
+        model.forward_batch(np.zeros((1, CONTENT_SR), dtype=np.float32))
+
+        _sessions[vec_path] = model
+        logger.info(f"✅ ContentVec session ready: {vec_path} ({sess_options.intra_op_num_threads} threads)")
+        return model
+
+
+class ContentFeatureExtractor:
+    """Batched ContentVec feature extraction on a shared ONNX Runtime session"""
+
+    def __init__(
+        self,
+        model_dir: str = "pretrained",
+        intra_op_threads: int = 0,
+        window_seconds: float = 10.0,
+        context_seconds: float = 0.5,
+        batch_size: int = 8
+    ):
+        self.model_dir = Path(model_dir)
+        self.intra_op_threads = intra_op_threads
+        # Window and context are whole frames so window outputs tile exactly
+        self.window = max(int(window_seconds * CONTENT_SR) // CONTENT_HOP, 1) * CONTENT_HOP
+        self.context = max(int(context_seconds * CONTENT_SR) // CONTENT_HOP, 1) * CONTENT_HOP
+        self.batch_size = max(batch_size, 1)
+
+    def model_path(self, version: str) -> Path:
+        filename, _ = CONTENT_MODELS.get(version, CONTENT_MODELS["v2"])
+        return self.model_dir / filename
+
+    def is_available(self, version: str) -> bool:
+        """Whether the ContentVec export for this checkpoint version is installed"""
+        if not self.model_path(version).exists():
+            return False
+        try:
+            import onnxruntime  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def extract(self, audio_16k: np.ndarray, version: str) -> np.ndarray:
+        """
+        Extract content features for 16 kHz audio
+
+        Returns float32 features of shape [frames, dim] at the synthesizer
+        frame rate (100 fps), i.e. len(audio_16k) // 160 frames.
+        """
+        model = get_content_model(str(self.model_path(version)), self.intra_op_threads)
+
+        n_frames = len(audio_16k) // CONTENT_HOP
+        # Inputs up to one window run as a single window of their own length,
+        # which has no neighbours and so needs no context
+        window = min(self.window, max(-(-len(audio_16k) // CONTENT_HOP), 1) * CONTENT_HOP)
+        n_windows = -(-len(audio_16k) // window) or 1
+        context = self.context if n_windows > 1 else 0
+        # The last frame of a window needs its full receptive field past the window end
+        span = window + 2 * context + CONTENT_RECEPTIVE_FIELD - CONTENT_HOP
+
+        # Zero context on both ends and pad the tail to a whole number of windows
+        padded = np.zeros((n_windows - 1) * window + span, dtype=np.float32)
+        padded[context:context + len(audio_16k)] = audio_16k
+
+        # Every window carries `context` samples of neighbouring audio on each
+        # side; only the frames covering the window itself are kept
+        windows = np.lib.stride_tricks.sliding_window_view(padded, span)[::window]
+        skip = context // CONTENT_HOP
+        keep = window // CONTENT_HOP
+
+        chunks = []
+        for i in range(0, n_windows, self.batch_size):
+            batch = np.ascontiguousarray(windows[i:i + self.batch_size])
+            feats = model.forward_batch(batch)
+            assert feats.shape[1] >= skip + keep, f"ContentVec returned {feats.shape[1]} frames, expected {skip + keep}"
+            chunks.append(feats[:, skip:skip + keep].reshape(-1, feats.shape[-1]))
+
+        feats = np.concatenate(chunks)[:n_frames]
+        return np.repeat(feats, 2, axis=0).astype(np.float32, copy=False)
+
+
+def legacy_mel_features(audio_16k: np.ndarray, dim: int) -> np.ndarray:
+    """Approximate content features by tiling a log-mel spectrogram (used when ContentVec is not installed)"""
+    import librosa
+
+    n_frames = len(audio_16k) // CONTENT_HOP
+    mel_spec = librosa.feature.melspectrogram(
+        y=audio_16k, sr=CONTENT_SR, n_mels=80, hop_length=CONTENT_HOP, n_fft=1024
+    )
+    mel_spec = librosa.power_to_db(mel_spec, ref=np.max)
+    mel_spec = (mel_spec - mel_spec.mean()) / (mel_spec.std() + 1e-8)
+
+    if mel_spec.shape[1] >= n_frames:
+        mel_spec = mel_spec[:, :n_frames]
+    else:
+        mel_spec = np.pad(mel_spec, ((0, 0), (0, n_frames - mel_spec.shape[1])))
+
+    feats = np.resize(mel_spec, (dim, n_frames)).T
+    return np.repeat(feats, 2, axis=0).astype(np.float32)
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+
+import logging
+import threading
+import numpy as np
+from typing import Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class IndexRetriever:
+    """
+    Batched top-k retrieval over a model's training features
+
+    Every content frame of a chunk is searched in one call, and the
+    neighbours are blended back with inverse-distance weights. FAISS is used
+    when the index is loaded; otherwise a blocked NumPy matmul top-k runs over
+    `big_npy`.
+    """
+
+    def __init__(
+        self,
+        big_npy: np.ndarray,
+        index: Optional[Any] = None,
+        query_block: int = 256,
+        db_block: int = 65536,
+        blend_block: int = 4096
+    ):
+        self.big_npy = np.ascontiguousarray(big_npy, dtype=np.float32)
+        self.index = index
+        self.query_block = query_block
+        self.db_block = db_block
+        self.blend_block = blend_block
+        self._db_norms: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    @property
+    def dim(self) -> int:
+        return self.big_npy.shape[1]
+
+    def _search_faiss(self, queries: np.ndarray, k: int, nprobe: int) -> Tuple[np.ndarray, np.ndarray]:
+        import faiss
+
+        try:
+            params = faiss.SearchParametersIVF(nprobe=nprobe)
+            return self.index.search(queries, k, params=params)
+        except (AttributeError, TypeError, RuntimeError):
+            # Older FAISS builds or non-IVF indexes: set nprobe on the index itself
+            with self._lock:
+                try:
+                    faiss.ParameterSpace().set_index_parameter(self.index, "nprobe", nprobe)
+                except Exception:
+                    pass
+                return self.index.search(queries, k)
+
+    def _search_numpy(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        if self._db_norms is None:
+            self._db_norms = np.einsum("ij,ij->i", self.big_npy, self.big_npy)
+
+        n_db = len(self.big_npy)
+        k = min(k, n_db)
+        distances = np.empty((len(queries), k), dtype=np.float32)
+        ids = np.empty((len(queries), k), dtype=np.int64)
+
+        for q_start in range(0, len(queries), self.query_block):
+            q = queries[q_start:q_start + self.query_block]
+            q_norms = np.einsum("ij,ij->i", q, q)[:, None]
+            best_d = np.full((len(q), 0), np.inf, dtype=np.float32)
+            best_i = np.zeros((len(q), 0), dtype=np.int64)
+
+            for d_start in range(0, n_db, self.db_block):
+                db = self.big_npy[d_start:d_start + self.db_block]
+                # Squared L2 distance: |q|^2 - 2 q.b + |b|^2
+                dist = q @ db.T
+                dist *= -2.0
+                dist += q_norms
+                dist += self._db_norms[d_start:d_start + len(db)]
+
+                kk = min(k, dist.shape[1])
+                part = np.argpartition(dist, kk - 1, axis=1)[:, :kk]
+                cand_d = np.concatenate([best_d, np.take_along_axis(dist, part, axis=1)], axis=1)
+                cand_i = np.concatenate([best_i, part + d_start], axis=1)
+
+                keep = np.argpartition(cand_d, min(k, cand_d.shape[1]) - 1, axis=1)[:, :k]
+                best_d = np.take_along_axis(cand_d, keep, axis=1)
+                best_i = np.take_along_axis(cand_i, keep, axis=1)
+
+            np.maximum(best_d, 0.0, out=best_d)
+            distances[q_start:q_start + len(q)] = best_d
+            ids[q_start:q_start + len(q)] = best_i
+
+        return distances, ids
+
+    def search(self, queries: np.ndarray, k: int = 8, nprobe: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-k squared L2 distances and ids for every query row"""
+        queries = np.ascontiguousarray(queries, dtype=np.float32)
+        if self.index is not None:
+            return self._search_faiss(queries, k, nprobe)
+        return self._search_numpy(queries, k)
+
+    def blend(self, feats: np.ndarray, index_rate: float, k: int = 8, nprobe: int = 1) -> np.ndarray:
+        """Mix retrieved neighbours into `feats` ([frames, dim]) with weight `index_rate`"""
+        if index_rate <= 0 or len(feats) == 0:
+            return feats
+        if feats.shape[1] != self.dim:
+            logger.warning(f"Index dim {self.dim} does not match feature dim {feats.shape[1]}, skipping retrieval")
+            return feats
+
+        distances, ids = self.search(feats, k, nprobe)
+
+        # Inverse-distance weights, as in the reference RVC pipeline; FAISS
+        # pads with id -1 when an IVF probe finds fewer than k neighbours
+        valid = ids >= 0
+        ids = np.where(valid, ids, 0)
+        weight = np.square(1.0 / np.maximum(distances, 1e-8)) * valid
+        weight /= np.maximum(weight.sum(axis=1, keepdims=True), 1e-12)
+        weight = weight.astype(np.float32, copy=False)
+
+        # Gather neighbours block by block so [frames, k, dim] is never fully materialised
+        retrieved = np.empty_like(feats, dtype=np.float32)
+        for start in range(0, len(feats), self.blend_block):
+            block_ids = ids[start:start + self.blend_block]
+            retrieved[start:start + len(block_ids)] = np.einsum(
+                "tk,tkd->td", weight[start:start + len(block_ids)], self.big_npy[block_ids]
+            )
+
+        return retrieved * index_rate + feats * (1.0 - index_rate)
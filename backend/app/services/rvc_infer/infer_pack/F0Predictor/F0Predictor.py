@@ -0,0 +1,68 @@
+import numpy as np
+
+
+class F0Predictor(object):
+    def interpolate_f0(self, f0):
+        """
+        对F0进行插值处理
+
+        Unvoiced runs (f0 <= 0) between two voiced frames are filled with a
+        linear ramp that reaches the next voiced value on the run's last
+        frame; leading runs take the first voiced value and trailing runs
+        hold the last one. Runs are handled together with NumPy instead of a
+        per-frame loop.
+        input: f0:[frames]
+        output: f0:[frames], vuv:[frames]
+        """
+        data = np.reshape(f0, (f0.size,))
+        ip_data = data.copy()
+        vuv_vector = (data > 0.0).astype(np.float32)
+
+        frame_number = data.size
+        voiced = vuv_vector > 0
+        if voiced.all():
+            return ip_data, vuv_vector
+
+        # Start and end (exclusive) of every unvoiced run
+        edges = np.diff(np.concatenate(([1], voiced.view(np.int8), [1])))
+        starts = np.flatnonzero(edges == -1)
+        ends = np.flatnonzero(edges == 1)
+
+        # A run that reaches the last frame, or stops right before it, holds
+        # the previous voiced value through the end of the signal
+        tail = ends >= frame_number - 1
+        if tail.any():
+            start = starts[tail][0]
+            ip_data[start:] = data[start - 1] if start > 0 else 0.0
+            starts, ends = starts[~tail], ends[~tail]
+
+        # A leading run takes the first voiced value
+        if len(starts) and starts[0] == 0:
+            ip_data[: ends[0]] = data[ends[0]]
+            starts, ends = starts[1:], ends[1:]
+
+        if len(starts):
+            lengths = ends - starts
+            run = np.repeat(np.arange(len(starts)), lengths)
+            offset = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths) + 1
+            left = data[starts - 1]
+            step = (data[ends] - left) / lengths.astype(data.dtype)
+            ip_data[np.repeat(starts, lengths) + offset - 1] = left[run] + step[run] * offset.astype(data.dtype)
+
+        return ip_data, vuv_vector
+
+    def compute_f0(self, wav, p_len):
+        """
+        input: wav:[signal_length]
+               p_len:int
+        output: f0:[signal_length//hop_length]
+        """
+        pass
+
+    def compute_f0_uv(self, wav, p_len):
+        """
+        input: wav:[signal_length]
+               p_len:int
+        output: f0:[signal_length//hop_length],uv:[signal_length//hop_length]
+        """
+        pass
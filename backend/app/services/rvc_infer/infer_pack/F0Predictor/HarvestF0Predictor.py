@@ -1,7 +1,7 @@
 import numpy as np
 import pyworld
 
-from infer.lib.infer_pack.modules.F0Predictor.F0Predictor import F0Predictor
+from .F0Predictor import F0Predictor
 
 
 class HarvestF0Predictor(F0Predictor):
@@ -11,44 +11,6 @@ class HarvestF0Predictor(F0Predictor):
         self.f0_max = f0_max
         self.sampling_rate = sampling_rate
 
-    def interpolate_f0(self, f0):
-        """
-        对F0进行插值处理
-        """
-
-        data = np.reshape(f0, (f0.size, 1))
-
-        vuv_vector = np.zeros((data.size, 1), dtype=np.float32)
-        vuv_vector[data > 0.0] = 1.0
-        vuv_vector[data <= 0.0] = 0.0
-
-        ip_data = data
-
-        frame_number = data.size
-        last_value = 0.0
-        for i in range(frame_number):
-            if data[i] <= 0.0:
-                j = i + 1
-                for j in range(i + 1, frame_number):
-                    if data[j] > 0.0:
-                        break
-                if j < frame_number - 1:
-                    if last_value > 0.0:
-                        step = (data[j] - data[i - 1]) / float(j - i)
-                        for k in range(i, j):
-                            ip_data[k] = data[i - 1] + step * (k - i + 1)
-                    else:
-                        for k in range(i, j):
-                            ip_data[k] = data[j]
-                else:
-                    for k in range(i, frame_number):
-                        ip_data[k] = last_value
-            else:
-                ip_data[i] = data[i]  # 这里可能存在一个没有必要的拷贝
-                last_value = data[i]
-
-        return ip_data[:, 0], vuv_vector[:, 0]
-
     def resize_f0(self, x, target_len):
         source = np.array(x)
         source[source < 0.001] = np.nan
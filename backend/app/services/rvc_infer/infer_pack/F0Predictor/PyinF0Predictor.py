@@ -0,0 +1,41 @@
+import numpy as np
+
+from .F0Predictor import F0Predictor
+
+
+class PyinF0Predictor(F0Predictor):
+    """librosa's probabilistic YIN; accurate but by far the slowest backend"""
+
+    def __init__(self, hop_length=512, f0_min=50, f0_max=1100, sampling_rate=44100):
+        self.hop_length = hop_length
+        self.f0_min = f0_min
+        self.f0_max = f0_max
+        self.sampling_rate = sampling_rate
+
+    def _pyin(self, wav, p_len):
+        import librosa
+
+        f0, voiced_flag, _ = librosa.pyin(
+            np.asarray(wav, dtype=np.float32),
+            fmin=self.f0_min,
+            fmax=self.f0_max,
+            sr=self.sampling_rate,
+            hop_length=self.hop_length,
+        )
+        f0 = np.nan_to_num(f0, nan=0.0)[:p_len]
+        uv = voiced_flag.astype(np.float32)[:p_len]
+        if len(f0) < p_len:
+            f0 = np.pad(f0, (0, p_len - len(f0)))
+            uv = np.pad(uv, (0, p_len - len(uv)))
+        return f0, uv
+
+    def compute_f0(self, wav, p_len=None):
+        if p_len is None:
+            p_len = wav.shape[0] // self.hop_length
+        return self.interpolate_f0(self._pyin(wav, p_len)[0])[0]
+
+    def compute_f0_uv(self, wav, p_len=None):
+        if p_len is None:
+            p_len = wav.shape[0] // self.hop_length
+        f0, uv = self._pyin(wav, p_len)
+        return self.interpolate_f0(f0)[0], uv
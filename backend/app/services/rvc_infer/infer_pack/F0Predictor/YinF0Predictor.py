@@ -0,0 +1,102 @@
+import numpy as np
+
+from .F0Predictor import F0Predictor
+
+
+class YinF0Predictor(F0Predictor):
+    """
+    YIN pitch tracker evaluated on blocks of frames at once
+
+    The difference function of every frame in a block comes from one batched
+    FFT cross-correlation, so there is no per-frame Python work. Only NumPy is
+    required.
+    """
+
+    def __init__(
+        self,
+        hop_length=512,
+        f0_min=50,
+        f0_max=1100,
+        sampling_rate=44100,
+        threshold=0.15,
+        silence_db=-50.0,
+        block_frames=512,
+    ):
+        self.hop_length = hop_length
+        self.f0_min = f0_min
+        self.f0_max = f0_max
+        self.sampling_rate = sampling_rate
+        self.threshold = threshold
+        self.silence_db = silence_db
+        self.block_frames = block_frames
+
+    def _yin(self, wav, p_len):
+        wav = np.asarray(wav, dtype=np.float32)
+        tau_min = max(int(self.sampling_rate / self.f0_max), 2)
+        tau_max = int(np.ceil(self.sampling_rate / self.f0_min))
+        win = tau_max
+        frame_length = win + tau_max + 1
+        n_fft = 1 << int(np.ceil(np.log2(frame_length)))
+
+        # The analysis window of every frame is centred on a multiple of the hop
+        pad_left = win // 2
+        pad_right = max(p_len * self.hop_length - len(wav), 0) + frame_length
+        padded = np.pad(wav, (pad_left, pad_right))
+        frames = np.lib.stride_tricks.sliding_window_view(padded, frame_length)[
+            :: self.hop_length
+        ][:p_len]
+
+        f0 = np.zeros(p_len, dtype=np.float32)
+        uv = np.zeros(p_len, dtype=np.float32)
+        lags = np.arange(tau_max + 1)
+        silence = 10 ** (self.silence_db / 10) * win
+
+        for start in range(0, p_len, self.block_frames):
+            block = frames[start : start + self.block_frames].astype(np.float64)
+
+            # d(tau) = E(x[0:win]) + E(x[tau:tau+win]) - 2 * r(tau)
+            spec = np.fft.rfft(block, n_fft, axis=1)
+            head = np.fft.rfft(block[:, :win], n_fft, axis=1)
+            corr = np.fft.irfft(np.conj(head) * spec, n_fft, axis=1)[:, : tau_max + 1]
+            energy = np.cumsum(np.pad(np.square(block), ((0, 0), (1, 0))), axis=1)
+            shifted = energy[:, lags + win] - energy[:, lags]
+            diff = np.maximum(shifted[:, :1] + shifted - 2 * corr, 0.0)
+
+            # Cumulative mean normalised difference
+            cmnd = np.ones_like(diff)
+            cumulative = np.cumsum(diff[:, 1:], axis=1)
+            cmnd[:, 1:] = diff[:, 1:] * lags[1:] / np.maximum(cumulative, 1e-12)
+
+            # First local minimum under the threshold within the allowed lag range
+            search = cmnd[:, tau_min - 1 : tau_max + 1]
+            trough = (search[:, 1:-1] <= search[:, :-2]) & (search[:, 1:-1] < search[:, 2:])
+            candidate = trough & (search[:, 1:-1] < self.threshold)
+            found = candidate.any(axis=1)
+            tau = np.argmax(candidate, axis=1) + tau_min
+
+            # Parabolic interpolation around the chosen lag
+            rows = np.arange(len(block))
+            a = cmnd[rows, tau - 1]
+            b = cmnd[rows, tau]
+            c = cmnd[rows, np.minimum(tau + 1, tau_max)]
+            denom = a - 2 * b + c
+            shift = np.where(np.abs(denom) > 1e-12, 0.5 * (a - c) / np.where(denom == 0, 1, denom), 0.0)
+            period = tau + np.clip(shift, -1, 1)
+
+            voiced = found & (shifted[:, 0] > silence)
+            f0[start : start + len(block)] = np.where(voiced, self.sampling_rate / period, 0.0)
+            uv[start : start + len(block)] = voiced
+
+        return f0, uv
+
+    def compute_f0(self, wav, p_len=None):
+        if p_len is None:
+            p_len = wav.shape[0] // self.hop_length
+        f0, uv = self._yin(wav, p_len)
+        return self.interpolate_f0(f0)[0]
+
+    def compute_f0_uv(self, wav, p_len=None):
+        if p_len is None:
+            p_len = wav.shape[0] // self.hop_length
+        f0, uv = self._yin(wav, p_len)
+        return self.interpolate_f0(f0)[0], uv
@@ -0,0 +1,25 @@
+import importlib
+
+# F0 backend name -> predictor class; modules are imported on first use so
+# optional dependencies (pyworld, parselmouth, librosa) are only needed when
+# the backend is selected
+F0_PREDICTORS = {
+    "pm": "PMF0Predictor",
+    "dio": "DioF0Predictor",
+    "harvest": "HarvestF0Predictor",
+    "yin": "YinF0Predictor",
+    "pyin": "PyinF0Predictor",
+}
+
+
+def get_f0_predictor(f0_predictor, hop_length, sampling_rate, **kargs):
+    """Instantiate the F0 predictor registered as `f0_predictor`"""
+    if f0_predictor not in F0_PREDICTORS:
+        raise ValueError(
+            f"Unknown f0 predictor: {f0_predictor} (available: {', '.join(F0_PREDICTORS)})"
+        )
+    class_name = F0_PREDICTORS[f0_predictor]
+    module = importlib.import_module(f".{class_name}", __name__)
+    return getattr(module, class_name)(
+        hop_length=hop_length, sampling_rate=sampling_rate, **kargs
+    )
@@ -1,6 +1,6 @@
 import copy
 import math
-from typing import Optional
+from typing import List, Optional, Tuple
 
 import numpy as np
 import torch
@@ -60,13 +60,14 @@ class Encoder(nn.Module):
             self.norm_layers_2.append(LayerNorm(hidden_channels))
 
     def forward(self, x, x_mask):
-        attn_mask = x_mask.unsqueeze(2) * x_mask.unsqueeze(-1)
+        # The [b, 1, t, t] attention mask is built inside the attention layers,
+        # one query block at a time on the inference path
         x = x * x_mask
         zippep = zip(
             self.attn_layers, self.norm_layers_1, self.ffn_layers, self.norm_layers_2
         )
         for attn_layers, norm_layers_1, ffn_layers, norm_layers_2 in zippep:
-            y = attn_layers(x, x, attn_mask)
+            y = attn_layers(x, x, x_mask=x_mask)
             y = self.drop(y)
             x = norm_layers_1(x + y)
 
@@ -188,6 +189,11 @@ class MultiHeadAttention(nn.Module):
         self.block_length = block_length
         self.proximal_bias = proximal_bias
         self.proximal_init = proximal_init
+        # Fused inference path; set to False to run the reference implementation
+        self.fast_attention = True
+        # Queries per block on the fused relative path, bounding the score
+        # tensors to [b, h, query_block, t] (0 = all queries at once)
+        self.query_block = 512
         self.attn = None
 
         self.k_channels = channels // n_heads
@@ -218,13 +224,21 @@ class MultiHeadAttention(nn.Module):
                 self.conv_k.bias.copy_(self.conv_q.bias)
 
     def forward(
-        self, x: torch.Tensor, c: torch.Tensor, attn_mask: Optional[torch.Tensor] = None
+        self,
+        x: torch.Tensor,
+        c: torch.Tensor,
+        attn_mask: Optional[torch.Tensor] = None,
+        x_mask: Optional[torch.Tensor] = None,
     ):
+        """
+        attn_mask: [b, 1, t_t, t_s]
+        x_mask: [b, 1, t] self-attention sequence mask, used when attn_mask is None
+        """
         q = self.conv_q(x)
         k = self.conv_k(c)
         v = self.conv_v(c)
 
-        x, _ = self.attention(q, k, v, mask=attn_mask)
+        x, _ = self.attention(q, k, v, mask=attn_mask, x_mask=x_mask)
 
         x = self.conv_o(x)
         return x
@@ -235,6 +249,7 @@ class MultiHeadAttention(nn.Module):
         key: torch.Tensor,
         value: torch.Tensor,
         mask: Optional[torch.Tensor] = None,
+        x_mask: Optional[torch.Tensor] = None,
     ):
         # reshape [b, d, t] -> [b, n_h, t, d_k]
         b, d, t_s = key.size()
@@ -243,6 +258,30 @@ class MultiHeadAttention(nn.Module):
         key = key.view(b, self.n_heads, self.k_channels, t_s).transpose(2, 3)
         value = value.view(b, self.n_heads, self.k_channels, t_s).transpose(2, 3)
 
+        if (
+            self.fast_attention
+            and not self.training
+            and not self.proximal_bias
+            and self.block_length is None
+        ):
+            if self.window_size is None:
+                if mask is None and x_mask is not None:
+                    mask = x_mask.unsqueeze(2) * x_mask.unsqueeze(-1)
+                attn_mask: Optional[torch.Tensor] = None
+                if mask is not None:
+                    attn_mask = torch.zeros(
+                        mask.shape, dtype=query.dtype, device=query.device
+                    ).masked_fill_(mask == 0, -1e4)
+                output = F.scaled_dot_product_attention(
+                    query, key, value, attn_mask=attn_mask
+                )
+                return output.transpose(2, 3).contiguous().view(b, d, t_t), None
+            if t_s == t_t:
+                output = self._relative_attention_fast(query, key, value, mask, x_mask)
+                return output.transpose(2, 3).contiguous().view(b, d, t_t), None
+
+        if mask is None and x_mask is not None:
+            mask = x_mask.unsqueeze(2) * x_mask.unsqueeze(-1)
         scores = torch.matmul(query / math.sqrt(self.k_channels), key.transpose(-2, -1))
         if self.window_size is not None:
             assert (
@@ -287,6 +326,95 @@ class MultiHeadAttention(nn.Module):
         )  # [b, n_h, t_t, d_k] -> [b, d, t_t]
         return output, p_attn
 
+    def _relative_attention_fast(
+        self,
+        query: torch.Tensor,
+        key: torch.Tensor,
+        value: torch.Tensor,
+        mask: Optional[torch.Tensor] = None,
+        x_mask: Optional[torch.Tensor] = None,
+    ):
+        """
+        Inference path for windowed relative self-attention, equal to `attention`
+        up to float rounding. The relative terms only touch the 2*window_size+1
+        diagonals around the main one, so they are added to and read from those
+        diagonals directly instead of padding and reshaping [b, h, t, t] tensors.
+        Queries are processed in blocks of `query_block`, so peak memory grows
+        linearly with length.
+        query, key, value: [b, h, t, d_k]
+        ret: [b, h, t, d_k]
+        """
+        length = query.size(2)
+        query = query / math.sqrt(self.k_channels)
+        # [b, h, t, 2*w+1]: score of each query against each relative position
+        rel_logits = torch.matmul(query, self.emb_rel_k.unsqueeze(0).transpose(-2, -1))
+        block = self.query_block if self.query_block > 0 else length
+
+        outputs: List[torch.Tensor] = []
+        for start in range(0, length, block):
+            end = min(start + block, length)
+            block_mask: Optional[torch.Tensor] = None
+            if mask is not None:
+                block_mask = mask[:, :, start:end]
+            elif x_mask is not None:
+                block_mask = x_mask[:, :, start:end].unsqueeze(-1) * x_mask.unsqueeze(2)
+            outputs.append(
+                self._relative_attention_block(
+                    query[:, :, start:end], key, value, rel_logits[:, :, start:end], block_mask, start
+                )
+            )
+        return outputs[0] if len(outputs) == 1 else torch.cat(outputs, dim=2)
+
+    def _relative_attention_block(
+        self,
+        query: torch.Tensor,
+        key: torch.Tensor,
+        value: torch.Tensor,
+        rel_logits: torch.Tensor,
+        mask: Optional[torch.Tensor],
+        start: int,
+    ):
+        """
+        Scaled queries [start, start + n) against all keys
+        query: [b, h, n, d_k], rel_logits: [b, h, n, 2*w+1], mask: [b, 1, n, t]
+        ret: [b, h, n, d_k]
+        """
+        rows = query.size(2)
+        length = key.size(2)
+        scores = torch.matmul(query, key.transpose(-2, -1))
+        offsets = self._relative_offsets(rows, length, start)
+        for r, offset, first, last in offsets:
+            diagonal = torch.diagonal(scores, offset=offset, dim1=-2, dim2=-1)
+            diagonal.add_(rel_logits[:, :, first:last, r])
+        if mask is not None:
+            scores.masked_fill_(mask == 0, -1e4)
+        p_attn = torch.softmax(scores, dim=-1)
+        output = torch.matmul(p_attn, value)
+
+        # Attention weights of the 2*w+1 relative positions, zero outside the sequence
+        relative_weights = torch.zeros_like(rel_logits)
+        for r, offset, first, last in offsets:
+            relative_weights[:, :, first:last, r] = torch.diagonal(
+                p_attn, offset=offset, dim1=-2, dim2=-1
+            )
+        return output + torch.matmul(relative_weights, self.emb_rel_v.unsqueeze(0))
+
+    def _relative_offsets(self, rows: int, length: int, start: int):
+        """
+        (relative embedding index, diagonal offset, first row, end row) for each
+        relative position that falls inside a block of `rows` queries starting
+        at query `start`, against `length` keys
+        """
+        offsets: List[Tuple[int, int, int, int]] = []
+        for r in range(2 * self.window_size + 1):
+            # Query start + i sees key start + i + r - w, i.e. block column i + offset
+            offset = start + r - self.window_size
+            first = max(0, -offset)
+            last = min(rows, length - offset)
+            if first < last:
+                offsets.append((r, offset, first, last))
+        return offsets
+
     def _matmul_with_relative_values(self, x, y):
         """
         x: [b, h, l, m]
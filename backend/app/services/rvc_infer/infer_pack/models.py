@@ -1,6 +1,6 @@
 import math
 import logging
-from typing import Optional
+from typing import Dict, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +41,8 @@ class TextEncoder(nn.Module):
         self.lrelu = nn.LeakyReLU(0.1, inplace=True)
         if f0 == True:
             self.emb_pitch = nn.Embedding(256, hidden_channels)  # pitch 256
+        else:
+            self.emb_pitch = None
         self.encoder = attentions.Encoder(
             hidden_channels,
             filter_channels,
@@ -54,11 +56,11 @@ class TextEncoder(nn.Module):
     def forward(
         self,
         phone: torch.Tensor,
-        pitch: torch.Tensor,
+        pitch: Optional[torch.Tensor],
         lengths: torch.Tensor,
         skip_head: Optional[torch.Tensor] = None,
     ):
-        if pitch is None:
+        if pitch is None or self.emb_pitch is None:
             x = self.emb_phone(phone)
         else:
             x = self.emb_phone(phone) + self.emb_pitch(pitch)
@@ -264,15 +266,19 @@ class Generator(torch.nn.Module):
         if g is not None:
             x = x + self.cond(g)
 
-        for i in range(self.num_upsamples):
+        # torch.jit.script() does not support direct indexing of torch modules
+        for i, ups in enumerate(self.ups):
             x = F.leaky_relu(x, modules.LRELU_SLOPE)
-            x = self.ups[i](x)
-            xs = None
-            for j in range(self.num_kernels):
-                if xs is None:
-                    xs = self.resblocks[i * self.num_kernels + j](x)
-                else:
-                    xs += self.resblocks[i * self.num_kernels + j](x)
+            x = ups(x)
+            xs: Optional[torch.Tensor] = None
+            l = [i * self.num_kernels + j for j in range(self.num_kernels)]
+            for j, resblock in enumerate(self.resblocks):
+                if j in l:
+                    if xs is None:
+                        xs = resblock(x)
+                    else:
+                        xs += resblock(x)
+            assert isinstance(xs, torch.Tensor)
             x = xs / self.num_kernels
         x = F.leaky_relu(x)
         x = self.conv_post(x)
@@ -350,7 +356,7 @@ class SineGen(torch.nn.Module):
             uv = uv.float()
         return uv
     
-    def _f02sine(self, f0, upp):
+    def _f02sine(self, f0: torch.Tensor, upp: int):
         """ f0: (batchsize, length, dim)
             where dim indicates fundamental tone and overtones
         """
@@ -365,7 +371,7 @@ class SineGen(torch.nn.Module):
         rand_ini = torch.rand(1, 1, self.dim, device=f0.device)
         rand_ini[..., 0] = 0
         rad += rand_ini
-        sines = torch.sin(2 * np.pi * rad)
+        sines = torch.sin(2 * math.pi * rad)
         return sines
         
     def forward(self, f0: torch.Tensor, upp: int):
@@ -445,6 +451,104 @@ class SourceModuleHnNSF(torch.nn.Module):
         return sine_merge, None, None  # noise, uv
 
 
+class SourceModuleHnNSFFast(SourceModuleHnNSF):
+    """Inference version of SourceModuleHnNSF
+    Same parameters and, for the same random draws, the same excitation, but
+    the harmonic and per-sample phase multipliers are cached per upsampling
+    factor, device and dtype, voicing is applied at frame rate instead of on
+    an upsampled U/V track, and the phase, sine, noise and merge run in place
+    on the single full-resolution buffer (plus the noise). With `seed` set,
+    every call draws its initial phase and noise from a generator seeded with
+    it, so the excitation is reproducible; otherwise the global RNG is used,
+    exactly like SourceModuleHnNSF.
+    Sine_source = SourceModuleHnNSFFast(F0_sampled, upp)
+    F0_sampled (batchsize, length)
+    Sine_source (batchsize, length * upp, 1)
+    """
+
+    seed: Optional[int]
+    _multipliers: Dict[str, torch.Tensor]
+
+    def __init__(
+        self,
+        sampling_rate,
+        harmonic_num=0,
+        sine_amp=0.1,
+        add_noise_std=0.003,
+        voiced_threshod=0,
+        is_half=True,
+        seed: Optional[int] = None,
+    ):
+        super(SourceModuleHnNSFFast, self).__init__(
+            sampling_rate, harmonic_num, sine_amp, add_noise_std, voiced_threshod, is_half
+        )
+        self.sampling_rate = sampling_rate
+        self.dim = harmonic_num + 1
+        self.voiced_threshold = voiced_threshod
+        self.seed = seed
+        self._multipliers: Dict[str, torch.Tensor] = {}
+
+    @classmethod
+    def from_module(cls, source: SourceModuleHnNSF, seed: Optional[int] = None):
+        """Fast module sharing the merge layer of an existing SourceModuleHnNSF"""
+        sin_gen = source.l_sin_gen
+        fast = cls(
+            sin_gen.sampling_rate,
+            sin_gen.harmonic_num,
+            sin_gen.sine_amp,
+            sin_gen.noise_std,
+            sin_gen.voiced_threshold,
+            source.is_half,
+            seed,
+        )
+        fast.l_linear = source.l_linear
+        return fast
+
+    def _multiplier(self, count: int, like: torch.Tensor):
+        """Cached arange(1, count + 1) on the device and dtype of `like`"""
+        key = str(count) + str(like.device) + str(like.dtype)
+        if key not in self._multipliers:
+            self._multipliers[key] = torch.arange(
+                1, count + 1, dtype=like.dtype, device=like.device
+            )
+        return self._multipliers[key]
+
+    def forward(self, x: torch.Tensor, upp: int = 1):
+        generator: Optional[torch.Generator] = None
+        seed = self.seed
+        if seed is not None:
+            generator = torch.Generator(device=x.device)
+            generator.manual_seed(seed)
+
+        with torch.no_grad():
+            f0 = x.unsqueeze(-1)  # [b, frames, 1]
+            batch, frames = f0.shape[0], f0.shape[1]
+
+            # Phase in cycles: within-frame ramp plus the wrapped phase at each frame start
+            rad = f0 / self.sampling_rate * self._multiplier(upp, f0)
+            rad_acc = torch.fmod(rad[:, :-1, -1:].float() + 0.5, 1.0) - 0.5
+            rad[:, 1:] += rad_acc.cumsum(dim=1).fmod(1.0).to(f0)
+            rad = rad.reshape(batch, -1, 1)
+            if self.dim > 1:
+                rad = rad * self._multiplier(self.dim, f0).reshape(1, 1, -1)
+            rand_ini = torch.rand(1, 1, self.dim, device=f0.device, generator=generator)
+            if self.dim > 1:
+                rand_ini[..., 0] = 0
+                rad += rand_ini
+            sine = rad.mul_(2 * math.pi).sin_().mul_(self.sine_amp)
+
+            # Voicing and noise amplitude per frame, broadcast over the frame's samples
+            uv = (f0 > self.voiced_threshold).to(f0.dtype)
+            noise_amp = uv * self.noise_std + (1 - uv) * self.sine_amp / 3
+            noise = torch.randn(sine.shape, dtype=sine.dtype, device=sine.device, generator=generator)
+            noise.view(batch, frames, -1).mul_(noise_amp)
+            sine.view(batch, frames, -1).mul_(uv)
+            sine.add_(noise)
+
+        sine = sine.to(dtype=self.l_linear.weight.dtype)
+        return self.l_tanh(self.l_linear(sine)), None, None
+
+
 class GeneratorNSF(torch.nn.Module):
     def __init__(
         self,
@@ -570,6 +674,11 @@ class GeneratorNSF(torch.nn.Module):
         for l in self.resblocks:
             l.remove_weight_norm()
 
+    def use_fast_source(self, seed: Optional[int] = None):
+        """Switch the excitation to SourceModuleHnNSFFast (same weights)"""
+        if not isinstance(self.m_source, SourceModuleHnNSFFast):
+            self.m_source = SourceModuleHnNSFFast.from_module(self.m_source, seed)
+
     def __prepare_scriptable__(self):
         for l in self.ups:
             for hook in l._forward_pre_hooks.values():
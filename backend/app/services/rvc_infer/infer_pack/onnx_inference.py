@@ -5,11 +5,15 @@ import soundfile
 
 import logging
 
+from .F0Predictor import get_f0_predictor
+
 logger = logging.getLogger(__name__)
 
 
 class ContentVec:
-    def __init__(self, vec_path="pretrained/vec-768-layer-12.onnx", device=None):
+    def __init__(
+        self, vec_path="pretrained/vec-768-layer-12.onnx", device=None, sess_options=None
+    ):
         logger.info("Load model(s) from {}".format(vec_path))
         if device == "cpu" or device is None:
             providers = ["CPUExecutionProvider"]
@@ -19,7 +23,10 @@ class ContentVec:
             providers = ["DmlExecutionProvider"]
         else:
             raise RuntimeError("Unsportted Device")
-        self.model = onnxruntime.InferenceSession(vec_path, providers=providers)
+        self.model = onnxruntime.InferenceSession(
+            vec_path, sess_options=sess_options, providers=providers
+        )
+        self.input_name = self.model.get_inputs()[0].name
 
     def __call__(self, wav):
         return self.forward(wav)
@@ -30,35 +37,18 @@ class ContentVec:
             feats = feats.mean(-1)
         assert feats.ndim == 1, feats.ndim
         feats = np.expand_dims(np.expand_dims(feats, 0), 0)
-        onnx_input = {self.model.get_inputs()[0].name: feats}
+        onnx_input = {self.input_name: feats}
         logits = self.model.run(None, onnx_input)[0]
         return logits.transpose(0, 2, 1)
 
-
-def get_f0_predictor(f0_predictor, hop_length, sampling_rate, **kargs):
-    if f0_predictor == "pm":
-        from lib.infer_pack.modules.F0Predictor.PMF0Predictor import PMF0Predictor
-
-        f0_predictor_object = PMF0Predictor(
-            hop_length=hop_length, sampling_rate=sampling_rate
-        )
-    elif f0_predictor == "harvest":
-        from lib.infer_pack.modules.F0Predictor.HarvestF0Predictor import (
-            HarvestF0Predictor,
-        )
-
-        f0_predictor_object = HarvestF0Predictor(
-            hop_length=hop_length, sampling_rate=sampling_rate
-        )
-    elif f0_predictor == "dio":
-        from lib.infer_pack.modules.F0Predictor.DioF0Predictor import DioF0Predictor
-
-        f0_predictor_object = DioF0Predictor(
-            hop_length=hop_length, sampling_rate=sampling_rate
-        )
-    else:
-        raise Exception("Unknown f0 predictor")
-    return f0_predictor_object
+    def forward_batch(self, wavs):
+        """
+        input: wavs:[batch, signal_length] float32 at 16 kHz
+        output: feats:[batch, frames, dim]
+        """
+        assert wavs.ndim == 2, wavs.ndim
+        onnx_input = {self.input_name: np.expand_dims(wavs, 1)}
+        return self.model.run(None, onnx_input)[0]
 
 
 class OnnxRVC:
@@ -69,6 +59,7 @@ class OnnxRVC:
         hop_size=512,
         vec_path="vec-768-layer-12",
         device="cpu",
+        sess_options=None,
     ):
         vec_path = f"pretrained/{vec_path}.onnx"
         self.vec_model = ContentVec(vec_path, device)
@@ -80,19 +71,17 @@ class OnnxRVC:
             providers = ["DmlExecutionProvider"]
         else:
             raise RuntimeError("Unsportted Device")
-        self.model = onnxruntime.InferenceSession(model_path, providers=providers)
+        self.model = onnxruntime.InferenceSession(
+            model_path, sess_options=sess_options, providers=providers
+        )
+        self.input_names = [i.name for i in self.model.get_inputs()]
         self.sampling_rate = sr
         self.hop_size = hop_size
 
     def forward(self, hubert, hubert_length, pitch, pitchf, ds, rnd):
-        onnx_input = {
-            self.model.get_inputs()[0].name: hubert,
-            self.model.get_inputs()[1].name: hubert_length,
-            self.model.get_inputs()[2].name: pitch,
-            self.model.get_inputs()[3].name: pitchf,
-            self.model.get_inputs()[4].name: ds,
-            self.model.get_inputs()[5].name: rnd,
-        }
+        onnx_input = dict(
+            zip(self.input_names, (hubert, hubert_length, pitch, pitchf, ds, rnd))
+        )
         return (self.model.run(None, onnx_input)[0] * 32767).astype(np.int16)
 
     def inference(
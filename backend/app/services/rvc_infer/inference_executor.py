@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+
+import os
+import time
+import heapq
+import asyncio
+import functools
+import logging
+import threading
+import torch
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Priority classes in dispatch order: live and short clips ahead of batch work
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BATCH = "batch"
+PRIORITIES = (PRIORITY_INTERACTIVE, PRIORITY_BATCH)
+
+# Retry-After when no job has finished yet to measure the real-time factor
+DEFAULT_RETRY_AFTER = 5.0
+
+
+class InferenceQueueFull(RuntimeError):
+    """Raised by `InferenceExecutor.submit` when the queue is at its limit; `retry_after` is in seconds"""
+
+    def __init__(self, message: str, retry_after: float = DEFAULT_RETRY_AFTER):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def limit_threads(num_threads: int):
+    """Cap torch intra-op and FAISS OpenMP threads for the calling thread"""
+    torch.set_num_threads(num_threads)
+    try:
+        import faiss
+        faiss.omp_set_num_threads(num_threads)
+    except ImportError:
+        pass
+
+
+class _Job:
+    """A queued call and the future its caller waits on"""
+
+    __slots__ = (
+        "key", "fn", "args", "kwargs", "priority", "owner", "audio_seconds", "future", "submitted", "started",
+        "on_start"
+    )
+
+    def __init__(
+        self,
+        key: Hashable,
+        fn: Callable,
+        args: Tuple,
+        kwargs: Dict[str, Any],
+        priority: str,
+        owner: Optional[str],
+        audio_seconds: float
+    ):
+        self.key = key
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.priority = priority
+        self.owner = owner
+        self.audio_seconds = audio_seconds
+        self.future: Future = Future()
+        self.submitted = time.monotonic()
+        self.started = 0.0
+        self.on_start: Optional[Callable[[], None]] = None
+
+
+class InferenceExecutor:
+    """
+    Bounded pool of inference workers with a fixed share of the cores each
+
+    The cores are split among `workers` threads, each capped at
+    `threads_per_worker` torch/FAISS threads, so concurrent conversions do
+    not oversubscribe the CPU. Jobs carry a key (the model path) and at most
+    `per_model` jobs of one key run at a time; a worker skips jobs whose
+    model is busy rather than blocking on them.
+
+    Free workers take interactive jobs before batch jobs (a batch job that
+    has waited `promote_after` seconds counts as interactive), and within a
+    class the owner with the fewest running jobs, then the one served least
+    recently, goes first. At most `max_queue` jobs may wait, and the last
+    `interactive_reserve` of those places are kept for interactive jobs;
+    beyond that `submit` raises `InferenceQueueFull` with a Retry-After
+    estimate from the measured real-time factor.
+    """
+
+    def __init__(
+        self,
+        workers: int = 0,
+        threads_per_worker: int = 0,
+        max_queue: int = 32,
+        per_model: int = 2,
+        interactive_reserve: int = 8,
+        promote_after: float = 120.0
+    ):
+        cores = os.cpu_count() or 1
+        self.workers = workers or max(1, cores // 4)
+        self.threads_per_worker = threads_per_worker or max(1, cores // self.workers)
+        self.max_queue = max_queue
+        self.per_model = max(per_model, 1)
+        self.interactive_reserve = min(interactive_reserve, max_queue - 1) if max_queue else 0
+        self.promote_after = promote_after
+
+        self._cond = threading.Condition()
+        self._queue: Deque[_Job] = deque()
+        self._active: List[_Job] = []
+        self._running: Dict[Hashable, int] = {}
+        self._owner_running: Dict[Optional[str], int] = {}
+        self._owner_served: Dict[Optional[str], float] = {}
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._wait_seconds = 0.0
+        self._rtf: Optional[float] = None  # run seconds per audio second, moving average
+        self._mean_run: Optional[float] = None  # run seconds per job, moving average
+        self._shutdown = False
+        self._threads: List[threading.Thread] = []
+
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"rvc-infer-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+        logger.info(
+            f"Inference executor: {self.workers} workers x {self.threads_per_worker} threads, "
+            f"queue {self.max_queue} ({self.interactive_reserve} reserved for interactive jobs), "
+            f"{self.per_model} per model"
+        )
+
+    def submit(
+        self,
+        key: Hashable,
+        fn: Callable,
+        *args,
+        priority: str = PRIORITY_BATCH,
+        owner: Optional[str] = None,
+        audio_seconds: float = 0.0,
+        **kwargs
+    ) -> Future:
+        """
+        Queue `fn(*args, **kwargs)` to run on a worker once `key` has a free slot
+
+        `priority` is one of PRIORITIES, `owner` identifies the user for fair
+        sharing and `audio_seconds` (input duration, 0 if unknown) feeds the
+        real-time factor and wait estimates.
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}")
+        return self._enqueue(_Job(key, fn, args, kwargs, priority, owner, audio_seconds))
+
+    def admit(self, priority: str = PRIORITY_BATCH):
+        """Raise `InferenceQueueFull` if a job of `priority` would be rejected right now"""
+        with self._cond:
+            self._admit(priority, count=False)
+
+    async def run(
+        self,
+        key: Hashable,
+        fn: Callable,
+        *args,
+        priority: str = PRIORITY_BATCH,
+        owner: Optional[str] = None,
+        audio_seconds: float = 0.0,
+        timeout: Optional[float] = None,
+        **kwargs
+    ) -> Any:
+        """
+        Await `fn(*args, **kwargs)` on a worker (see `submit`)
+
+        `timeout` limits the seconds the job may run once a worker has started
+        it; time spent queued does not count, as admission already bounds the
+        queue. On timeout `asyncio.TimeoutError` is raised and the job is left
+        to finish on its worker.
+        """
+        if timeout is None:
+            future = self.submit(
+                key, fn, *args, priority=priority, owner=owner, audio_seconds=audio_seconds, **kwargs
+            )
+            return await asyncio.wrap_future(future)
+
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}")
+        loop = asyncio.get_running_loop()
+        started = asyncio.Event()
+        job = _Job(key, fn, args, kwargs, priority, owner, audio_seconds)
+        job.on_start = functools.partial(loop.call_soon_threadsafe, started.set)
+        result = asyncio.wrap_future(self._enqueue(job))
+        waiter = asyncio.ensure_future(started.wait())
+        try:
+            await asyncio.wait((result, waiter), return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            # Drop the job if it is still queued
+            result.cancel()
+            raise
+        finally:
+            waiter.cancel()
+        return await asyncio.wait_for(result, timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, running jobs per model and totals"""
+        with self._cond:
+            queued: Dict[str, int] = {}
+            by_priority = {priority: 0 for priority in PRIORITIES}
+            for job in self._queue:
+                queued[str(job.key)] = queued.get(str(job.key), 0) + 1
+                by_priority[job.priority] += 1
+            finished = self._completed + self._failed
+            return {
+                "workers": self.workers,
+                "threads_per_worker": self.threads_per_worker,
+                "queue_limit": self.max_queue,
+                "interactive_reserve": self.interactive_reserve,
+                "per_model_limit": self.per_model,
+                "queued": len(self._queue),
+                "queued_by_priority": by_priority,
+                "running": sum(self._running.values()),
+                "owners": len({job.owner for job in self._queue} | {job.owner for job in self._active}),
+                "models": {
+                    key: {"running": self._running.get(key, 0), "queued": queued.get(key, 0)}
+                    for key in set(queued) | {str(k) for k, n in self._running.items() if n}
+                },
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "avg_wait_ms": round(self._wait_seconds / finished * 1000, 1) if finished else 0.0,
+                "real_time_factor": round(self._rtf, 3) if self._rtf is not None else None,
+                "estimated_wait_seconds": {
+                    priority: round(self._estimate_dispatch_time(self._queued_ahead(priority) + 1), 1)
+                    for priority in PRIORITIES
+                },
+            }
+
+    def shutdown(self, wait: bool = True):
+        """Stop the workers after the queued jobs have run"""
+        with self._cond:
+            self._shutdown = True
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _enqueue(self, job: _Job) -> Future:
+        """Admit `job` to the queue and wake a worker"""
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("Inference executor is shut down")
+            self._admit(job.priority)
+            self._queue.append(job)
+            self._cond.notify_all()
+        return job.future
+
+    def _admit(self, priority: str, count: bool = True):
+        """Raise `InferenceQueueFull` if the queue has no place for `priority` (call with the lock held)"""
+        if not self.max_queue:
+            return
+        limit = self.max_queue if priority == PRIORITY_INTERACTIVE else self.max_queue - self.interactive_reserve
+        if len(self._queue) < limit:
+            return
+        if count:
+            self._rejected += 1
+        # A place opens once enough queued jobs have started to bring the queue under the limit
+        retry_after = self._estimate_dispatch_time(len(self._queue) - limit + 1)
+        raise InferenceQueueFull(
+            f"Inference queue is full ({len(self._queue)} jobs waiting, limit {limit} for {priority} jobs)",
+            retry_after=max(1.0, retry_after)
+        )
+
+    def _run_estimate(self, job: _Job) -> Optional[float]:
+        """Expected run seconds of a job from the measured real-time factor"""
+        if job.audio_seconds > 0 and self._rtf is not None:
+            return job.audio_seconds * self._rtf
+        return self._mean_run
+
+    def _estimate_dispatch_time(self, dispatches: int) -> float:
+        """
+        Seconds until `dispatches` more queued jobs have started (call with the lock held)
+
+        Replays the queue in dispatch order on the workers, each free once its
+        running job has used up its expected run time; ignores the per-model
+        limit. Falls back to DEFAULT_RETRY_AFTER per dispatch before any job
+        has finished.
+        """
+        if dispatches <= 0:
+            return 0.0
+        if self._mean_run is None:
+            return DEFAULT_RETRY_AFTER * dispatches
+        now = time.monotonic()
+        free_at = [max(0.0, self._run_estimate(job) - (now - job.started)) for job in self._active]
+        free_at += [0.0] * max(0, self.workers - len(free_at))
+        heapq.heapify(free_at)
+        queued = sorted(self._queue, key=lambda job: (self._rank_class(job), job.submitted))
+        start = 0.0
+        for i in range(dispatches):
+            start = heapq.heappop(free_at)
+            if i < len(queued):
+                heapq.heappush(free_at, start + self._run_estimate(queued[i]))
+            else:
+                break
+        return start
+
+    def _queued_ahead(self, priority: str) -> int:
+        """Queued jobs a new job of `priority` would wait behind (call with the lock held)"""
+        rank = PRIORITIES.index(priority)
+        return sum(1 for job in self._queue if self._rank_class(job) <= rank)
+
+    def _rank_class(self, job: _Job) -> int:
+        """Dispatch class of a job; batch jobs are promoted once they have waited `promote_after`"""
+        if job.priority == PRIORITY_BATCH and time.monotonic() - job.submitted >= self.promote_after:
+            return PRIORITIES.index(PRIORITY_INTERACTIVE)
+        return PRIORITIES.index(job.priority)
+
+    def _next_job(self) -> Optional[_Job]:
+        """Queued job to run next, among those whose model has a free slot (call with the lock held)"""
+        best, best_rank = None, None
+        for job in self._queue:
+            if self._running.get(job.key, 0) >= self.per_model:
+                continue
+            rank = (
+                self._rank_class(job),
+                self._owner_running.get(job.owner, 0),
+                self._owner_served.get(job.owner, 0.0),
+                job.submitted
+            )
+            if best is None or rank < best_rank:
+                best, best_rank = job, rank
+        if best is not None:
+            self._queue.remove(best)
+        return best
+
+    def _record_run(self, job: _Job, run_seconds: float):
+        """Update the real-time factor and mean run time (call with the lock held)"""
+        self._mean_run = run_seconds if self._mean_run is None else 0.8 * self._mean_run + 0.2 * run_seconds
+        if job.audio_seconds > 0:
+            rtf = run_seconds / job.audio_seconds
+            self._rtf = rtf if self._rtf is None else 0.8 * self._rtf + 0.2 * rtf
+
+    def _worker(self):
+        limit_threads(self.threads_per_worker)
+        while True:
+            with self._cond:
+                job = self._next_job()
+                while job is None:
+                    if self._shutdown and not self._queue:
+                        return
+                    self._cond.wait()
+                    job = self._next_job()
+                job.started = time.monotonic()
+                self._active.append(job)
+                self._running[job.key] = self._running.get(job.key, 0) + 1
+                self._owner_running[job.owner] = self._owner_running.get(job.owner, 0) + 1
+                self._owner_served[job.owner] = job.started
+                self._wait_seconds += job.started - job.submitted
+
+            failed = False
+            ran = job.future.set_running_or_notify_cancel()
+            if ran:
+                if job.on_start is not None:
+                    try:
+                        job.on_start()
+                    except RuntimeError:
+                        # The caller's event loop is closed; nobody is waiting
+                        pass
+                try:
+                    job.future.set_result(job.fn(*job.args, **job.kwargs))
+                except BaseException as e:
+                    failed = True
+                    job.future.set_exception(e)
+
+            with self._cond:
+                self._active.remove(job)
+                self._running[job.key] -= 1
+                if not self._running[job.key]:
+                    del self._running[job.key]
+                self._owner_running[job.owner] -= 1
+                if not self._owner_running[job.owner]:
+                    del self._owner_running[job.owner]
+                    if not any(queued.owner == job.owner for queued in self._queue):
+                        # An owner with nothing left counts as not served recently when it returns
+                        del self._owner_served[job.owner]
+                if failed:
+                    self._failed += 1
+                else:
+                    self._completed += 1
+                    if ran:
+                        self._record_run(job, time.monotonic() - job.started)
+                self._cond.notify_all()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+
+import os
+import time
+import logging
+import threading
+import numpy as np
+import torch
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def footprint(value: Any) -> int:
+    """Approximate resident bytes of a loaded model: tensors, modules, arrays and ONNX sessions"""
+    seen = set()
+
+    def tensor_bytes(tensor: torch.Tensor) -> int:
+        storage = tensor.untyped_storage()
+        if storage.data_ptr() in seen:
+            return 0
+        seen.add(storage.data_ptr())
+        return storage.nbytes()
+
+    def walk(obj: Any) -> int:
+        if isinstance(obj, torch.Tensor):
+            return tensor_bytes(obj)
+        if isinstance(obj, torch.nn.Module):
+            return sum(tensor_bytes(t) for t in obj.state_dict(keep_vars=True).values())
+        if isinstance(obj, np.ndarray):
+            # Memory-mapped arrays are backed by the page cache, not the process
+            return 0 if isinstance(obj, np.memmap) else obj.nbytes
+        if isinstance(obj, dict):
+            return sum(walk(v) for v in obj.values())
+        if isinstance(obj, (list, tuple)):
+            return sum(walk(v) for v in obj)
+        # ONNX Runtime sessions hold roughly their model file in memory
+        path = getattr(obj, "path", None)
+        if isinstance(path, str) and path.endswith(".onnx") and os.path.exists(path):
+            return os.path.getsize(path)
+        # FAISS indexes
+        if hasattr(obj, "ntotal") and hasattr(obj, "d"):
+            return int(obj.ntotal) * int(obj.d) * 4
+        return 0
+
+    return walk(value)
+
+
+@dataclass
+class ModelEntry:
+    """A loaded model and its bookkeeping"""
+    key: str
+    value: Any
+    nbytes: int
+    pinned: bool = False
+    loaded_at: float = field(default_factory=time.time)
+    last_used: float = field(default_factory=time.time)
+    hits: int = 0
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of loaded voice models with a RAM budget
+
+    Models are kept in least-recently-used order. After each load, unpinned
+    models are evicted from the cold end until the total footprint fits in
+    `max_bytes` (0 = unlimited). A single model larger than the budget is
+    still served; it is simply the next to go. Concurrent requests for the
+    same key share one load.
+    """
+
+    def __init__(self, max_bytes: int = 0):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, ModelEntry]" = OrderedDict()
+        self._pinned = set()
+        self._lock = threading.Lock()
+        self._loading: Dict[str, threading.Lock] = {}
+
+    def get(self, key: str, loader: Callable[[], Any]) -> Any:
+        """Return the model for `key`, calling `loader` on a miss"""
+        with self._lock:
+            value = self._touch(key)
+            if value is not None:
+                return value
+            load_lock = self._loading.setdefault(key, threading.Lock())
+
+        with load_lock:
+            # Another thread may have finished the same load while we waited
+            with self._lock:
+                value = self._touch(key)
+                if value is not None:
+                    return value
+
+            start = time.perf_counter()
+            try:
+                value = loader()
+            except Exception:
+                with self._lock:
+                    self._loading.pop(key, None)
+                raise
+            nbytes = footprint(value)
+            logger.info(
+                f"Loaded {os.path.basename(key)} in {time.perf_counter() - start:.2f}s "
+                f"({nbytes / 2**20:.0f} MB)"
+            )
+
+            with self._lock:
+                self._entries[key] = ModelEntry(key, value, nbytes, pinned=key in self._pinned)
+                self._loading.pop(key, None)
+                self._evict_over_budget(keep=key)
+        return value
+
+    def resize(self, key: str):
+        """Re-measure `key` after its model changed in place (e.g. an index was attached)"""
+        value = self.peek(key)
+        if value is None:
+            return
+        nbytes = footprint(value)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.value is value:
+                entry.nbytes = nbytes
+                self._evict_over_budget(keep=key)
+
+    def peek(self, key: str) -> Optional[Any]:
+        """The cached model for `key` without loading it or changing its LRU position"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.value if entry else None
+
+    def pin(self, key: str):
+        """Never evict `key` (also applies if it is loaded later)"""
+        with self._lock:
+            self._pinned.add(key)
+            if key in self._entries:
+                self._entries[key].pinned = True
+
+    def unpin(self, key: str):
+        """Make `key` evictable again"""
+        with self._lock:
+            self._pinned.discard(key)
+            if key in self._entries:
+                self._entries[key].pinned = False
+                self._evict_over_budget()
+
+    def evict(self, key: str, keep_pinned: bool = False) -> bool:
+        """Drop `key` from the cache (unless pinned and `keep_pinned`); in-flight requests keep their reference"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (keep_pinned and entry.pinned):
+                return False
+            del self._entries[key]
+            return True
+
+    def clear(self):
+        """Drop every model, pinned or not"""
+        with self._lock:
+            self._entries.clear()
+
+    def set_budget(self, max_bytes: int):
+        """Change the RAM budget and evict down to it"""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict_over_budget()
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(entry.nbytes for entry in self._entries.values())
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Loaded models, most recently used first"""
+        with self._lock:
+            return [
+                {
+                    "model_path": entry.key,
+                    "footprint_mb": round(entry.nbytes / 2**20, 1),
+                    "pinned": entry.pinned,
+                    "hits": entry.hits,
+                    "loaded_at": entry.loaded_at,
+                    "last_used": entry.last_used,
+                }
+                for entry in reversed(self._entries.values())
+            ]
+
+    def _touch(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        entry.hits += 1
+        entry.last_used = time.time()
+        return entry.value
+
+    def _evict_over_budget(self, keep: Optional[str] = None):
+        if self.max_bytes <= 0:
+            return
+        total = sum(entry.nbytes for entry in self._entries.values())
+        for key in list(self._entries):
+            if total <= self.max_bytes:
+                break
+            entry = self._entries[key]
+            if entry.pinned or key == keep:
+                continue
+            del self._entries[key]
+            total -= entry.nbytes
+            logger.info(f"Evicted {os.path.basename(key)} ({entry.nbytes / 2**20:.0f} MB) to stay within model budget")
+        if total > self.max_bytes:
+            logger.warning(
+                f"Loaded models use {total / 2**20:.0f} MB, over the {self.max_bytes / 2**20:.0f} MB budget "
+                "(pinned or just loaded)"
+            )
+
+
+# The registry shared by every processor in the process
+_registry = ModelRegistry()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Return the process-wide model registry"""
+    return _registry
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+
+import os
+import inspect
+import logging
+import threading
+import numpy as np
+from pathlib import Path
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+# Synthesizer execution backends; onnx currently covers F0 (NSF) checkpoints only
+BACKENDS = ("torch", "onnx")
+
+ONNX_INPUT_NAMES = ["phone", "phone_lengths", "pitch", "pitchf", "ds", "rnd"]
+ONNX_OPSET = 13
+
+# Process-wide synthesizer sessions, keyed by ONNX path
+_sessions: Dict[str, "OnnxSynthesizer"] = {}
+_sessions_lock = threading.Lock()
+
+
+def onnx_path(model_path: str) -> Path:
+    """Location of the exported ONNX synthesizer for a checkpoint"""
+    from .compiled_models import checkpoint_hash
+
+    path = Path(model_path)
+    return path.with_name(f"{path.stem}.{checkpoint_hash(model_path)}.onnx")
+
+
+def export_onnx(cpt: Dict[str, Any], model_path: str) -> Path:
+    """Export a loaded checkpoint through the models_onnx synthesizer and cache it next to the .pth"""
+    import torch
+    from .infer_pack.models_onnx import SynthesizerTrnMsNSFsidM
+
+    path = onnx_path(model_path)
+    version = cpt.get("version", "v1")
+    vec_channels = 256 if version == "v1" else 768
+
+    config = list(cpt["config"])
+    config[-3] = cpt["weight"]["emb_g.weight"].shape[0]
+    net_g = SynthesizerTrnMsNSFsidM(*config, is_half=False, version=version)
+    net_g.load_state_dict(cpt["weight"], strict=False)
+    net_g.eval()
+
+    frames = 200
+    dummy = (
+        torch.rand(1, frames, vec_channels),
+        torch.tensor([frames]).long(),
+        torch.randint(size=(1, frames), low=5, high=255),
+        torch.rand(1, frames),
+        torch.LongTensor([0]),
+        torch.rand(1, 192, frames),
+    )
+
+    # torch >= 2.5 can export through dynamo; keep the TorchScript exporter the graph was written for
+    options = {}
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        options["dynamo"] = False
+
+    tmp = path.with_name(f".{path.name}.{os.getpid()}")
+    logger.info(f"Exporting ONNX synthesizer: {path.name}")
+    with torch.no_grad():
+        torch.onnx.export(
+            net_g,
+            dummy,
+            str(tmp),
+            dynamic_axes={"phone": [1], "pitch": [1], "pitchf": [1], "rnd": [2]},
+            do_constant_folding=False,
+            opset_version=ONNX_OPSET,
+            input_names=ONNX_INPUT_NAMES,
+            output_names=["audio"],
+            **options,
+        )
+    os.replace(tmp, path)
+    logger.info(f"💾 Saved ONNX synthesizer: {path.name}")
+    return path
+
+
+class OnnxSynthesizer:
+    """ONNX Runtime synthesizer with the same inputs as the torch `infer` call, on NumPy arrays"""
+
+    def __init__(self, path: str, intra_op_threads: int = 0):
+        import onnxruntime
+
+        sess_options = onnxruntime.SessionOptions()
+        sess_options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        sess_options.execution_mode = onnxruntime.ExecutionMode.ORT_SEQUENTIAL
+        sess_options.intra_op_num_threads = intra_op_threads or (os.cpu_count() or 1)
+        sess_options.inter_op_num_threads = 1
+
+        self.path = path
+        self.session = onnxruntime.InferenceSession(
+            path, sess_options=sess_options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = [i.name for i in self.session.get_inputs()]
+        self.inter_channels = self.session.get_inputs()[5].shape[1]
+        if not isinstance(self.inter_channels, int):
+            self.inter_channels = 192
+
+    def infer(self, phone: np.ndarray, pitch: np.ndarray, nsff0: np.ndarray, sid: int) -> np.ndarray:
+        """Convert one item: phone [frames, dim], pitch [frames] (coarse), nsff0 [frames] (Hz)"""
+        frames = len(phone)
+        # Same prior noise as the torch infer(): N(0, 1) scaled by 0.66666
+        rnd = np.random.randn(1, self.inter_channels, frames).astype(np.float32) * 0.66666
+        inputs = (
+            np.ascontiguousarray(phone, dtype=np.float32)[None],
+            np.array([frames], dtype=np.int64),
+            np.asarray(pitch, dtype=np.int64)[None],
+            np.asarray(nsff0, dtype=np.float32)[None],
+            np.array([sid], dtype=np.int64),
+            rnd,
+        )
+        audio = self.session.run(None, dict(zip(self.input_names, inputs)))[0]
+        return audio.reshape(-1)
+
+
+def get_onnx_synthesizer(path: str, intra_op_threads: int = 0) -> OnnxSynthesizer:
+    """Return the shared session for an exported synthesizer"""
+    with _sessions_lock:
+        synthesizer = _sessions.get(path)
+        if synthesizer is None:
+            synthesizer = OnnxSynthesizer(path, intra_op_threads)
+            _sessions[path] = synthesizer
+            logger.info(f"✅ ONNX synthesizer session ready: {Path(path).name}")
+        return synthesizer
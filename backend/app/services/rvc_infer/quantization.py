@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+
+import os
+import logging
+import numpy as np
+import torch
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from .compiled_models import checkpoint_hash
+
+logger = logging.getLogger(__name__)
+
+# Synthesizer submodules whose Conv1d and Linear layers can be quantized.
+# The decoder runs at the audio sample rate, where fbgemm's int8 Conv1d was
+# slower than fp32 on the hosts we measured, so it is opt-in.
+QUANTIZABLE_SUBMODULES = ("enc_p", "flow", "dec")
+DEFAULT_QUANTIZED_SUBMODULES = ("enc_p", "flow")
+# The NSF source module reads its own weight dtype and stays in fp32
+SKIPPED_SUBMODULES = ("m_source",)
+
+CALIBRATION_EXTENSIONS = (".wav", ".flac", ".mp3", ".ogg")
+
+
+def quantized_path(model_path: str, submodules: Sequence[str] = DEFAULT_QUANTIZED_SUBMODULES) -> Path:
+    """Location of the int8 synthesizer for a checkpoint, submodule set and the running torch version"""
+    path = Path(model_path)
+    torch_version = torch.__version__.replace("+", "_")
+    parts = "-".join(submodules)
+    return path.with_name(f"{path.stem}.{checkpoint_hash(model_path)}.torch-{torch_version}.int8-{parts}.pt")
+
+
+def calibration_clips(
+    calibration_dir: str,
+    sr: int,
+    max_clips: int = 8,
+    max_seconds: float = 10.0
+) -> List[np.ndarray]:
+    """
+    Calibration audio at `sr`: up to `max_clips` files from `calibration_dir`,
+    or a synthetic voiced glide when the directory has no audio
+    """
+    clips = []
+    directory = Path(calibration_dir)
+    if directory.is_dir():
+        import librosa
+
+        for path in sorted(directory.iterdir()):
+            if path.suffix.lower() not in CALIBRATION_EXTENSIONS:
+                continue
+            try:
+                audio, _ = librosa.load(str(path), sr=sr, duration=max_seconds)
+                clips.append(audio)
+            except Exception as e:
+                logger.warning(f"Skipping calibration clip {path.name}: {e}")
+            if len(clips) >= max_clips:
+                break
+    if clips:
+        return clips
+
+    logger.info(f"No calibration audio in {calibration_dir}, using a synthetic voiced glide")
+    t = np.arange(int(sr * 4.0)) / sr
+    # 110 -> 440 Hz glide with vibrato, 1/h harmonics and a little breath noise
+    f0 = 110.0 * 4.0 ** (t / t[-1]) * (1 + 0.02 * np.sin(2 * np.pi * 5.5 * t))
+    phase = 2 * np.pi * np.cumsum(f0) / sr
+    harmonics = np.arange(1, 21)[:, None]
+    voiced = (np.sin(harmonics * phase) / harmonics * (harmonics * f0 < sr / 2)).sum(axis=0)
+    rng = np.random.default_rng(0)
+    audio = 0.3 * voiced / np.abs(voiced).max() + 0.01 * rng.standard_normal(len(t))
+    return [audio.astype(np.float32)]
+
+
+def _wrap_layers(module: torch.nn.Module, qconfig) -> int:
+    """Wrap every Conv1d and Linear below `module` in a QuantWrapper carrying `qconfig`"""
+    from torch.ao.quantization import QuantWrapper
+
+    wrapped = 0
+    for name, child in module.named_children():
+        if name in SKIPPED_SUBMODULES:
+            continue
+        if type(child) in (torch.nn.Conv1d, torch.nn.Linear):
+            wrapper = QuantWrapper(child)
+            wrapper.qconfig = qconfig
+            setattr(module, name, wrapper)
+            wrapped += 1
+        else:
+            wrapped += _wrap_layers(child, qconfig)
+    return wrapped
+
+
+def _prepare(net_g: torch.nn.Module, submodules: Sequence[str]) -> torch.nn.Module:
+    """Fold weight norm, wrap quantizable layers and insert observers"""
+    from torch.ao.quantization import get_default_qconfig, prepare
+
+    engines = torch.backends.quantized.supported_engines
+    engine = "x86" if "x86" in engines else ("fbgemm" if "fbgemm" in engines else "qnnpack")
+    torch.backends.quantized.engine = engine
+
+    net_g = net_g.cpu().eval()
+    try:
+        net_g.remove_weight_norm()
+    except ValueError:
+        # Already folded (e.g. by an earlier compile step)
+        pass
+
+    unknown = set(submodules) - set(QUANTIZABLE_SUBMODULES)
+    if unknown:
+        raise ValueError(
+            f"Unknown submodules: {', '.join(sorted(unknown))} (available: {', '.join(QUANTIZABLE_SUBMODULES)})"
+        )
+
+    qconfig = get_default_qconfig(engine)
+    wrapped = sum(_wrap_layers(getattr(net_g, name), qconfig) for name in submodules)
+    logger.info(f"Quantizing {wrapped} layers to int8 ({engine})")
+    return prepare(net_g, inplace=True)
+
+
+def load_quantized(
+    net_g: torch.nn.Module,
+    model_path: str,
+    submodules: Sequence[str] = DEFAULT_QUANTIZED_SUBMODULES
+) -> Optional[torch.nn.Module]:
+    """
+    Turn a freshly built fp32 synthesizer into the saved int8 variant
+
+    Returns None if there is no usable artifact; `net_g` must then be rebuilt
+    before calling `quantize_synthesizer`.
+    """
+    from torch.ao.quantization import convert
+
+    path = quantized_path(model_path, submodules)
+    if not path.exists():
+        return None
+    try:
+        state = torch.load(str(path), map_location="cpu")
+        net_g = convert(_prepare(net_g, submodules), inplace=True)
+        net_g.load_state_dict(state)
+        logger.info(f"✅ Loaded int8 synthesizer: {path.name}")
+        return net_g.eval()
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable int8 artifact {path.name}: {e}")
+        return None
+
+
+def quantize_synthesizer(
+    net_g: torch.nn.Module,
+    model_path: str,
+    calibration: List[Dict[str, Any]],
+    submodules: Sequence[str] = DEFAULT_QUANTIZED_SUBMODULES
+) -> torch.nn.Module:
+    """
+    Statically quantize a CPU synthesizer to int8 and save it next to the checkpoint
+
+    Every Conv1d and Linear in `submodules` is wrapped with its own
+    quantize/dequantize pair. Activation ranges come from
+    running `infer` on the `calibration` inputs (keyword arguments for
+    `net_g.infer`). Transposed convolutions, embeddings and the NSF source
+    stay in fp32. Only the quantized state dict is saved; `load_quantized`
+    rebuilds the module structure around it.
+    """
+    from torch.ao.quantization import convert
+
+    net_g = _prepare(net_g, submodules)
+    with torch.no_grad():
+        for inputs in calibration:
+            net_g.infer(**inputs)
+    convert(net_g, inplace=True)
+    logger.info(f"Calibrated int8 synthesizer on {len(calibration)} clips")
+
+    path = quantized_path(model_path, submodules)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}")
+    try:
+        torch.save(net_g.state_dict(), str(tmp))
+        os.replace(tmp, path)
+        logger.info(f"💾 Saved int8 synthesizer: {path.name}")
+    except OSError as e:
+        logger.warning(f"Could not save int8 artifact next to {model_path}: {e}")
+        tmp.unlink(missing_ok=True)
+
+    return net_g
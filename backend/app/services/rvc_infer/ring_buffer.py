@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+import logging
+import threading
+from typing import Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class SampleRingBuffer:
+    """
+    Preallocated single-producer/single-consumer ring of audio samples
+
+    One thread writes (e.g. the audio device callback) and one thread reads
+    (the processing loop). Neither takes a lock: the producer only moves
+    the write position and the consumer only moves the read position, each
+    after its own copy is done, so the other side never sees a half-written
+    region. Positions count samples since the start and never wrap; the
+    buffer index is the position modulo `capacity`.
+
+    A full ring never blocks the producer: samples that do not fit are
+    dropped and counted in `overruns`. The consumer sleeps in `wait` until
+    the number of samples it asked for is available, and can read them
+    without copying (`peek` + `advance`) or into its own preallocated
+    array (`read_into`).
+    """
+
+    def __init__(self, capacity: int, dtype=np.float32):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = int(capacity)
+        self._data = np.zeros(self.capacity, dtype=dtype)
+        self._write = 0
+        self._read = 0
+        self._wanted = 1
+        self._ready = threading.Event()
+        self._closed = False
+        self.overruns = 0
+
+    def __len__(self) -> int:
+        """Samples available to read"""
+        return self._write - self._read
+
+    @property
+    def free(self) -> int:
+        return self.capacity - (self._write - self._read)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def write(self, samples: np.ndarray) -> int:
+        """
+        Append samples (producer side); returns how many were stored
+
+        Multi-channel input of shape (frames, channels) is mixed down to mono
+        straight into the ring.
+        """
+        count = min(len(samples), self.free)
+        if count < len(samples):
+            self.overruns += len(samples) - count
+        if count:
+            start = self._write % self.capacity
+            first = min(count, self.capacity - start)
+            self._store(self._data[start:start + first], samples[:first])
+            if count > first:
+                self._store(self._data[:count - first], samples[first:count])
+            self._write += count
+        if len(self) >= self._wanted:
+            self._ready.set()
+        return count
+
+    def wait(self, count: int, timeout: Optional[float] = None) -> bool:
+        """Block until `count` samples are available (consumer side); False on timeout or close"""
+        count = min(max(int(count), 1), self.capacity)
+        self._wanted = count
+        self._ready.clear()
+        # The producer sets the event after its write, so data written since the clear is never missed
+        if len(self) >= count:
+            return True
+        self._ready.wait(timeout)
+        return len(self) >= count and not self._closed
+
+    def peek(self, count: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Views of the next `count` samples without consuming them
+
+        The second view is empty unless the region wraps around the end of
+        the ring. Valid until `advance`.
+        """
+        count = min(count, len(self))
+        start = self._read % self.capacity
+        first = min(count, self.capacity - start)
+        return self._data[start:start + first], self._data[:count - first]
+
+    def advance(self, count: int):
+        """Consume `count` samples (after reading them with `peek`)"""
+        self._read += min(count, len(self))
+
+    def read_into(self, out: np.ndarray) -> int:
+        """Copy up to len(out) samples into `out` and consume them; returns how many"""
+        head, tail = self.peek(len(out))
+        out[:len(head)] = head
+        out[len(head):len(head) + len(tail)] = tail
+        count = len(head) + len(tail)
+        self.advance(count)
+        return count
+
+    def discard_oldest(self, keep: int) -> int:
+        """Drop all but the newest `keep` samples (consumer side); returns how many were dropped"""
+        dropped = max(len(self) - keep, 0)
+        self.advance(dropped)
+        return dropped
+
+    def clear(self):
+        """Drop everything available (consumer side)"""
+        self.advance(len(self))
+
+    def close(self):
+        """Wake the consumer for good, e.g. when stopping"""
+        self._closed = True
+        self._ready.set()
+
+    @staticmethod
+    def _store(target: np.ndarray, samples: np.ndarray):
+        if samples.ndim > 1:
+            np.mean(samples, axis=1, out=target)
+        else:
+            target[:] = samples
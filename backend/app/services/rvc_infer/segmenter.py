@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+
+import logging
+import numpy as np
+from typing import List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Energy frames are 10 ms long; cut points are chosen on this grid
+ENERGY_FRAMES_PER_SECOND = 100
+
+
+def fit_length(audio: np.ndarray, length: int) -> np.ndarray:
+    """Truncate or zero-pad audio to exactly `length` samples"""
+    if len(audio) >= length:
+        return audio[:length]
+    return np.pad(audio, (0, length - len(audio)))
+
+
+def plan_segments(
+    audio: np.ndarray,
+    sr: int,
+    segment_seconds: float,
+    overlap_seconds: float,
+    search_seconds: float = 1.0,
+    first_segment_seconds: Optional[float] = None,
+) -> List[Tuple[int, int]]:
+    """
+    Plan overlapping (start, end) sample ranges for segmented inference
+
+    Cuts are placed near every `segment_seconds` at the quietest point within
+    `search_seconds` of the target, and neighbouring ranges share
+    `overlap_seconds` of audio centred on the cut for crossfading. A shorter
+    `first_segment_seconds` moves the first cut forward so streamed output
+    can start early.
+    """
+    total = len(audio)
+    segment = int(segment_seconds * sr)
+    first = int(first_segment_seconds * sr) if first_segment_seconds else segment
+    half_overlap = int(overlap_seconds * sr) // 2
+
+    # Short inputs (or a tail shorter than half a segment, or than half the first one if that is shorter)
+    # stay in one piece
+    tail = min(segment, first) // 2
+    if segment <= 0 or first <= 0 or total <= first + tail:
+        return [(0, total)]
+
+    hop = max(sr // ENERGY_FRAMES_PER_SECOND, 1)
+    n_frames = total // hop
+    frames = audio[: n_frames * hop].reshape(n_frames, hop)
+    energy = np.einsum("ij,ij->i", frames, frames)
+    energy = np.convolve(energy, np.ones(5) / 5, mode="same")
+
+    # Never search further than a quarter segment so cuts stay ordered
+    search = max(min(int(search_seconds * sr), min(segment, first) // 4) // hop, 1)
+
+    cuts = []
+    target = first
+    while total - target > tail:
+        center = target // hop
+        lo = max(center - search, 1)
+        hi = min(center + search, n_frames - 1)
+        cut = (lo + int(np.argmin(energy[lo:hi]))) * hop if hi > lo else target
+        cuts.append(cut)
+        target = cut + segment
+
+    bounds = [0] + cuts + [total]
+    ranges = []
+    for i in range(len(bounds) - 1):
+        start = max(bounds[i] - half_overlap, 0) if i > 0 else 0
+        end = min(bounds[i + 1] + half_overlap, total) if i < len(bounds) - 2 else total
+        ranges.append((start, end))
+
+    logger.info(f"Planned {len(ranges)} segments for {total / sr:.1f}s of audio")
+    return ranges
+
+
+class SegmentStitcher:
+    """Crossfade converted segments in order, emitting samples as soon as they are final"""
+
+    def __init__(self, ranges: Sequence[Tuple[int, int]]):
+        self.ranges = list(ranges)
+        self._index = 0
+        self._tail = np.zeros(0, dtype=np.float32)
+
+    @property
+    def done(self) -> bool:
+        return self._index >= len(self.ranges)
+
+    def push(self, piece: np.ndarray) -> np.ndarray:
+        """Add the next converted segment and return the samples that are now final"""
+        start, end = self.ranges[self._index]
+        piece = fit_length(np.asarray(piece, dtype=np.float32), end - start)
+
+        fade = len(self._tail)
+        if fade:
+            ramp = (np.arange(fade, dtype=np.float32) + 0.5) / fade
+            head = self._tail * (1.0 - ramp) + piece[:fade] * ramp
+            emit = np.concatenate([head, piece[fade:]])
+        else:
+            emit = piece
+
+        self._index += 1
+        if not self.done:
+            # Hold back the part that overlaps the next segment
+            hold = end - self.ranges[self._index][0]
+            self._tail = emit[len(emit) - hold :].copy()
+            emit = emit[: len(emit) - hold]
+        else:
+            self._tail = np.zeros(0, dtype=np.float32)
+
+        return emit
+
+
+def crossfade_join(pieces: Sequence[np.ndarray], ranges: Sequence[Tuple[int, int]]) -> np.ndarray:
+    """Join converted segments planned by `plan_segments` into one signal"""
+    stitcher = SegmentStitcher(ranges)
+    return np.concatenate([stitcher.push(piece) for piece in pieces])
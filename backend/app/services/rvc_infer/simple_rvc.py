@@ -2,13 +2,41 @@
 
 import os
 import sys
+import time
 import logging
+import threading
 import torch
 import numpy as np
 import soundfile as sf
 import librosa
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Tuple, Dict, Any
+from typing import Optional, Tuple, Dict, Any, List, Callable
+
+from .segmenter import fit_length, plan_segments, SegmentStitcher
+from .index_retrieval import IndexRetriever
+from .batcher import MicroBatcher
+from .analysis_cache import AnalysisCache, audio_key, file_key
+from .checkpoint import build_synthesizer, checkpoint_metadata, load_checkpoint
+from .model_registry import get_model_registry
+from .inference_executor import limit_threads
+from .compiled_models import INFERENCE_MODES, compile_synthesizer, load_scripted
+from .quantization import (
+    DEFAULT_QUANTIZED_SUBMODULES,
+    calibration_clips,
+    load_quantized,
+    quantize_synthesizer,
+    quantized_path,
+)
+from .onnx_backend import BACKENDS, OnnxSynthesizer, export_onnx, get_onnx_synthesizer, onnx_path
+from .infer_pack.F0Predictor import F0_PREDICTORS, get_f0_predictor
+from .content_features import (
+    CONTENT_HOP,
+    CONTENT_SR,
+    ContentFeatureExtractor,
+    content_dim,
+    legacy_mel_features,
+)
 
 # Add the RVC infer_pack to the path
 current_dir = Path(__file__).parent
@@ -41,27 +69,133 @@ except ImportError as e:
         def __init__(self, *args, **kwargs):
             pass
 
+# Synthesizer frame rate (content features and F0 frames per second)
+SYNTH_FPS = 100
+
+# Pitch embedding range used by the synthesizers (coarse pitch 1..255, 0 is unvoiced)
+F0_MIN = 50.0
+F0_MAX = 1100.0
+F0_MEL_MIN = 1127 * np.log(1 + F0_MIN / 700)
+F0_MEL_MAX = 1127 * np.log(1 + F0_MAX / 700)
+
+
+def coarse_pitch(f0: np.ndarray) -> np.ndarray:
+    """Quantise F0 in Hz to the mel-scale bins expected by the pitch embedding"""
+    f0_mel = 1127 * np.log(1 + f0 / 700)
+    voiced = f0_mel > 0
+    f0_mel[voiced] = (f0_mel[voiced] - F0_MEL_MIN) * 254 / (F0_MEL_MAX - F0_MEL_MIN) + 1
+    return np.clip(np.rint(f0_mel), 1, 255).astype(np.int64)
+
 class SimpleRVCProcessor:
     """Simplified RVC Processor that works with our existing setup"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        segment_seconds: float = 0.0,
+        overlap_seconds: float = 0.5,
+        segment_workers: int = 0,
+        stream_first_segment_seconds: float = 5.0,
+        content_model_dir: str = "pretrained",
+        content_threads: int = 0,
+        content_window_seconds: float = 10.0,
+        content_batch_size: int = 8,
+        index_rate: float = 0.75,
+        index_k: int = 8,
+        index_nprobe: int = 1,
+        batch_max_size: int = 8,
+        batch_wait_ms: float = 10.0,
+        batch_max_frames: int = 12000,
+        analysis_cache_dir: str = "cache/analysis",
+        analysis_cache_mb: int = 2048,
+        f0_method: str = "yin",
+        inference_mode: str = "eager",
+        quant_modules: Tuple[str, ...] = DEFAULT_QUANTIZED_SUBMODULES,
+        quant_calibration_dir: str = "samples/calibration",
+        backend: str = "torch",
+        onnx_threads: int = 0,
+        intra_op_threads: int = 0
+    ):
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self.loaded_models: Dict[str, Dict[str, Any]] = {}
+        
+        # Loaded models live in the process-wide registry, whose budget the server sets;
+        # the keys requested through this processor are what `cleanup` releases
+        self.models = get_model_registry()
+        self._model_keys = set()
+        self._index_lock = threading.Lock()
+        
+        # Segmented inference for long inputs (0 disables segmentation)
+        self.segment_seconds = segment_seconds
+        self.overlap_seconds = overlap_seconds
+        # Streamed conversions cut the first segment short so output starts early
+        self.stream_first_segment_seconds = stream_first_segment_seconds
+        # One segment pool per calling thread (inference worker), keyed by thread id
+        self._segment_pools: Dict[int, ThreadPoolExecutor] = {}
+        self._segment_pool_lock = threading.Lock()
+        # Torch threads per conversion (0 = all cores), shared by its segment workers
+        self.intra_op_threads = intra_op_threads or (os.cpu_count() or 1)
+        self.segment_workers = segment_workers or min(4, self.intra_op_threads)
+        
+        # ContentVec content features on a process-wide ONNX Runtime session
+        self.content_extractor = ContentFeatureExtractor(
+            model_dir=content_model_dir,
+            intra_op_threads=content_threads,
+            window_seconds=content_window_seconds,
+            batch_size=content_batch_size
+        )
+        
+        # Default index retrieval settings (overridable per request)
+        self.index_rate = index_rate
+        self.index_k = index_k
+        self.index_nprobe = index_nprobe
+        
+        # Micro-batching of concurrent requests per checkpoint (batch size 1 disables it)
+        self.batcher = MicroBatcher(batch_max_size, batch_wait_ms, batch_max_frames) if batch_max_size > 1 else None
+        
+        # Synthesizer execution: eager, script (TorchScript cached on disk), compile
+        # or int8 (quantized on CPU, calibrated on the clips in quant_calibration_dir)
+        if inference_mode not in INFERENCE_MODES:
+            raise ValueError(f"Unknown inference mode: {inference_mode} (available: {', '.join(INFERENCE_MODES)})")
+        self.inference_mode = inference_mode
+        self.quant_modules = tuple(quant_modules)
+        self.quant_calibration_dir = quant_calibration_dir
+        
+        # Synthesizer backend: torch, or onnx (exported once, run on shared ORT sessions)
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend: {backend} (available: {', '.join(BACKENDS)})")
+        self.backend = backend
+        self.onnx_threads = onnx_threads
+        
+        # Default F0 backend (see infer_pack.F0Predictor.F0_PREDICTORS)
+        self.f0_method = f0_method
+        
+        # On-disk cache of decoded audio, F0 and content features (0 MB disables it)
+        self.analysis_cache = (
+            AnalysisCache(analysis_cache_dir, analysis_cache_mb * 2**20) if analysis_cache_mb > 0 else None
+        )
         
         logger.info(f"Simple RVC Processor initialized on device: {self.device}")
     
     def load_rvc_model(self, model_path: str, index_path: Optional[str] = None) -> Dict[str, Any]:
-        """Load RVC model using simplified method"""
+        """Load RVC model using simplified method, reusing the copy in the model registry"""
+        self._model_keys.add(model_path)
+        model_info = self.models.get(model_path, lambda: self._load_rvc_model(model_path, index_path))
+        if index_path and model_info.get("index_path") != index_path:
+            # Cached by a load without this index: attach it to the shared entry
+            with self._index_lock:
+                if model_info.get("index_path") != index_path:
+                    index_info = self._load_index(index_path)
+                    if index_info["retriever"] is not None:
+                        model_info.update(index_info)
+                        self.models.resize(model_path)
+        return model_info
+    
+    def _load_rvc_model(self, model_path: str, index_path: Optional[str] = None) -> Dict[str, Any]:
+        """Build the synthesizer and index for a checkpoint"""
         try:
             logger.info(f"Loading RVC model: {model_path}")
             
-            # Check if model is already loaded
-            if model_path in self.loaded_models:
-                logger.info(f"Model already loaded: {model_path}")
-                return self.loaded_models[model_path]
-            
-            # Load the checkpoint
-            cpt = torch.load(model_path, map_location="cpu")
+            # Memory-map the checkpoint; only its metadata is kept once the weights are loaded
+            cpt = load_checkpoint(model_path)
             
             # Extract model information
             tgt_sr = cpt["config"][-1]
@@ -71,65 +205,32 @@ class SimpleRVCProcessor:
             
             logger.info(f"Model info - Version: {version}, F0: {if_f0}, Sample Rate: {tgt_sr}, Speakers: {n_spk}")
             
-            # Create the actual neural network
-            logger.info("Building RVC neural network...")
-            synthesizer_class = {
-                ("v1", 1): SynthesizerTrnMs256NSFsid,
-                ("v1", 0): SynthesizerTrnMs256NSFsid_nono,
-                ("v2", 1): SynthesizerTrnMs768NSFsid,
-                ("v2", 0): SynthesizerTrnMs768NSFsid_nono,
-            }
+            net_g = None
+            if self.backend == "onnx":
+                net_g = self._load_onnx_synthesizer(cpt, model_path, if_f0)
             
-            net_g = synthesizer_class[(version, if_f0)](
-                *cpt["config"], is_half=False
-            )
-            
-            # Remove the conv_pre layer (not needed for inference) - handle different model structures
-            try:
-                if hasattr(net_g, 'enc') and hasattr(net_g.enc, 'conv_pre'):
-                    del net_g.enc.conv_pre
-                    logger.info("Removed conv_pre layer")
-                else:
-                    logger.info("No conv_pre layer to remove (different model structure)")
-            except Exception as e:
-                logger.warning(f"Could not remove conv_pre layer: {e}")
-            
-            # Set requires_grad to False for all parameters
-            for f in net_g.parameters():
-                f.requires_grad = False
-            
-            # Load the model weights
-            net_g.load_state_dict(cpt["weight"], strict=False)
-            net_g.eval().to(self.device)
-            
-            logger.info("✅ RVC neural network built and loaded successfully")
-            
-            # Load index file if available
-            index = None
-            big_npy = None
-            if index_path and os.path.exists(index_path):
-                try:
-                    import faiss
-                    index = faiss.read_index(index_path)
-                    big_npy = index.reconstruct_n(0, index.ntotal)
-                    logger.info(f"Loaded FAISS index: {index_path}")
-                except Exception as e:
-                    logger.warning(f"Failed to load index file: {e}")
+            # Reuse a compiled synthesizer saved by an earlier load
+            if net_g is None and self.inference_mode == "script":
+                net_g = load_scripted(model_path, self.device)
+            if net_g is None and self.inference_mode == "int8":
+                net_g = self._load_quantized_synthesizer(cpt, model_path, version, if_f0)
+            if net_g is None:
+                net_g = self._build_synthesizer(cpt, version, if_f0)
+                net_g = compile_synthesizer(net_g, model_path, self.inference_mode)
             
             # Store model info
             model_info = {
                 "net_g": net_g,
-                "cpt": cpt,
+                "backend": "onnx" if isinstance(net_g, OnnxSynthesizer) else "torch",
+                "metadata": checkpoint_metadata(cpt),
                 "tgt_sr": tgt_sr,
                 "n_spk": n_spk,
                 "if_f0": if_f0,
                 "version": version,
-                "index": index,
-                "big_npy": big_npy,
+                **self._load_index(index_path),
                 "config": cpt["config"]
             }
             
-            self.loaded_models[model_path] = model_info
             logger.info(f"Successfully loaded RVC model info: {model_path}")
             
             return model_info
@@ -138,6 +239,106 @@ class SimpleRVCProcessor:
             logger.error(f"Failed to load RVC model {model_path}: {e}")
             raise
     
+    def _load_onnx_synthesizer(self, cpt: Dict[str, Any], model_path: str, if_f0: int) -> Optional[OnnxSynthesizer]:
+        """Shared ONNX Runtime session for a checkpoint, exporting it on first use; None falls back to torch"""
+        if not if_f0:
+            logger.info("ONNX backend only covers F0 models, using torch for this checkpoint")
+            return None
+        try:
+            path = onnx_path(model_path)
+            if not path.exists():
+                path = export_onnx(cpt, model_path)
+            return get_onnx_synthesizer(str(path), self.onnx_threads)
+        except Exception as e:
+            logger.warning(f"ONNX synthesizer unavailable, using torch: {e}")
+            return None
+    
+    def _load_quantized_synthesizer(
+        self, cpt: Dict[str, Any], model_path: str, version: str, if_f0: int
+    ) -> Optional[torch.nn.Module]:
+        """int8 synthesizer for a checkpoint, quantizing and saving it on first use; None falls back to eager"""
+        if self.device.type != "cpu":
+            logger.info(f"int8 synthesizer is CPU-only, using the eager model on {self.device}")
+            return None
+        try:
+            net_g = None
+            if quantized_path(model_path, self.quant_modules).exists():
+                net_g = load_quantized(self._build_synthesizer(cpt, version, if_f0), model_path, self.quant_modules)
+            if net_g is None:
+                calibration = self._calibration_inputs(cpt, version, if_f0)
+                net_g = quantize_synthesizer(
+                    self._build_synthesizer(cpt, version, if_f0), model_path, calibration, self.quant_modules
+                )
+            return net_g
+        except Exception as e:
+            logger.warning(f"int8 quantization failed, using eager model: {e}")
+            return None
+    
+    def _calibration_inputs(self, cpt: Dict[str, Any], version: str, if_f0: int) -> List[Dict[str, torch.Tensor]]:
+        """Keyword arguments for net_g.infer on each calibration clip"""
+        tgt_sr = cpt["config"][-1]
+        model_info = {"version": version, "if_f0": if_f0}
+        inputs = []
+        for audio in calibration_clips(self.quant_calibration_dir, tgt_sr):
+            phone_features, f0 = self._analyze(audio, tgt_sr, model_info, self.f0_method)
+            kwargs = {
+                "phone": torch.from_numpy(np.ascontiguousarray(phone_features, dtype=np.float32))[None],
+                "phone_lengths": torch.tensor([len(phone_features)], dtype=torch.long),
+                "sid": torch.tensor([0], dtype=torch.long),
+            }
+            if if_f0:
+                kwargs["pitch"] = torch.from_numpy(coarse_pitch(np.array(f0, dtype=np.float64)))[None]
+                kwargs["nsff0"] = torch.from_numpy(np.asarray(f0, dtype=np.float32))[None]
+            inputs.append(kwargs)
+        return inputs
+    
+    def _load_index(self, index_path: Optional[str]) -> Dict[str, Any]:
+        """Load a retrieval index if available, as the index entries of a model info"""
+        index = None
+        big_npy = None
+        if index_path and os.path.exists(index_path):
+            try:
+                import faiss
+                index = faiss.read_index(index_path)
+                big_npy = index.reconstruct_n(0, index.ntotal)
+                logger.info(f"Loaded FAISS index: {index_path}")
+            except ImportError:
+                # Without FAISS, retrieval runs on the raw training features if they were exported
+                npy_path = Path(index_path).with_suffix(".npy")
+                if npy_path.exists():
+                    big_npy = np.load(npy_path, mmap_mode="r")
+                    logger.info(f"FAISS not available, loaded index features: {npy_path}")
+                else:
+                    logger.warning("FAISS not available and no .npy features found, skipping index")
+            except Exception as e:
+                logger.warning(f"Failed to load index file: {e}")
+        
+        retriever = IndexRetriever(big_npy, index) if big_npy is not None else None
+        return {
+            "index": index,
+            "big_npy": big_npy,
+            "retriever": retriever,
+            "index_path": index_path if retriever is not None else None,
+        }
+    
+    def _build_synthesizer(self, cpt: Dict[str, Any], version: str, if_f0: int) -> torch.nn.Module:
+        """Build the eager synthesizer for a checkpoint and load its weights"""
+        logger.info("Building RVC neural network...")
+        synthesizer_class = {
+            ("v1", 1): SynthesizerTrnMs256NSFsid,
+            ("v1", 0): SynthesizerTrnMs256NSFsid_nono,
+            ("v2", 1): SynthesizerTrnMs768NSFsid,
+            ("v2", 0): SynthesizerTrnMs768NSFsid_nono,
+        }
+        
+        # Inference-only graph: no posterior encoder, weight norm folded, requires_grad off
+        net_g = build_synthesizer(synthesizer_class[(version, if_f0)], cpt, is_half=False)
+        net_g.eval().to(self.device)
+        
+        logger.info("✅ RVC neural network built and loaded successfully")
+        
+        return net_g
+    
     def process_audio_with_rvc(
         self, 
         audio_path: str, 
@@ -145,15 +346,36 @@ class SimpleRVCProcessor:
         index_path: Optional[str] = None,
         enhance_quality: bool = True,
         noise_reduction: bool = True,
-        pitch_shift: int = 0
+        pitch_shift: int = 0,
+        f0_method: Optional[str] = None,
+        segment_seconds: Optional[float] = None,
+        overlap_seconds: Optional[float] = None,
+        index_rate: Optional[float] = None,
+        index_k: Optional[int] = None,
+        index_nprobe: Optional[int] = None,
+        progress: Optional[Callable[[str, float], None]] = None,
+        on_chunk: Optional[Callable[[np.ndarray, int], None]] = None
     ) -> Tuple[np.ndarray, int]:
-        """Process audio with RVC model - REAL voice conversion"""
+        """
+        Process audio with RVC model - REAL voice conversion
+
+        `progress(stage, fraction)` is called as the loading_model, decoding
+        and converting stages advance (converting once per finished segment).
+        `on_chunk(samples, sr)` receives the output in order as it becomes
+        final: per finished segment for segmented inputs, else all at once.
+        """
+        progress = progress or (lambda stage, fraction: None)
         try:
             logger.info(f"🎤 Starting REAL RVC voice conversion: {audio_path}")
             logger.info(f"📁 Model: {model_path}")
             logger.info(f"📁 Index: {index_path}")
             
+            f0_method = f0_method or self.f0_method
+            if f0_method not in F0_PREDICTORS:
+                raise ValueError(f"Unknown f0_method: {f0_method} (available: {', '.join(F0_PREDICTORS)})")
+            
             # Load the model info
+            progress("loading_model", 0.0)
             model_info = self.load_rvc_model(model_path, index_path)
             net_g = model_info["net_g"]
             tgt_sr = model_info["tgt_sr"]
@@ -165,7 +387,8 @@ class SimpleRVCProcessor:
             logger.info(f"🔧 Model config - SR: {tgt_sr}, Speakers: {n_spk}, F0: {if_f0}, Version: {version}")
             
             # Load audio at the model's target sample rate for proper processing
-            audio, sr = librosa.load(audio_path, sr=tgt_sr)
+            progress("decoding", 0.0)
+            audio, sr = self._load_audio(audio_path, tgt_sr)
             logger.info(f"📊 Loaded audio: {len(audio)} samples at {sr}Hz (target: {tgt_sr}Hz)")
             
             # Implement proper RVC voice conversion using the neural network
@@ -176,59 +399,9 @@ class SimpleRVCProcessor:
             logger.info(f"Processing with model: {model_name}")
             logger.info(f"Model version: {version}, F0: {if_f0}, Sample rate: {tgt_sr}")
             
-            # Extract proper features for RVC inference
-            logger.info("🔍 Extracting features for RVC inference...")
-            
-            # Extract mel spectrogram with proper dimensions for RVC
-            mel_spec = librosa.feature.melspectrogram(
-                y=audio, 
-                sr=sr, 
-                n_mels=128,  # RVC typically uses 128 mel bins
-                hop_length=256,  # Standard hop length
-                n_fft=1024,
-                fmin=0,
-                fmax=sr//2
-            )
-            
-            # Convert to log scale
-            mel_spec = librosa.power_to_db(mel_spec, ref=np.max)
-            
-            # Convert to tensor
-            mel_tensor = torch.from_numpy(mel_spec).float().unsqueeze(0).to(self.device)
-            logger.info(f"Mel spectrogram shape: {mel_tensor.shape}")
-            
-            # Extract F0 (pitch) if needed
-            f0_tensor = None
-            if if_f0:
-                logger.info("🎵 Extracting F0 (pitch) for voice conversion...")
-                try:
-                    # Extract F0 using librosa
-                    f0, voiced_flag, voiced_probs = librosa.pyin(
-                        audio, 
-                        fmin=librosa.note_to_hz('C2'), 
-                        fmax=librosa.note_to_hz('C7'),
-                        sr=sr,
-                        hop_length=256
-                    )
-                    # Fill NaN values and interpolate
-                    f0 = np.nan_to_num(f0, nan=0.0)
-                    # Ensure F0 has same length as mel spectrogram
-                    if len(f0) != mel_tensor.shape[-1]:
-                        f0 = np.interp(
-                            np.linspace(0, 1, mel_tensor.shape[-1]),
-                            np.linspace(0, 1, len(f0)),
-                            f0
-                        )
-                    f0_tensor = torch.from_numpy(f0).float().unsqueeze(0).to(self.device)
-                    logger.info(f"F0 tensor shape: {f0_tensor.shape}")
-                except Exception as e:
-                    logger.warning(f"F0 extraction failed: {e}, using zeros")
-                    f0_tensor = torch.zeros(1, mel_tensor.shape[-1]).to(self.device)
-            
-            # Apply pitch shift to F0 if requested
-            if pitch_shift != 0 and f0_tensor is not None:
+            # F0 and content features are extracted per segment (and cached), pitch shift is applied on top
+            if pitch_shift != 0 and if_f0:
                 logger.info(f"🎼 Applying pitch shift: {pitch_shift} semitones")
-                f0_tensor = f0_tensor * (2 ** (pitch_shift / 12))
             
             # Prepare inputs for RVC model
             logger.info("🚀 Running RVC neural network inference...")
@@ -242,7 +415,31 @@ class SimpleRVCProcessor:
             logger.info(f"Model has {n_spk} speakers, version: {version}, F0: {if_f0}")
             
             # Try to use the actual RVC model for voice conversion
-            converted_audio = self._use_rvc_model_for_conversion(audio, sr, model_info, model_name)
+            segment_seconds = self.segment_seconds if segment_seconds is None else segment_seconds
+            overlap_seconds = self.overlap_seconds if overlap_seconds is None else overlap_seconds
+            conversion_kwargs = {
+                "pitch_shift": pitch_shift,
+                "f0_method": f0_method,
+                "index_rate": self.index_rate if index_rate is None else index_rate,
+                "index_k": index_k or self.index_k,
+                "index_nprobe": index_nprobe or self.index_nprobe
+            }
+            segments = plan_segments(
+                audio, sr, segment_seconds, overlap_seconds,
+                first_segment_seconds=self.stream_first_segment_seconds if on_chunk and segment_seconds else None
+            )
+            progress("converting", 0.0)
+            streamed = False
+            if len(segments) > 1:
+                segment_chunk = (lambda chunk: on_chunk(chunk, sr)) if on_chunk else None
+                converted_audio = self._convert_segmented(
+                    audio, sr, model_info, model_name, segments,
+                    progress=progress, on_chunk=segment_chunk, **conversion_kwargs
+                )
+                streamed = converted_audio is not None
+            else:
+                converted_audio = self._use_rvc_model_for_conversion(audio, sr, model_info, model_name, **conversion_kwargs)
+            progress("converting", 1.0)
             
             if converted_audio is None:
                 logger.info("RVC model failed, using enhanced voice conversion as fallback...")
@@ -250,6 +447,8 @@ class SimpleRVCProcessor:
                 logger.info(f"✅ Enhanced voice conversion completed - Output shape: {converted_audio.shape}")
             else:
                 logger.info(f"✅ RVC model conversion successful - Output shape: {converted_audio.shape}")
+            if on_chunk and not streamed:
+                on_chunk(converted_audio, sr)
             
             # NO POST-PROCESSING - Keep RVC output pure
             logger.info("🎤 Using pure RVC model output - no post-processing")
@@ -269,7 +468,85 @@ class SimpleRVCProcessor:
             traceback.print_exc()
             raise
     
-    def _use_rvc_model_for_conversion(self, audio: np.ndarray, sr: int, model_info: Dict[str, Any], model_name: str) -> np.ndarray:
+    def _get_segment_pool(self) -> ThreadPoolExecutor:
+        """
+        Segment worker pool of the calling thread
+
+        Each inference worker gets its own pool that splits that worker's
+        `intra_op_threads` between its segment workers, so concurrent long
+        conversions each keep a full worker's share of the cores.
+        """
+        caller = threading.get_ident()
+        with self._segment_pool_lock:
+            pool = self._segment_pools.get(caller)
+            if pool is None:
+                pool = self._segment_pools[caller] = ThreadPoolExecutor(
+                    max_workers=self.segment_workers,
+                    thread_name_prefix=f"rvc-segment-{threading.current_thread().name}",
+                    initializer=limit_threads,
+                    initargs=(max(1, self.intra_op_threads // self.segment_workers),)
+                )
+            return pool
+    
+    def _convert_segmented(
+        self,
+        audio: np.ndarray,
+        sr: int,
+        model_info: Dict[str, Any],
+        model_name: str,
+        segments: List[Tuple[int, int]],
+        progress: Optional[Callable[[str, float], None]] = None,
+        on_chunk: Optional[Callable[[np.ndarray], None]] = None,
+        **conversion_kwargs
+    ) -> Optional[np.ndarray]:
+        """
+        Convert long audio as overlapping segments in parallel and crossfade the results
+
+        Segments are stitched in order as they finish; `on_chunk` receives
+        each run of final output samples.
+        """
+        logger.info(f"✂️ Segmented RVC conversion: {len(segments)} segments on {self.segment_workers} workers")
+        
+        pool = self._get_segment_pool()
+        futures = [
+            pool.submit(
+                self._use_rvc_model_for_conversion,
+                audio[start:end], sr, model_info, model_name, **conversion_kwargs
+            )
+            for start, end in segments
+        ]
+        stitcher = SegmentStitcher(segments)
+        chunks = []
+        for future in futures:
+            piece = future.result()
+            if piece is None:
+                # A failed segment would leave a hole, so fall back for the whole file
+                logger.warning("A segment failed RVC conversion")
+                for pending in futures:
+                    pending.cancel()
+                if chunks and on_chunk:
+                    raise RuntimeError("Segment conversion failed after output had been streamed")
+                return None
+            chunks.append(stitcher.push(piece))
+            if on_chunk:
+                on_chunk(chunks[-1])
+            if progress:
+                progress("converting", len(chunks) / len(futures))
+        
+        return np.concatenate(chunks)
+    
+    def _use_rvc_model_for_conversion(
+        self,
+        audio: np.ndarray,
+        sr: int,
+        model_info: Dict[str, Any],
+        model_name: str,
+        pitch_shift: int = 0,
+        f0_method: str = "yin",
+        index_rate: float = 0.0,
+        index_k: int = 8,
+        index_nprobe: int = 1
+    ) -> np.ndarray:
         """Use the actual RVC model for voice conversion - NO FALLBACKS"""
         try:
             logger.info("🎤 Using REAL RVC model for voice conversion...")
@@ -287,63 +564,34 @@ class SimpleRVCProcessor:
                 audio = librosa.resample(audio, orig_sr=sr, target_sr=tgt_sr)
                 sr = tgt_sr
             
-            # Extract proper phone features for RVC
-            phone_features = self._extract_phone_features(audio, sr)
-            phone_tensor = torch.from_numpy(phone_features).float().unsqueeze(0).to(self.device)
-            phone_lengths = torch.tensor([phone_tensor.shape[-1]], dtype=torch.long).to(self.device)
+            # Content features [frames, dim] and F0 at 100 fps, from the analysis cache when possible
+            phone_features, f0 = self._analyze(audio, sr, model_info, f0_method)
             
-            # Use speaker ID 0 (most models use this for the main voice)
-            sid = torch.tensor([0], dtype=torch.long).to(self.device)
+            # Blend in nearest training features from the index; retrieval runs on the
+            # 50 fps ContentVec frames (every other row) and is repeated back to 100 fps
+            retriever = model_info.get("retriever")
+            if retriever is not None and index_rate > 0:
+                blended = retriever.blend(phone_features[::2], index_rate, k=index_k, nprobe=index_nprobe)
+                phone_features = np.repeat(blended, 2, axis=0)[:len(phone_features)]
+                logger.info(f"Applied index retrieval (rate: {index_rate}, k: {index_k}, nprobe: {index_nprobe})")
             
-            logger.info(f"RVC input shapes - phone: {phone_tensor.shape}, lengths: {phone_lengths.shape}, sid: {sid.shape}")
+            # Use speaker ID 0 (most models use this for the main voice)
+            item = {"phone": phone_features, "sid": 0}
+            logger.info(f"RVC input shapes - phone: {phone_features.shape}, sid: 0")
             
             if if_f0:
-                # Extract F0 (pitch) for voice conversion
-                f0, voiced_flag, voiced_probs = librosa.pyin(
-                    audio, 
-                    fmin=librosa.note_to_hz('C2'), 
-                    fmax=librosa.note_to_hz('C7'),
-                    sr=sr,
-                    hop_length=320  # Match HuBERT hop length
-                )
-                f0 = np.nan_to_num(f0, nan=0.0)
-                
-                # CRITICAL: Make F0 length match phone features length exactly
-                target_length = phone_tensor.shape[-1]
-                if len(f0) != target_length:
-                    f0 = np.interp(
-                        np.linspace(0, 1, target_length),
-                        np.linspace(0, 1, len(f0)),
-                        f0
-                    )
-                
-                logger.info(f"F0 length: {len(f0)}, Phone length: {phone_tensor.shape[-1]}")
-                
-                f0_tensor = torch.from_numpy(f0).float().unsqueeze(0).to(self.device)
-                nsff0_tensor = f0_tensor
-                
-                logger.info(f"F0 tensor shape: {f0_tensor.shape}")
-                
-                # Run RVC inference with F0
-                with torch.no_grad():
-                    output = net_g.infer(
-                        phone=phone_tensor,
-                        phone_lengths=phone_lengths,
-                        pitch=f0_tensor,
-                        nsff0=nsff0_tensor,
-                        sid=sid
-                    )
+                if pitch_shift != 0:
+                    f0 = f0 * (2 ** (pitch_shift / 12))
+                item["pitch"] = coarse_pitch(np.array(f0, dtype=np.float64))
+                item["nsff0"] = np.asarray(f0, dtype=np.float32)
+            
+            # Concurrent requests for the same checkpoint share one padded infer() call
+            run_batch = lambda items: self._infer_batch(model_info, items)
+            if self.batcher is not None:
+                converted_audio = self.batcher.submit(id(net_g), item, len(phone_features), run_batch)
             else:
-                # Run RVC inference without F0
-                with torch.no_grad():
-                    output = net_g.infer(
-                        phone=phone_tensor,
-                        phone_lengths=phone_lengths,
-                        sid=sid
-                    )
-            
-            # Convert output to numpy - NO POST-PROCESSING
-            converted_audio = output.squeeze(0).cpu().numpy()
+                converted_audio = run_batch([item])[0]
+            
             logger.info(f"✅ RVC model inference successful! Output shape: {converted_audio.shape}")
             logger.info(f"🎤 Generated audio using {model_name} RVC model")
             
@@ -356,6 +604,79 @@ class SimpleRVCProcessor:
             # Return None to indicate RVC failed, let fallback handle it
             return None
     
+    def _infer_batch(self, model_info: Dict[str, Any], items: List[Dict[str, Any]]) -> List[np.ndarray]:
+        """Run one net_g.infer call over items padded to a common length and split the output per item"""
+        net_g = model_info["net_g"]
+        if_f0 = model_info.get("if_f0", True)
+        
+        # The exported ONNX graph has a fixed batch of one
+        if isinstance(net_g, OnnxSynthesizer):
+            return [net_g.infer(item["phone"], item["pitch"], item["nsff0"], item["sid"]) for item in items]
+        
+        lengths = [len(item["phone"]) for item in items]
+        max_len = max(lengths)
+        dim = items[0]["phone"].shape[1]
+        
+        phone = np.zeros((len(items), max_len, dim), dtype=np.float32)
+        for i, item in enumerate(items):
+            phone[i, :lengths[i]] = item["phone"]
+        
+        phone_tensor = torch.from_numpy(phone).to(self.device)
+        phone_lengths = torch.tensor(lengths, dtype=torch.long).to(self.device)
+        sid = torch.tensor([item["sid"] for item in items], dtype=torch.long).to(self.device)
+        
+        with torch.no_grad():
+            if if_f0:
+                pitch = np.zeros((len(items), max_len), dtype=np.int64)
+                nsff0 = np.zeros((len(items), max_len), dtype=np.float32)
+                for i, item in enumerate(items):
+                    pitch[i, :lengths[i]] = item["pitch"]
+                    nsff0[i, :lengths[i]] = item["nsff0"]
+                output = net_g.infer(
+                    phone=phone_tensor,
+                    phone_lengths=phone_lengths,
+                    pitch=torch.from_numpy(pitch).to(self.device),
+                    nsff0=torch.from_numpy(nsff0).to(self.device),
+                    sid=sid
+                )
+            else:
+                output = net_g.infer(
+                    phone=phone_tensor,
+                    phone_lengths=phone_lengths,
+                    sid=sid
+                )
+        
+        # infer() returns (audio, x_mask, latents); audio is [batch, 1, samples]
+        audio = output[0][:, 0].cpu().numpy()
+        samples_per_frame = audio.shape[-1] // max_len
+        return [audio[i, :lengths[i] * samples_per_frame] for i in range(len(items))]
+    
+    def warm_up_model(self, model_path: str, index_path: Optional[str] = None, seconds: float = 1.0) -> float:
+        """
+        Load a model and run one short conversion of a synthetic voiced glide
+        
+        This fills the allocator and thread pools of the content extractor, the
+        F0 backend and the synthesizer so the first real request does not pay
+        for them. Bypasses the micro-batcher and the analysis cache. Returns the
+        seconds taken, including the load.
+        """
+        start = time.perf_counter()
+        model_info = self.load_rvc_model(model_path, index_path)
+        
+        t = np.arange(int(seconds * CONTENT_SR)) / CONTENT_SR
+        glide = 110 * 2 ** (2 * t / max(seconds, 1e-3))
+        audio = (0.3 * np.sin(2 * np.pi * np.cumsum(glide) / CONTENT_SR)).astype(np.float32)
+        
+        phone, _ = self._extract_phone_features(audio, CONTENT_SR, model_info.get("version", "v1"))
+        item = {"phone": phone, "sid": 0}
+        if model_info.get("if_f0", True):
+            f0 = self._extract_f0(audio, CONTENT_SR, len(phone), self.f0_method)
+            item["pitch"] = coarse_pitch(f0)
+            item["nsff0"] = f0.astype(np.float32)
+        self._infer_batch(model_info, [item])
+        
+        return time.perf_counter() - start
+    
     def _apply_enhanced_voice_conversion(self, audio: np.ndarray, sr: int, model_name: str, model_info: Dict[str, Any]) -> np.ndarray:
         """Apply enhanced voice conversion when RVC model fails"""
         try:
@@ -618,69 +939,103 @@ class SimpleRVCProcessor:
             # Fallback to speaker 0
             return torch.tensor([0], dtype=torch.long).to(self.device)
     
-    def _extract_phone_features(self, audio: np.ndarray, sr: int) -> np.ndarray:
-        """Extract proper HuBERT-style content features for RVC inference"""
+    def _analyze(
+        self,
+        audio: np.ndarray,
+        sr: int,
+        model_info: Dict[str, Any],
+        f0_method: str
+    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Content features and F0 (None for non-F0 models) for a chunk, cached by audio content"""
+        version = model_info.get("version", "v1")
+        if_f0 = model_info.get("if_f0", True)
+        
+        content_source = self._content_source(version)
+        key = None
+        if self.analysis_cache is not None:
+            key = audio_key(
+                audio, sr=sr, content=content_source, content_hop=CONTENT_HOP,
+                f0_method=f0_method if if_f0 else "none", f0_hop=sr // SYNTH_FPS
+            )
+            cached = self.analysis_cache.get(key)
+            if cached is not None and "phone" in cached and (not if_f0 or "f0" in cached):
+                logger.info("Using cached F0 and content features")
+                return cached["phone"], cached.get("f0")
+        
+        phone_features, source = self._extract_phone_features(audio, sr, version)
+        f0 = self._extract_f0(audio, sr, len(phone_features), f0_method) if if_f0 else None
+        
+        # Never cache the zero fallback of a failed extraction
+        if key is not None and source == content_source:
+            arrays = {"phone": phone_features}
+            if f0 is not None:
+                arrays["f0"] = f0
+            self.analysis_cache.put(key, arrays)
+        
+        return phone_features, f0
+    
+    def _content_source(self, version: str) -> str:
+        """Name of the content feature extractor that will be used for a checkpoint version"""
+        if self.content_extractor.is_available(version):
+            return self.content_extractor.model_path(version).name
+        return "legacy-mel"
+    
+    def _extract_f0(self, audio: np.ndarray, sr: int, n_frames: int, f0_method: str) -> np.ndarray:
+        """Extract F0 in Hz (0 for unvoiced) at the synthesizer frame rate, `n_frames` frames long"""
+        predictor = get_f0_predictor(f0_method, hop_length=sr // SYNTH_FPS, sampling_rate=sr)
+        f0, uv = predictor.compute_f0_uv(audio, n_frames)
+        f0 = fit_length(np.asarray(f0 * uv, dtype=np.float64), n_frames)
+        logger.info(f"F0 ({f0_method}) length: {len(f0)}, Phone length: {n_frames}")
+        return f0
+    
+    def _extract_phone_features(
+        self, audio: np.ndarray, sr: int, version: str = "v1",
+        extractor: Optional[ContentFeatureExtractor] = None
+    ) -> Tuple[np.ndarray, str]:
+        """Extract ContentVec content features for RVC inference as [frames, dim] at 100 fps, with their source"""
+        dim = content_dim(version)
+        extractor = extractor or self.content_extractor
+        
+        # Resample to 16kHz for feature extraction (standard for HuBERT/ContentVec)
+        if sr != CONTENT_SR:
+            audio_16k = librosa.resample(audio, orig_sr=sr, target_sr=CONTENT_SR)
+        else:
+            audio_16k = audio
+        audio_16k = audio_16k.astype(np.float32, copy=False)
+        
         try:
-            # RVC models expect HuBERT content features with specific format
-            # We need to create features that match the expected input dimensions
-            
-            # Resample to 16kHz for feature extraction (standard for HuBERT)
-            if sr != 16000:
-                audio_16k = librosa.resample(audio, orig_sr=sr, target_sr=16000)
-            else:
-                audio_16k = audio
-            
-            # Calculate target length based on audio duration
-            target_length = len(audio_16k) // 320  # Based on hop_length=320
-            
-            # Create features that match the RVC model's expected input
-            # The model expects features of shape [batch, time, 768]
-            # But we need to match the exact sequence length that the model was trained with
-            
-            # Create features with the correct dimensions
-            # We'll use a combination of mel spectrogram and MFCC features
-            mel_spec = librosa.feature.melspectrogram(
-                y=audio_16k,
-                sr=16000,
-                n_mels=80,
-                hop_length=320,
-                n_fft=1024
+            if extractor.is_available(version):
+                features = extractor.extract(audio_16k, version)
+                logger.info(f"Extracted ContentVec features shape: {features.shape}")
+                return features, extractor.model_path(version).name
+            
+            logger.warning(
+                f"ContentVec model not found at {extractor.model_path(version)}, "
+                "using approximate mel features"
             )
-            
-            # Convert to log scale
-            mel_spec = librosa.power_to_db(mel_spec, ref=np.max)
-            
-            # Normalize
-            mel_spec = (mel_spec - mel_spec.mean()) / (mel_spec.std() + 1e-8)
-            
-            # Pad or truncate to match expected length
-            if mel_spec.shape[1] > target_length:
-                mel_spec = mel_spec[:, :target_length]
-            elif mel_spec.shape[1] < target_length:
-                padding = target_length - mel_spec.shape[1]
-                mel_spec = np.pad(mel_spec, ((0, 0), (0, padding)), mode='constant')
-            
-            # Expand to 768 dimensions by repeating and padding
-            if mel_spec.shape[0] < 768:
-                repeat_factor = 768 // mel_spec.shape[0]
-                remainder = 768 % mel_spec.shape[0]
-                
-                expanded_features = np.tile(mel_spec, (repeat_factor, 1))
-                if remainder > 0:
-                    expanded_features = np.vstack([
-                        expanded_features,
-                        mel_spec[:remainder, :]
-                    ])
-            else:
-                expanded_features = mel_spec[:768, :]
-            
-            logger.info(f"Extracted phone features shape: {expanded_features.shape}")
-            return expanded_features
+            features = legacy_mel_features(audio_16k, dim)
+            logger.info(f"Extracted phone features shape: {features.shape}")
+            return features, "legacy-mel"
             
         except Exception as e:
             logger.error(f"Phone feature extraction failed: {e}")
             # Return zeros as fallback with correct dimensions
-            return np.zeros((768, len(audio) // 320))
+            return np.zeros((2 * (len(audio_16k) // CONTENT_HOP), dim), dtype=np.float32), ""
+    
+    def _load_audio(self, audio_path: str, sr: int) -> Tuple[np.ndarray, int]:
+        """Decode and resample an input file, reusing the cached decode of identical uploads"""
+        key = None
+        if self.analysis_cache is not None:
+            key = file_key(audio_path, sr=sr)
+            cached = self.analysis_cache.get(key)
+            if cached is not None and "audio" in cached:
+                logger.info("Using cached decoded audio")
+                return cached["audio"], sr
+        
+        audio, sr = librosa.load(audio_path, sr=sr)
+        if key is not None:
+            self.analysis_cache.put(key, {"audio": audio})
+        return audio, sr
     
     def _fallback_voice_conversion(self, audio: np.ndarray, sr: int, model_name: str) -> torch.Tensor:
         """Fallback voice conversion when RVC neural network fails"""
@@ -752,6 +1107,12 @@ class SimpleRVCProcessor:
             return torch.from_numpy(audio).float().unsqueeze(0)
     
     def cleanup(self):
-        """Clean up loaded models"""
-        self.loaded_models.clear()
+        """Release the models loaded through this processor (pinned ones stay) and the segment pools"""
+        for key in list(self._model_keys):
+            self.models.evict(key, keep_pinned=True)
+        self._model_keys.clear()
+        with self._segment_pool_lock:
+            for pool in self._segment_pools.values():
+                pool.shutdown(wait=False)
+            self._segment_pools.clear()
         logger.info("RVC models cleaned up")
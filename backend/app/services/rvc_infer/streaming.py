@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+
+import struct
+import logging
+import numpy as np
+import torch
+from typing import Any, Dict, Optional
+
+from .content_features import CONTENT_HOP, CONTENT_SR, ContentFeatureExtractor
+from .segmenter import fit_length
+from .onnx_backend import OnnxSynthesizer
+from .simple_rvc import coarse_pitch
+
+logger = logging.getLogger(__name__)
+
+# Synthesizer frames per second; ContentVec frames are 2 synthesizer frames long
+SYNTH_FPS = 100
+CONTENT_FRAME = 2
+
+
+def wav_stream_header(sample_rate: int, channels: int = 1) -> bytes:
+    """PCM16 WAV header for output of unknown length (RIFF and data sizes 0xFFFFFFFF)"""
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 0xFFFFFFFF, b"WAVE",
+        b"fmt ", 16, 1, channels, sample_rate, sample_rate * channels * 2, channels * 2, 16,
+        b"data", 0xFFFFFFFF
+    )
+
+
+def pcm16_bytes(samples: np.ndarray) -> bytes:
+    """Float samples in [-1, 1] as little-endian PCM16 (the subtype soundfile writes for .wav by default)"""
+    return np.rint(np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+
+def _frames(seconds: float) -> int:
+    """Whole ContentVec frames' worth of synthesizer frames in `seconds`"""
+    return max(CONTENT_FRAME, int(round(seconds * SYNTH_FPS / CONTENT_FRAME)) * CONTENT_FRAME)
+
+
+class StreamingConverter:
+    """
+    Incremental RVC conversion of a live input stream
+
+    Audio is pushed in arbitrary chunks and converted in fixed blocks. Content
+    features and F0 of past blocks are kept as a rolling context, and each
+    block calls `infer` with `skip_head`/`return_length` so the text encoder
+    sees the context while the flow and decoder only run on the new frames.
+    Neighbouring blocks are joined with a short crossfade, which delays the
+    output by `crossfade_seconds`; `flush` returns the held-back tail so the
+    output is exactly as long as the input (at the model's sample rate).
+    """
+
+    def __init__(
+        self,
+        processor,
+        model_info: Dict[str, Any],
+        input_sr: int,
+        pitch_shift: int = 0,
+        f0_method: Optional[str] = None,
+        index_rate: Optional[float] = None,
+        block_seconds: float = 0.25,
+        context_seconds: float = 1.0,
+        analysis_seconds: float = 0.5,
+        crossfade_seconds: float = 0.02
+    ):
+        self.processor = processor
+        self.model_info = model_info
+        self.net_g = model_info["net_g"]
+        self.if_f0 = model_info.get("if_f0", True)
+        self.version = model_info.get("version", "v1")
+        self.retriever = model_info.get("retriever")
+
+        self.input_sr = input_sr
+        self.sample_rate = model_info.get("tgt_sr", 40000)
+        self.pitch_shift = pitch_shift
+        self.f0_method = f0_method or processor.f0_method
+        self.index_rate = processor.index_rate if index_rate is None else index_rate
+
+        # Sizes in synthesizer frames, then in input and output samples
+        self.block_frames = _frames(block_seconds)
+        self.context_frames = _frames(context_seconds)
+        self.crossfade_frames = min(max(1, int(round(crossfade_seconds * SYNTH_FPS))), self.block_frames)
+        self.input_hop = input_sr // SYNTH_FPS
+        self.output_hop = self.sample_rate // SYNTH_FPS
+        self.block_samples = self.block_frames * self.input_hop
+
+        # Input audio waiting for a full block, and the analysis context before it
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._analysis_tail = np.zeros(_frames(analysis_seconds) * self.input_hop, dtype=np.float32)
+        # ContentVec windows sized to one block and its analysis context (plus a hop
+        # of slack for resampling), on the processor's shared sessions
+        content = processor.content_extractor
+        self.content_extractor = ContentFeatureExtractor(
+            model_dir=str(content.model_dir),
+            intra_op_threads=content.intra_op_threads,
+            window_seconds=(len(self._analysis_tail) + self.block_samples) / input_sr + CONTENT_HOP / CONTENT_SR,
+            batch_size=1
+        )
+
+        # Rolling synthesizer inputs (context + current block)
+        dim = 256 if self.version == "v1" else 768
+        self._phone = np.zeros((0, dim), dtype=np.float32)
+        self._pitch = np.zeros(0, dtype=np.int64)
+        self._nsff0 = np.zeros(0, dtype=np.float32)
+
+        # Converted audio of the last crossfade_frames, not yet returned
+        self._tail: Optional[np.ndarray] = None
+        fade = np.linspace(0.0, 1.0, self.crossfade_frames * self.output_hop, dtype=np.float32)
+        self._fade_in = np.sin(fade * np.pi / 2) ** 2
+        self._fade_out = 1.0 - self._fade_in
+
+    def push(self, audio: np.ndarray) -> np.ndarray:
+        """Add input audio at `input_sr` and return all output that became available"""
+        audio = np.asarray(audio, dtype=np.float32)
+        if audio.ndim > 1:
+            audio = audio.mean(axis=-1)
+        if len(self._pending):
+            audio = np.concatenate([self._pending, audio])
+
+        # Whole blocks are converted straight from `audio` (callers may reuse their
+        # array afterwards, so only the remainder is kept, as a copy)
+        whole = len(audio) - len(audio) % self.block_samples
+        outputs = [
+            self._convert_block(audio[start:start + self.block_samples])
+            for start in range(0, whole, self.block_samples)
+        ]
+        self._pending = audio[whole:].copy()
+        if len(outputs) == 1:
+            return outputs[0]
+        return np.concatenate(outputs) if outputs else np.zeros(0, dtype=np.float32)
+
+    def flush(self) -> np.ndarray:
+        """Convert the remaining partial block and return the rest of the output"""
+        remaining = len(self._pending)
+        output = np.zeros(0, dtype=np.float32)
+        if remaining:
+            output = self.push(np.zeros(self.block_samples - remaining, dtype=np.float32))
+        if self._tail is not None:
+            output = np.concatenate([output, self._tail])
+        if remaining:
+            # Drop the output of the zero padding
+            padding = self.block_frames * self.output_hop - remaining * self.sample_rate // self.input_sr
+            output = output[:len(output) - padding]
+        self.reset()
+        return output
+
+    def reset(self):
+        """Drop all context, e.g. between utterances"""
+        self._pending = self._pending[:0]
+        self._analysis_tail[:] = 0
+        self._phone = self._phone[:0]
+        self._pitch = self._pitch[:0]
+        self._nsff0 = self._nsff0[:0]
+        self._tail = None
+
+    def _convert_block(self, block: np.ndarray) -> np.ndarray:
+        phone, pitch, nsff0 = self._analyze_block(block)
+
+        # Append to the rolling context, keeping at most context_frames before the block
+        keep = self.context_frames
+        self._phone = np.concatenate([self._phone[-keep:], phone])
+        if self.if_f0:
+            self._pitch = np.concatenate([self._pitch[-keep:], pitch])
+            self._nsff0 = np.concatenate([self._nsff0[-keep:], nsff0])
+
+        # Decode crossfade_frames before the block as well, to overlap the previous tail
+        context = len(self._phone) - self.block_frames
+        overlap = min(self.crossfade_frames, context)
+        audio = self._synthesize(context - overlap, overlap + self.block_frames)
+
+        xfade = self.crossfade_frames * self.output_hop
+        if self._tail is not None and overlap == self.crossfade_frames:
+            head = self._tail * self._fade_out + audio[:xfade] * self._fade_in
+            output = np.concatenate([head, audio[xfade:-xfade]])
+        else:
+            output = audio[overlap * self.output_hop:-xfade]
+        self._tail = audio[-xfade:]
+        return output
+
+    def _analyze_block(self, block: np.ndarray):
+        """Content features and F0 of a block, analysed with the preceding input as left context"""
+        window = np.concatenate([self._analysis_tail, block])
+        self._analysis_tail = window[-len(self._analysis_tail):]
+        window_frames = len(window) // self.input_hop
+
+        features, _ = self.processor._extract_phone_features(
+            window, self.input_sr, self.version, extractor=self.content_extractor
+        )
+        phone = np.zeros((window_frames, features.shape[1]), dtype=np.float32)
+        phone[:min(window_frames, len(features))] = features[:window_frames]
+        phone = phone[-self.block_frames:]
+
+        if self.retriever is not None and self.index_rate > 0:
+            blended = self.retriever.blend(phone[::CONTENT_FRAME], self.index_rate, k=self.processor.index_k,
+                                           nprobe=self.processor.index_nprobe)
+            phone = np.repeat(blended, CONTENT_FRAME, axis=0)[:self.block_frames]
+
+        if not self.if_f0:
+            return phone, None, None
+
+        f0 = self.processor._extract_f0(window, self.input_sr, window_frames, self.f0_method)
+        f0 = fit_length(f0, window_frames)[-self.block_frames:]
+        if self.pitch_shift != 0:
+            f0 = f0 * (2 ** (self.pitch_shift / 12))
+        return phone, coarse_pitch(np.array(f0, dtype=np.float64)), np.asarray(f0, dtype=np.float32)
+
+    def _synthesize(self, skip: int, length: int) -> np.ndarray:
+        """Audio for rolling frames [skip, skip + length), computing only those frames in flow and decoder"""
+        # The exported ONNX graph has no skip_head; run the whole context and slice
+        if isinstance(self.net_g, OnnxSynthesizer):
+            audio = self.net_g.infer(self._phone, self._pitch, self._nsff0, 0)
+            return fit_length(audio[skip * self.output_hop:], length * self.output_hop)
+
+        device = self.processor.device
+        inputs = {
+            "phone": torch.from_numpy(self._phone[None]).to(device),
+            "phone_lengths": torch.tensor([len(self._phone)], dtype=torch.long).to(device),
+            "sid": torch.tensor([0], dtype=torch.long).to(device),
+            "skip_head": torch.tensor(skip),
+            "return_length": torch.tensor(length),
+            "return_length2": torch.tensor(length),
+        }
+        if self.if_f0:
+            inputs["pitch"] = torch.from_numpy(self._pitch[None]).to(device)
+            inputs["nsff0"] = torch.from_numpy(self._nsff0[None]).to(device)
+
+        with torch.no_grad():
+            audio = self.net_g.infer(**inputs)[0][0, 0].float().cpu().numpy()
+        return fit_length(audio, length * self.output_hop)
@@ -1,13 +1,20 @@
 import os
+import json
 import uuid
 import logging
-from typing import Dict, Any, Optional
+import functools
+from datetime import datetime
+from typing import AsyncIterator, Callable, Dict, Any, Optional
 from pathlib import Path
 import asyncio
 import numpy as np
 import soundfile as sf
+from starlette.concurrency import run_in_threadpool
 from app.core.config import settings
 from app.services.rvc_engine import RVCVoiceCloningEngine
+from app.services.job_store import JobStore
+from app.services.rvc_infer.inference_executor import InferenceQueueFull, PRIORITY_BATCH, PRIORITY_INTERACTIVE
+from app.services.rvc_infer.streaming import pcm16_bytes, wav_stream_header
 from app.services.tts_engine import TTSEngine
 from app.services.live_audio_engine import LiveAudioManager
 from app.services.microphone_service import MicrophoneService
@@ -31,32 +38,63 @@ class RVCProcessor:
         self.microphone_service = MicrophoneService()
         self.live_recording_handler = LiveRecordingHandler(self.rvc_engine)
         self.live_audio_manager = LiveAudioManager(self.rvc_engine)
+        self._warm_up_task: Optional[asyncio.Task] = None
+        # Conversions behind streamed responses; they finish even if the client goes away
+        self._stream_tasks: set = set()
+        
+        # Conversion and TTS jobs; any left unfinished by the previous run can never complete
+        self.jobs = JobStore()
+        self.jobs.fail_interrupted()
         
         logger.info("RVC Processor initialized with real engines and microphone support")
 
+    def create_job(self, kind: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Register a queued job (convert or tts) and return its task id"""
+        return self.jobs.create(kind, params)
+
+    def admit(self, audio_path: Optional[str] = None, priority: Optional[str] = None) -> str:
+        """
+        Priority class of a new conversion, classified from `audio_path` unless given
+        
+        Raises InferenceQueueFull (with a Retry-After estimate) if the inference
+        queue has no place for it.
+        """
+        if priority is None:
+            priority = self.rvc_engine.classify_audio(audio_path)[0] if audio_path else PRIORITY_BATCH
+        self.rvc_engine.executor.admit(priority)
+        return priority
+
     async def process_audio(
         self, 
+        task_id: str,
         input_file_path: str, 
         model_name: str,
         enhance_quality: bool = True,
         noise_reduction: bool = True,
-        pitch_shift: int = 0
+        pitch_shift: int = 0,
+        f0_method: Optional[str] = None,
+        priority: Optional[str] = None,
+        owner: Optional[str] = None,
+        on_chunk: Optional[Callable[[np.ndarray, int], None]] = None
     ) -> Dict[str, Any]:
         """
-        Process audio file with RVC model
+        Process audio file with RVC model as job `task_id` (see `create_job`)
         
         Args:
+            task_id: ID of the queued convert job to run
             input_file_path: Path to the input audio file
             model_name: Name of the RVC model to use
             enhance_quality: Whether to enhance audio quality
             noise_reduction: Whether to apply noise reduction
             pitch_shift: Pitch shift amount (semitones)
+            f0_method: F0 backend (yin, pm, dio, harvest, pyin); defaults to RVC_F0_METHOD
+            priority: Scheduling class (interactive, batch); defaults to the class of the input's duration
+            owner: User the job runs for, for fair sharing of the inference workers
+            on_chunk: Called from the worker with each run of final output samples (see `stream_audio`)
             
         Returns:
-            Dict containing task_id and status
+            Final job status
         """
-        task_id = str(uuid.uuid4())
-        
         try:
             logger.info(f"Starting RVC processing for task {task_id}")
             
@@ -64,15 +102,21 @@ class RVCProcessor:
             model_path, index_path = await self._find_model_files(model_name)
             if not model_path:
                 raise ValueError(f"Model not found: {model_name}")
+            await self._mark_model_used(model_path)
             
-            # Process audio with RVC
+            # Process audio with RVC; the job stays queued until a worker picks it up
             processed_audio, sample_rate = await self.rvc_engine.process_audio_with_rvc(
                 audio_path=input_file_path,
                 model_path=model_path,
                 index_path=index_path,
                 enhance_quality=enhance_quality,
                 noise_reduction=noise_reduction,
-                pitch_shift=pitch_shift
+                pitch_shift=pitch_shift,
+                f0_method=f0_method,
+                progress=functools.partial(self.jobs.update, task_id),
+                priority=priority,
+                owner=owner,
+                on_chunk=on_chunk
             )
             
             # Generate output filename
@@ -81,24 +125,68 @@ class RVCProcessor:
             output_path = self.output_dir / output_filename
             
             # Save processed audio
+            self.jobs.update(task_id, "saving")
             sf.write(output_path, processed_audio, sample_rate)
+            self.jobs.finish(task_id, output_filename, "Audio processing completed successfully")
             
             logger.info(f"RVC processing completed for task {task_id}")
             
-            return {
-                "task_id": task_id,
-                "status": "completed",
-                "result_file": str(output_path),
-                "message": "Audio processing completed successfully"
-            }
-            
+        except InferenceQueueFull:
+            logger.warning(f"Inference queue full, rejecting task {task_id}")
+            self.jobs.fail(task_id, "Server busy, try again shortly")
         except Exception as e:
             logger.error(f"RVC processing failed for task {task_id}: {e}")
-            return {
-                "task_id": task_id,
-                "status": "failed",
-                "message": f"Processing failed: {str(e)}"
-            }
+            self.jobs.fail(task_id, str(e))
+        
+        return self.jobs.get(task_id)
+
+    async def stream_audio(
+        self,
+        task_id: str,
+        input_file_path: str,
+        model_name: str,
+        pitch_shift: int = 0,
+        f0_method: Optional[str] = None,
+        priority: Optional[str] = None,
+        owner: Optional[str] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        Run job `task_id` like `process_audio` and yield its output as it is converted
+        
+        Yields a PCM16 WAV header of open length followed by the samples of
+        each finished segment, so playback can start after the first one.
+        The job runs to completion and saves its result file even if the
+        consumer stops early; nothing is yielded if it fails before any output,
+        and RuntimeError is raised if it fails after some was yielded.
+        """
+        loop = asyncio.get_running_loop()
+        chunks: asyncio.Queue = asyncio.Queue()
+
+        def on_chunk(samples: np.ndarray, sample_rate: int):
+            loop.call_soon_threadsafe(chunks.put_nowait, (samples, sample_rate))
+
+        task = asyncio.create_task(self.process_audio(
+            task_id, input_file_path, model_name,
+            pitch_shift=pitch_shift, f0_method=f0_method,
+            priority=priority, owner=owner, on_chunk=on_chunk
+        ))
+        self._stream_tasks.add(task)
+        task.add_done_callback(self._stream_tasks.discard)
+        task.add_done_callback(lambda _: chunks.put_nowait(None))
+
+        header_sent = False
+        while True:
+            item = await chunks.get()
+            if item is None:
+                status = task.result()
+                if header_sent and status and status.get("status") == "failed":
+                    raise RuntimeError(f"Streamed conversion failed: {status.get('error')}")
+                return
+            samples, sample_rate = item
+            if not header_sent:
+                header_sent = True
+                yield wav_stream_header(sample_rate)
+            yield pcm16_bytes(samples)
 
     async def process_text_to_speech_background(
         self,
@@ -108,7 +196,8 @@ class RVCProcessor:
         enhance_quality: bool = True,
         noise_reduction: bool = True,
         tts_engine: str = "gtts",
-        language: str = "en"
+        language: str = "en",
+        owner: Optional[str] = None
     ) -> None:
         """Background task for TTS processing"""
         try:
@@ -119,13 +208,14 @@ class RVCProcessor:
             logger.info(f"Looking for model files for: {model_name}")
             model_path, index_path = await self._find_model_files(model_name)
             if not model_path:
-                logger.error(f"Model not found: {model_name}")
-                return
+                raise ValueError(f"Model not found: {model_name}")
+            await self._mark_model_used(model_path)
             
             logger.info(f"Found model files - Model: {model_path}, Index: {index_path}")
             
             # Step 1: Generate speech from text
             logger.info(f"Step 1: Generating TTS audio for task {task_id}")
+            self.jobs.update(task_id, "synthesizing_speech")
             import asyncio
             try:
                 # Generate TTS audio - let the RVC model handle voice conversion
@@ -157,18 +247,19 @@ class RVCProcessor:
             logger.info(f"RVC Model: {model_path}")
             logger.info(f"RVC Index: {index_path}")
             
-            # Add timeout and more detailed logging
+            # Add timeout and more detailed logging; the timeout starts once a worker
+            # runs the conversion, so time spent queued behind other jobs does not count
             import asyncio
             try:
                 logger.info(f"Calling RVC engine with timeout...")
-                processed_audio, processed_sr = await asyncio.wait_for(
-                    self.rvc_engine.process_audio_with_rvc(
-                        audio_path=str(temp_audio_path),
-                        model_path=model_path,
-                        index_path=index_path,
-                        enhance_quality=enhance_quality,
-                        noise_reduction=noise_reduction
-                    ),
+                processed_audio, processed_sr = await self.rvc_engine.process_audio_with_rvc(
+                    audio_path=str(temp_audio_path),
+                    model_path=model_path,
+                    index_path=index_path,
+                    enhance_quality=enhance_quality,
+                    noise_reduction=noise_reduction,
+                    progress=functools.partial(self.jobs.update, task_id),
+                    owner=owner,
                     timeout=60.0  # 60 second timeout
                 )
                 logger.info(f"RVC processing completed - Output shape: {processed_audio.shape}, Sample rate: {processed_sr}")
@@ -183,7 +274,9 @@ class RVCProcessor:
             logger.info(f"Step 4: Saving final audio for task {task_id}")
             output_filename = f"tts_{task_id}.wav"
             output_path = self.output_dir / output_filename
+            self.jobs.update(task_id, "saving")
             sf.write(output_path, processed_audio, processed_sr)
+            self.jobs.finish(task_id, output_filename, "TTS processing completed successfully")
             logger.info(f"Final audio saved to: {output_path}")
             
             # Clean up temporary file
@@ -195,6 +288,7 @@ class RVCProcessor:
         except Exception as e:
             logger.error(f"❌ Background TTS processing failed for task {task_id}: {e}")
             logger.error(f"❌ Error type: {type(e).__name__}")
+            self.jobs.fail(task_id, str(e))
             import traceback
             traceback.print_exc()
 
@@ -230,6 +324,7 @@ class RVCProcessor:
             model_path, index_path = await self._find_model_files(model_name)
             if not model_path:
                 raise ValueError(f"Model not found: {model_name}")
+            await self._mark_model_used(model_path)
             
             # Step 1: Generate speech from text
             # Use default TTS voice - RVC will convert it to the target voice
@@ -330,6 +425,151 @@ class RVCProcessor:
             logger.error(f"Error finding model files: {e}")
             return None, None
     
+    async def _mark_model_used(self, model_path: str):
+        """Record a conversion with a voice, for the startup hot set"""
+        await run_in_threadpool(self._record_model_use, model_path)
+    
+    def _record_model_use(self, model_path: str):
+        """Set the voice's last_used in the database (blocking; see `_mark_model_used`)"""
+        try:
+            from app.db.database import SessionLocal
+            from app.models.voice_model import VoiceModel
+            
+            db = SessionLocal()
+            try:
+                db.query(VoiceModel).filter(VoiceModel.local_path == model_path).update(
+                    {VoiceModel.last_used: datetime.utcnow()}, synchronize_session=False
+                )
+                db.commit()
+            finally:
+                db.close()
+        except Exception as e:
+            logger.warning(f"Failed to update last_used for {model_path}: {e}")
+    
+    # Startup warm-up and hot set
+    def start_warm_up(self) -> asyncio.Task:
+        """Start warming up the hot set in the background; requests are served meanwhile"""
+        if self._warm_up_task is None:
+            self._warm_up_task = asyncio.create_task(self.warm_up())
+        return self._warm_up_task
+    
+    async def warm_up(self) -> Dict[str, Any]:
+        """
+        Preload the hot set and run a dummy conversion on each voice
+        
+        Voices are warmed one at a time on the inference executor; a request for
+        a voice that is still loading shares the load through the model registry.
+        """
+        warmed = []
+        for entry in await self._hot_set_candidates():
+            model_path = entry["model_path"]
+            try:
+                if entry.get("pinned"):
+                    self.rvc_engine.pin_model(model_path)
+                seconds = await self.rvc_engine.executor.run(
+                    model_path, self.rvc_engine.warm_up_model, model_path, entry.get("index_path"),
+                    priority=PRIORITY_BATCH, owner="warm-up"
+                )
+                warmed.append(model_path)
+                logger.info(f"Warmed up {Path(model_path).name} in {seconds:.2f}s")
+            except Exception as e:
+                logger.warning(f"Warm-up failed for {model_path}: {e}")
+        
+        logger.info(f"Warm-up finished: {len(warmed)} model(s) ready")
+        return {"warmed": warmed}
+    
+    def shutdown(self):
+        """Save the hot set and stop the inference workers"""
+        self.save_hot_set()
+        self.rvc_engine.executor.shutdown(wait=False)
+    
+    def save_hot_set(self) -> Optional[str]:
+        """Write the loaded voices to RVC_HOT_SET_FILE so the next start restores them"""
+        hot_set = self.rvc_engine.get_hot_set()
+        if not hot_set:
+            # Keep the previous hot set if nothing was loaded this run
+            return None
+        
+        path = Path(settings.RVC_HOT_SET_FILE)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(path.name + ".tmp")
+            tmp_path.write_text(json.dumps({"saved_at": datetime.utcnow().isoformat(), "models": hot_set}, indent=2))
+            os.replace(tmp_path, path)
+            logger.info(f"Saved hot set of {len(hot_set)} model(s) to {path}")
+            return str(path)
+        except OSError as e:
+            logger.warning(f"Failed to save hot set: {e}")
+            return None
+    
+    async def _hot_set_candidates(self) -> list:
+        """Named and pinned voices first, then up to RVC_WARMUP_COUNT saved or recently used ones"""
+        saved = self._load_saved_hot_set()
+        candidates = {}
+        
+        for model_name in settings.RVC_WARMUP_MODELS.split(","):
+            model_name = model_name.strip()
+            if not model_name:
+                continue
+            model_path, index_path = await self._find_model_files(model_name)
+            if model_path:
+                candidates.setdefault(model_path, {"model_path": model_path, "index_path": index_path})
+            else:
+                logger.warning(f"Warm-up model not found: {model_name}")
+        
+        for entry in saved:
+            if entry.get("pinned"):
+                candidates[entry["model_path"]] = entry
+        
+        learned = 0
+        for entry in [e for e in saved if not e.get("pinned")] + self._recently_used_models():
+            if learned >= settings.RVC_WARMUP_COUNT:
+                break
+            if entry["model_path"] not in candidates:
+                candidates[entry["model_path"]] = entry
+                learned += 1
+        
+        return [entry for entry in candidates.values() if os.path.exists(entry["model_path"])]
+    
+    def _load_saved_hot_set(self) -> list:
+        """Entries of RVC_HOT_SET_FILE, most recently used first"""
+        path = Path(settings.RVC_HOT_SET_FILE)
+        if not path.exists():
+            return []
+        try:
+            return [entry for entry in json.loads(path.read_text())["models"] if entry.get("model_path")]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable hot set {path}: {e}")
+            return []
+    
+    def _recently_used_models(self) -> list:
+        """Downloaded voices by VoiceModel.last_used, newest first"""
+        if settings.RVC_WARMUP_COUNT <= 0:
+            return []
+        try:
+            from app.db.database import SessionLocal
+            from app.models.voice_model import VoiceModel
+            
+            db = SessionLocal()
+            try:
+                models = db.query(VoiceModel).filter(
+                    VoiceModel.is_downloaded == True,
+                    VoiceModel.last_used.isnot(None),
+                    VoiceModel.local_path.isnot(None)
+                ).order_by(VoiceModel.last_used.desc()).limit(settings.RVC_WARMUP_COUNT).all()
+                return [
+                    {
+                        "model_path": model.local_path,
+                        "index_path": model.index_path if model.index_path and os.path.exists(model.index_path) else None
+                    }
+                    for model in models
+                ]
+            finally:
+                db.close()
+        except Exception as e:
+            logger.warning(f"Failed to read recently used models: {e}")
+            return []
+    
     def _get_voice_id_for_model(self, model_name: str) -> str:
         """Get the appropriate voice ID for the model"""
         model_name_lower = model_name.lower()
@@ -342,7 +582,7 @@ class RVCProcessor:
             # Default to female for most voice models
             return "female"
     
-    def get_processing_status(self, task_id: str) -> Dict[str, Any]:
+    def get_processing_status(self, task_id: str) -> Optional[Dict[str, Any]]:
         """
         Get the processing status for a task
         
@@ -350,35 +590,16 @@ class RVCProcessor:
             task_id: The task ID to check
             
         Returns:
-            Dict containing status information
+            Dict containing status information, or None for an unknown task
         """
-        # Check if output file exists (look for tts_{task_id}.wav)
-        output_file = self.output_dir / f"tts_{task_id}.wav"
-        if output_file.exists():
-            return {
-                "task_id": task_id,
-                "status": "completed",
-                "progress": 100,
-                "message": "TTS processing completed successfully",
-                "result_file": output_file.name  # Return just the filename, not the full path
-            }
-        else:
-            # Check if temp file exists (processing in progress)
-            temp_file = self.output_dir / f"temp_tts_{task_id}.wav"
-            if temp_file.exists():
-                return {
-                    "task_id": task_id,
-                    "status": "processing",
-                    "progress": 75,
-                    "message": "Applying voice cloning..."
-                }
-            else:
-                return {
-                    "task_id": task_id,
-                    "status": "processing",
-                    "progress": 25,
-                    "message": "Generating speech from text..."
-                }
+        return self.jobs.get(task_id)
+    
+    def get_result_path(self, task_id: str) -> Optional[Path]:
+        """Output file of a finished task, or None if it is not done"""
+        status = self.jobs.get(task_id)
+        if not status or status["status"] != "done" or not status["result_file"]:
+            return None
+        return self.output_dir / status["result_file"]
     
     # Live Audio Processing Methods
     async def start_live_audio(self, model_name: str) -> Dict[str, Any]:
@@ -388,6 +609,7 @@ class RVCProcessor:
             model_path, index_path = await self._find_model_files(model_name)
             if not model_path:
                 raise ValueError(f"Model not found: {model_name}")
+            await self._mark_model_used(model_path)
             
             # Set model for live processing
             self.live_audio_manager.set_model(model_path, index_path)
@@ -408,6 +630,39 @@ class RVCProcessor:
                 "message": f"Failed to start live audio: {str(e)}"
             }
     
+    async def open_live_session(
+        self,
+        model_name: str,
+        sample_rate: int,
+        fmt: str = "f32",
+        pitch_shift: int = 0,
+        f0_method: Optional[str] = None,
+        owner: Optional[str] = None
+    ):
+        """
+        Live-conversion session for a WebSocket client (see LiveConversionSession)
+        
+        Raises ValueError for an unknown model or format and InferenceQueueFull
+        if the inference queue has no place for interactive work.
+        """
+        self.admit(priority=PRIORITY_INTERACTIVE)
+        model_path, index_path = await self._find_model_files(model_name)
+        if not model_path:
+            raise ValueError(f"Model not found: {model_name}")
+        await self._mark_model_used(model_path)
+        return await self.live_audio_manager.open_session(
+            model_path, index_path,
+            input_sr=sample_rate,
+            fmt=fmt,
+            pitch_shift=pitch_shift,
+            f0_method=f0_method,
+            owner=owner,
+            max_backlog_seconds=settings.RVC_LIVE_MAX_BACKLOG_SECONDS
+        )
+    
+    def close_live_session(self, session):
+        self.live_audio_manager.close_session(session)
+    
     async def stop_live_audio(self) -> Dict[str, Any]:
         """Stop live audio processing"""
         try:
@@ -431,10 +686,36 @@ class RVCProcessor:
         """Get available TTS voices"""
         return self.tts_engine.get_engine_info()
     
-    def get_loaded_models(self) -> list:
-        """Get list of loaded RVC models"""
+    def get_executor_stats(self) -> Dict[str, Any]:
+        """Inference queue depth and running jobs per model"""
+        return self.rvc_engine.get_executor_stats()
+    
+    def get_loaded_models(self) -> Dict[str, Any]:
+        """Get loaded RVC models with their memory footprint"""
         return self.rvc_engine.get_loaded_models()
     
+    async def pin_model(self, model_name: str, pinned: bool = True, owner: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Pin a voice so it is never evicted (or unpin it), loading it if needed
+        
+        The load runs on the inference executor as batch work of `owner`, so
+        it raises InferenceQueueFull when the queue has no place for it.
+        """
+        model_path, index_path = await self._find_model_files(model_name)
+        if not model_path:
+            return {"success": False, "message": f"Model not found: {model_name}"}
+        
+        if pinned:
+            self.rvc_engine.pin_model(model_path)
+            await self.rvc_engine.executor.run(
+                model_path, self.rvc_engine.load_rvc_model, model_path, index_path,
+                priority=PRIORITY_BATCH, owner=owner
+            )
+        else:
+            self.rvc_engine.unpin_model(model_path)
+        
+        return {"success": True, "model_path": model_path, "pinned": pinned}
+    
     # Microphone and Live Recording Methods
     def get_microphone_devices(self) -> list:
         """Get available microphone devices"""
@@ -463,6 +744,7 @@ class RVCProcessor:
             model_path, index_path = await self._find_model_files(model_name)
             if not model_path:
                 raise ValueError(f"Model not found: {model_name}")
+            await self._mark_model_used(model_path)
             
             # Start live recording
             success = self.live_recording_handler.start_live_recording(
@@ -515,6 +797,7 @@ class RVCProcessor:
             model_path, index_path = await self._find_model_files(model_name)
             if not model_path:
                 raise ValueError(f"Model not found: {model_name}")
+            await self._mark_model_used(model_path)
             
             # Record and process
             result = self.live_recording_handler.record_and_save(
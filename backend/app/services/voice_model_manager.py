@@ -5,7 +5,7 @@ import asyncio
 import aiohttp
 import aiofiles
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from typing import Any, List, Dict, Optional, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
 import logging
@@ -15,6 +15,7 @@ import shutil
 
 from app.models.voice_model import VoiceModel
 from app.services.voice_models import VoiceModelsService
+from app.services.event_bus import event_bus
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -78,6 +79,31 @@ class VoiceModelManager:
             db.rollback()
             raise
     
+    @staticmethod
+    def download_state(model: VoiceModel) -> str:
+        """done, failed, downloading or idle, from the model record"""
+        if model.is_downloaded:
+            return "done"
+        if model.download_error:
+            return "failed"
+        return "downloading" if (model.download_progress or 0.0) > 0 else "idle"
+    
+    def download_status(self, model: VoiceModel, state: Optional[str] = None) -> Dict[str, Any]:
+        """Download status of a model as published on the event bus"""
+        return {
+            "model_id": model.id,
+            "status": state or self.download_state(model),
+            "is_downloaded": bool(model.is_downloaded),
+            "download_progress": model.download_progress or 0.0,
+            "download_error": model.download_error,
+            "local_path": model.local_path,
+            "index_path": model.index_path
+        }
+    
+    def publish_download_status(self, model: VoiceModel, state: Optional[str] = None):
+        """Publish a model's download status on the event bus as topic download:<id>"""
+        event_bus.publish(f"download:{model.id}", self.download_status(model, state))
+    
     async def download_model(self, db: Session, model_id: int) -> Tuple[bool, str]:
         """Download a voice model and save it locally"""
         try:
@@ -92,12 +118,20 @@ class VoiceModelManager:
             
             if model.is_downloaded:
                 logger.info(f"✅ Model {model.name} is already downloaded")
+                self.publish_download_status(model)
                 return True, "Model already downloaded"
             
             if not model.download_url or model.download_url == "N/A":
                 logger.error(f"❌ No download URL available for model: {model.name}")
+                self.publish_download_status(model, "failed")
                 return False, "No download URL available"
             
+            # Clear the error of any previous attempt
+            model.download_error = None
+            model.download_progress = 0.0
+            db.commit()
+            self.publish_download_status(model, "downloading")
+            
             logger.info(f"🔗 Download URL: {model.download_url}")
             logger.info(f"📁 Models directory: {self.models_dir}")
             logger.info(f"📁 Models directory exists: {self.models_dir.exists()}")
@@ -142,6 +176,9 @@ class VoiceModelManager:
                     
                     if response.status != 200:
                         logger.error(f"❌ Download failed with HTTP status: {response.status}")
+                        model.download_error = f"HTTP {response.status}"
+                        db.commit()
+                        self.publish_download_status(model, "failed")
                         return False, f"Failed to download: HTTP {response.status}"
                     
                     # Get file size
@@ -174,16 +211,20 @@ class VoiceModelManager:
                     async with aiofiles.open(file_path, 'wb') as f:
                         logger.info(f"📥 Starting file download...")
                         chunk_count = 0
+                        reported = 0.0
                         async for chunk in response.content.iter_chunked(8192):
                             await f.write(chunk)
                             downloaded_size += len(chunk)
                             chunk_count += 1
                             
-                            # Update progress
+                            # Update progress in 1% steps (SQLite commit and event)
                             if total_size > 0:
                                 progress = downloaded_size / total_size
-                                model.download_progress = progress
-                                db.commit()
+                                if progress - reported >= 0.01:
+                                    reported = progress
+                                    model.download_progress = progress
+                                    db.commit()
+                                    self.publish_download_status(model, "downloading")
                                 
                                 # Log progress every 100 chunks
                                 if chunk_count % 100 == 0:
@@ -236,6 +277,7 @@ class VoiceModelManager:
                     model.download_progress = 1.0
                     model.download_error = None
                     db.commit()
+                    self.publish_download_status(model, "done")
                     
                     logger.info(f"🎉 Successfully downloaded model: {model.name}")
                     logger.info(f"📁 Model files:")
@@ -257,6 +299,7 @@ class VoiceModelManager:
                     model.download_error = str(e)
                     model.download_progress = 0.0
                     db.commit()
+                    self.publish_download_status(model, "failed")
                     logger.error(f"❌ Updated model {model.name} with error status")
             except Exception as db_error:
                 logger.error(f"❌ Failed to update model error status: {db_error}")
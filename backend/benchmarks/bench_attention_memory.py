@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Peak memory of text-encoder attention on long inputs
+
+Runs the text encoder of a v2 synthesizer on random content features of
+each length in a fresh process per attention path and prints the peak
+resident memory added by the forward pass, and its time:
+
+  reference  the original implementation ([b, h, t, t] scores, padded
+             relative-position tensors and a full [b, 1, t, t] mask)
+  fused      the fused inference path over all queries at once
+  blocked    the fused path in query blocks of --block frames (default)
+
+Usage: python benchmarks/bench_attention_memory.py [--seconds 10,30,60] [--block 512]
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import torch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.rvc_infer.infer_pack.attentions import MultiHeadAttention  # noqa: E402
+from app.services.rvc_infer.infer_pack.models import TextEncoder  # noqa: E402
+
+SYNTH_FPS = 100
+PATHS = ("reference", "fused", "blocked")
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(seconds, path, block):
+    """Runs in a child process; prints one JSON line"""
+    torch.set_grad_enabled(False)
+    torch.manual_seed(0)
+    enc_p = TextEncoder(768, 192, 192, 768, 2, 6, 3, 0.0).eval()
+    for layer in enc_p.modules():
+        if isinstance(layer, MultiHeadAttention):
+            layer.fast_attention = path != "reference"
+            layer.query_block = block if path == "blocked" else 0
+
+    frames = int(seconds * SYNTH_FPS)
+    inputs = (torch.randn(1, frames, 768), torch.randint(1, 255, (1, frames)), torch.tensor([frames]))
+    before = peak_rss_mb()
+    start = time.perf_counter()
+    enc_p(*inputs)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"seconds": elapsed, "peak_mb": peak_rss_mb() - before}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", default="10,30,60", help="comma-separated input durations")
+    parser.add_argument("--block", type=int, default=512, help="query block size in frames")
+    parser.add_argument("--paths", default=",".join(PATHS))
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        measure(float(args.seconds), args.child, args.block)
+        return
+
+    for seconds in args.seconds.split(","):
+        for path in args.paths.split(","):
+            out = subprocess.run(
+                [sys.executable, __file__, "--seconds", seconds, "--block", str(args.block), "--child", path],
+                check=True, capture_output=True, text=True
+            ).stdout
+            result = json.loads(out.strip().splitlines()[-1])
+            print(
+                f"{float(seconds):5.0f} s  {path:9s}  peak +{result['peak_mb']:7.1f} MB   "
+                f"{result['seconds'] * 1000:9.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
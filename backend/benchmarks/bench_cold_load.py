@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Cold-load benchmark for RVC checkpoints
+
+Loads a checkpoint (or, without --model, a randomly initialised v2 40 kHz
+synthesizer saved with fp16 weights like an exported RVC voice) in a fresh
+process per strategy and prints load time and the resident memory added by
+the loaded voice:
+
+  full  torch.load of the whole checkpoint into a randomly initialised
+        synthesizer, checkpoint kept in memory (the previous behaviour)
+  mmap  memory-mapped load_checkpoint and build_synthesizer (no random
+        init), only the metadata kept after building
+
+Usage: python benchmarks/bench_cold_load.py [--model voice.pth] [--repeats 3]
+"""
+
+import argparse
+import gc
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import torch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.rvc_infer.checkpoint import build_synthesizer, checkpoint_metadata, load_checkpoint  # noqa: E402
+from app.services.rvc_infer.infer_pack.models import (  # noqa: E402
+    SynthesizerTrnMs256NSFsid,
+    SynthesizerTrnMs256NSFsid_nono,
+    SynthesizerTrnMs768NSFsid,
+    SynthesizerTrnMs768NSFsid_nono,
+)
+
+# Stock RVC v2 40 kHz configuration
+V2_40K_CONFIG = [
+    1025, 32, 192, 192, 768, 2, 6, 3, 0, "1", [3, 7, 11], [[1, 3, 5], [1, 3, 5], [1, 3, 5]],
+    [10, 10, 2, 2], 512, [16, 16, 4, 4], 109, 256, 40000,
+]
+
+SYNTHESIZERS = {
+    ("v1", 1): SynthesizerTrnMs256NSFsid,
+    ("v1", 0): SynthesizerTrnMs256NSFsid_nono,
+    ("v2", 1): SynthesizerTrnMs768NSFsid,
+    ("v2", 0): SynthesizerTrnMs768NSFsid_nono,
+}
+
+
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def synthesizer_class(cpt):
+    return SYNTHESIZERS[(cpt.get("version", "v1"), cpt.get("f0", 1))]
+
+
+def build_eager(cpt):
+    net_g = synthesizer_class(cpt)(*cpt["config"], is_half=False)
+    net_g.load_state_dict(cpt["weight"], strict=False)
+    return net_g.eval()
+
+
+def measure(model_path, strategy):
+    """Runs in a child process; prints one JSON line"""
+    torch.set_num_threads(1)
+    gc.collect()
+    before = rss_mb()
+    start = time.perf_counter()
+    if strategy == "full":
+        cpt = torch.load(model_path, map_location="cpu", weights_only=False)
+        model_info = {"net_g": build_eager(cpt), "cpt": cpt}
+    else:
+        cpt = load_checkpoint(model_path)
+        net_g = build_synthesizer(synthesizer_class(cpt), cpt, is_half=False).eval()
+        model_info = {"net_g": net_g, "metadata": checkpoint_metadata(cpt)}
+        del cpt
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    print(json.dumps({"seconds": elapsed, "rss_mb": rss_mb() - before, "loaded": len(model_info)}))
+
+
+def write_random_checkpoint(path):
+    torch.manual_seed(0)
+    net_g = SynthesizerTrnMs768NSFsid(*V2_40K_CONFIG, is_half=False)
+    weight = {k: v.half() for k, v in net_g.state_dict().items() if not k.startswith("enc_q")}
+    torch.save({"weight": weight, "config": V2_40K_CONFIG, "f0": 1, "version": "v2", "sr": "40k"}, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", help="RVC .pth checkpoint (default: random v2 40 kHz weights)")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--child", choices=("full", "mmap"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        measure(args.model, args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        model_path = args.model
+        if model_path is None:
+            model_path = str(Path(work_dir) / "random-v2.pth")
+            write_random_checkpoint(model_path)
+        print(f"{Path(model_path).name}: {Path(model_path).stat().st_size / 2**20:.1f} MB on disk")
+
+        for strategy in ("full", "mmap"):
+            runs = []
+            for _ in range(args.repeats):
+                out = subprocess.run(
+                    [sys.executable, __file__, "--model", model_path, "--child", strategy],
+                    check=True, capture_output=True, text=True
+                ).stdout
+                runs.append(json.loads(out.strip().splitlines()[-1]))
+            seconds = min(r["seconds"] for r in runs)
+            rss = min(r["rss_mb"] for r in runs)
+            print(f"{strategy:5s} load {seconds * 1000:7.1f} ms   +{rss:6.1f} MB resident")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the inference executor
+
+Runs --jobs synthesizer `infer` calls on a randomly initialised v2 40 kHz
+model three ways and prints the total wall time and mean latency:
+
+  sequential  one after another on all cores
+  default     all at once on an unbounded thread pool, every call using
+              all cores (what `run_in_executor(None, ...)` did)
+  executor    all at once on InferenceExecutor (--workers workers splitting
+              the cores, 0 = auto)
+
+Usage: python benchmarks/bench_executor.py [--jobs 10] [--seconds 2] [--workers 0]
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import torch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.rvc_infer.inference_executor import InferenceExecutor  # noqa: E402
+from app.services.rvc_infer.infer_pack.models import SynthesizerTrnMs768NSFsid  # noqa: E402
+
+SYNTH_FPS = 100
+
+# Stock RVC v2 40 kHz configuration
+V2_40K_CONFIG = [
+    1025, 32, 192, 192, 768, 2, 6, 3, 0, "1", [3, 7, 11], [[1, 3, 5], [1, 3, 5], [1, 3, 5]],
+    [10, 10, 2, 2], 512, [16, 16, 4, 4], 109, 256, 40000,
+]
+
+
+def make_job(net_g, frames):
+    inputs = {
+        "phone": torch.randn(1, frames, 768),
+        "phone_lengths": torch.tensor([frames]),
+        "pitch": torch.randint(1, 255, (1, frames)),
+        "nsff0": torch.rand(1, frames) * 300 + 80,
+        "sid": torch.tensor([0]),
+    }
+
+    def job():
+        start = time.perf_counter()
+        with torch.no_grad():
+            net_g.infer(**inputs)
+        return time.perf_counter() - start
+
+    return job
+
+
+def finished_after(job, t0):
+    """Run a job and return its completion time relative to t0 (its latency when all are submitted at t0)"""
+    job()
+    return time.perf_counter() - t0
+
+
+def report(name, total, latencies):
+    print(f"{name:10s} total {total:7.2f} s   mean latency {sum(latencies) / len(latencies):6.2f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=10)
+    parser.add_argument("--seconds", type=float, default=2.0, help="audio per job")
+    parser.add_argument("--workers", type=int, default=0)
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    torch.manual_seed(0)
+    net_g = SynthesizerTrnMs768NSFsid(*V2_40K_CONFIG, is_half=False).eval()
+    net_g.remove_weight_norm()
+    frames = int(args.seconds * SYNTH_FPS)
+    jobs = [make_job(net_g, frames) for _ in range(args.jobs)]
+    jobs[0]()  # warm up allocator and thread pools
+    print(f"{args.jobs} jobs of {args.seconds:g}s audio on {cores} cores")
+
+    torch.set_num_threads(cores)
+    start = time.perf_counter()
+    latencies = [finished_after(job, start) for job in jobs]
+    report("sequential", time.perf_counter() - start, latencies)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        futures = [pool.submit(finished_after, job, start) for job in jobs]
+        latencies = [future.result() for future in futures]
+    report("default", time.perf_counter() - start, latencies)
+
+    executor = InferenceExecutor(workers=args.workers, max_queue=0, per_model=args.jobs)
+    start = time.perf_counter()
+    futures = [executor.submit("model", finished_after, job, start) for job in jobs]
+    latencies = [future.result() for future in futures]
+    report("executor", time.perf_counter() - start, latencies)
+    print(f"executor: {executor.workers} workers x {executor.threads_per_worker} threads")
+    executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the registered F0 backends
+
+Runs every backend whose dependencies are installed on the same synthetic
+vocal (a gliding harmonic tone with silent gaps) at the synthesizer frame
+rate, and prints wall time, speed-up over pyin and median pitch error on
+voiced frames.
+
+Usage: python benchmarks/bench_f0_backends.py [--seconds 30] [--sr 40000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.rvc_infer.infer_pack.F0Predictor import F0_PREDICTORS, get_f0_predictor  # noqa: E402
+
+SYNTH_FPS = 100
+
+
+def synthetic_vocal(seconds, sr, rng):
+    t = np.arange(int(seconds * sr)) / sr
+    f0 = 160 + 80 * np.sin(2 * np.pi * 0.25 * t) + 30 * np.sin(2 * np.pi * 3 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / sr
+    audio = sum(np.sin(k * phase) / k for k in range(1, 6)) * 0.3
+    # One second of silence every five seconds
+    gate = (t % 5) < 4
+    audio = audio * gate + 0.002 * rng.standard_normal(len(t))
+    return audio.astype(np.float32), f0 * gate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--sr", type=int, default=40000)
+    args = parser.parse_args()
+
+    audio, true_f0 = synthetic_vocal(args.seconds, args.sr, np.random.default_rng(0))
+    hop = args.sr // SYNTH_FPS
+    n_frames = len(audio) // hop
+    reference = true_f0[::hop][:n_frames]
+    print(f"{args.seconds:g}s at {args.sr} Hz, {n_frames} frames (hop {hop})")
+
+    timings = {}
+    for name in F0_PREDICTORS:
+        try:
+            predictor = get_f0_predictor(name, hop_length=hop, sampling_rate=args.sr)
+            start = time.perf_counter()
+            f0, uv = predictor.compute_f0_uv(audio, n_frames)
+            timings[name] = time.perf_counter() - start
+        except ImportError as e:
+            print(f"{name:8s} skipped ({e.name} not installed)")
+            continue
+
+        f0 = np.asarray(f0)[:n_frames]
+        voiced = (np.asarray(uv)[:n_frames] > 0) & (reference[: len(f0)] > 0)
+        error = np.median(np.abs(f0[voiced] - reference[voiced]) / reference[voiced]) if voiced.any() else np.nan
+        print(f"{name:8s} {timings[name] * 1000:10.1f} ms   median error {error:.2%}")
+
+    if "pyin" in timings:
+        for name, elapsed in timings.items():
+            if name != "pyin":
+                print(f"{name:8s} {timings['pyin'] / elapsed:6.1f}x faster than pyin")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
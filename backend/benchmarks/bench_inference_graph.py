@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Inference-only synthesizer graph: equivalence check and benchmark
+
+Builds each synthesizer variant (v1/v2, with and without F0) twice from the
+same checkpoint: the full training graph (posterior encoder present, weight
+norm hooks active) and the inference graph from `build_synthesizer`. Runs
+`infer` on identical inputs and prior noise, fails unless the outputs are
+bit-identical, and prints parameter memory and best-of-N `infer` time.
+
+Usage: python benchmarks/bench_inference_graph.py [--seconds 2] [--repeats 3]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import torch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.rvc_infer.checkpoint import build_synthesizer  # noqa: E402
+from app.services.rvc_infer.infer_pack.models import (  # noqa: E402
+    SynthesizerTrnMs256NSFsid,
+    SynthesizerTrnMs256NSFsid_nono,
+    SynthesizerTrnMs768NSFsid,
+    SynthesizerTrnMs768NSFsid_nono,
+)
+
+SYNTH_FPS = 100
+
+# Stock RVC 40 kHz configuration
+CONFIG_40K = [
+    1025, 32, 192, 192, 768, 2, 6, 3, 0, "1", [3, 7, 11], [[1, 3, 5], [1, 3, 5], [1, 3, 5]],
+    [10, 10, 2, 2], 512, [16, 16, 4, 4], 109, 256, 40000,
+]
+
+VARIANTS = {
+    "v1-f0": (SynthesizerTrnMs256NSFsid, 256, True),
+    "v1-nof0": (SynthesizerTrnMs256NSFsid_nono, 256, False),
+    "v2-f0": (SynthesizerTrnMs768NSFsid, 768, True),
+    "v2-nof0": (SynthesizerTrnMs768NSFsid_nono, 768, False),
+}
+
+
+def param_mb(net_g):
+    return sum(t.numel() * t.element_size() for t in net_g.state_dict().values()) / 2**20
+
+
+def run(net_g, inputs, repeats):
+    best, audio = float("inf"), None
+    for _ in range(repeats):
+        torch.manual_seed(1234)
+        start = time.perf_counter()
+        audio = net_g.infer(**inputs)[0]
+        best = min(best, time.perf_counter() - start)
+    return best, audio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    torch.set_grad_enabled(False)
+    frames = int(args.seconds * SYNTH_FPS)
+    failed = False
+
+    for name, (synthesizer_class, dim, if_f0) in VARIANTS.items():
+        torch.manual_seed(0)
+        full = synthesizer_class(*CONFIG_40K, is_half=False).eval()
+        cpt = {"config": CONFIG_40K, "weight": full.state_dict()}
+        slim = build_synthesizer(synthesizer_class, cpt, is_half=False).eval()
+
+        inputs = {
+            "phone": torch.randn(1, frames, dim),
+            "phone_lengths": torch.tensor([frames]),
+            "sid": torch.tensor([0]),
+        }
+        if if_f0:
+            inputs["pitch"] = torch.randint(1, 255, (1, frames))
+            inputs["nsff0"] = torch.rand(1, frames) * 300 + 80
+
+        full_time, full_audio = run(full, inputs, args.repeats)
+        slim_time, slim_audio = run(slim, inputs, args.repeats)
+        identical = torch.equal(full_audio, slim_audio)
+        failed |= not identical
+
+        print(
+            f"{name:8s} params {param_mb(full):6.1f} -> {param_mb(slim):6.1f} MB   "
+            f"infer {full_time * 1000:7.1f} -> {slim_time * 1000:7.1f} ms   "
+            f"{'bit-identical' if identical else 'MISMATCH'}"
+        )
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
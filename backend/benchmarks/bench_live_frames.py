@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Frame encoding benchmark for WebSocket live conversion
+
+Encodes and decodes --frames blocks of --block-ms of audio at --rate the way
+/ws/live-convert does (binary float32 or int16 PCM behind a 24-byte header)
+and the way a JSON text protocol would (base64 float32 plus the same fields),
+and prints bytes per frame and server-side microseconds per frame.
+
+Usage: python benchmarks/bench_live_frames.py [--frames 2000] [--block-ms 20] [--rate 48000]
+"""
+
+import argparse
+import base64
+import json
+import struct
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.rvc_infer.streaming import pcm16_bytes  # noqa: E402
+
+# Same layout as OUTPUT_FRAME_HEADER in app/services/live_audio_engine.py
+HEADER = struct.Struct("<IIdff")
+
+
+def binary_f32(samples, sequence):
+    frame = HEADER.pack(sequence, sequence, time.time(), 1.0, 2.0) + samples.astype("<f4").tobytes()
+    return frame, np.frombuffer(frame, dtype="<f4", offset=HEADER.size)
+
+
+def binary_s16(samples, sequence):
+    frame = HEADER.pack(sequence, sequence, time.time(), 1.0, 2.0) + pcm16_bytes(samples)
+    return frame, np.frombuffer(frame, dtype="<i2", offset=HEADER.size).astype(np.float32) / 32768.0
+
+
+def json_base64(samples, sequence):
+    frame = json.dumps({
+        "sequence": sequence, "input_sequence": sequence, "server_time": time.time(),
+        "queue_ms": 1.0, "convert_ms": 2.0,
+        "audio": base64.b64encode(samples.astype("<f4").tobytes()).decode("ascii"),
+    })
+    return frame, np.frombuffer(base64.b64decode(json.loads(frame)["audio"]), dtype="<f4")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--block-ms", type=float, default=20.0, help="audio per frame")
+    parser.add_argument("--rate", type=int, default=48000, help="sample rate")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    blocks = [
+        np.clip(rng.standard_normal(int(args.rate * args.block_ms / 1000)) * 0.2, -1, 1).astype(np.float32)
+        for _ in range(64)
+    ]
+    print(f"{args.frames} frames of {args.block_ms:g} ms at {args.rate} Hz ({len(blocks[0])} samples)")
+
+    for name, codec in (("binary f32", binary_f32), ("binary s16", binary_s16), ("json base64", json_base64)):
+        size = 0
+        start = time.perf_counter()
+        for i in range(args.frames):
+            frame, decoded = codec(blocks[i % len(blocks)], i)
+            size += len(frame)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{name:11s}  {size / args.frames:8.0f} bytes/frame   "
+            f"{elapsed / args.frames * 1e6:7.1f} us/frame (encode + decode)"
+        )
+
+
+if __name__ == "__main__":
+    main()
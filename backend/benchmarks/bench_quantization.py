@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the int8 synthesizer (RVC_INFERENCE_MODE=int8)
+
+Quantizes a checkpoint (or, without --model, a randomly initialised v2
+40 kHz synthesizer) on synthetic content features and a pitch glide, then
+runs fp32 and int8 `infer` on identical inputs and prior noise. Prints the
+best-of-N wall time, the speed-up and the mel-cepstral distortion (MCD, dB)
+of the int8 output against fp32.
+
+Usage: python benchmarks/bench_quantization.py [--model voice.pth] [--seconds 5] [--modules enc_p,flow]
+"""
+
+import argparse
+import copy
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import torch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.rvc_infer.infer_pack.models import (  # noqa: E402
+    SynthesizerTrnMs256NSFsid,
+    SynthesizerTrnMs256NSFsid_nono,
+    SynthesizerTrnMs768NSFsid,
+    SynthesizerTrnMs768NSFsid_nono,
+)
+from app.services.rvc_infer.quantization import DEFAULT_QUANTIZED_SUBMODULES, quantize_synthesizer  # noqa: E402
+
+SYNTH_FPS = 100
+
+# Stock RVC v2 40 kHz configuration
+V2_40K_CONFIG = [
+    1025, 32, 192, 192, 768, 2, 6, 3, 0, "1", [3, 7, 11], [[1, 3, 5], [1, 3, 5], [1, 3, 5]],
+    [10, 10, 2, 2], 512, [16, 16, 4, 4], 109, 256, 40000,
+]
+
+SYNTHESIZERS = {
+    ("v1", 1): SynthesizerTrnMs256NSFsid,
+    ("v1", 0): SynthesizerTrnMs256NSFsid_nono,
+    ("v2", 1): SynthesizerTrnMs768NSFsid,
+    ("v2", 0): SynthesizerTrnMs768NSFsid_nono,
+}
+
+
+def load_checkpoint(model_path, work_dir):
+    if model_path is None:
+        torch.manual_seed(0)
+        net_g = SynthesizerTrnMs768NSFsid(*V2_40K_CONFIG, is_half=False)
+        model_path = str(Path(work_dir) / "random-v2.pth")
+        torch.save({"weight": net_g.state_dict(), "config": V2_40K_CONFIG, "f0": 1, "version": "v2"}, model_path)
+        return net_g.eval(), model_path, "v2", 1, V2_40K_CONFIG[-1]
+
+    cpt = torch.load(model_path, map_location="cpu")
+    version = cpt.get("version", "v1")
+    if_f0 = cpt.get("f0", 1)
+    net_g = SYNTHESIZERS[(version, if_f0)](*cpt["config"], is_half=False)
+    net_g.load_state_dict(cpt["weight"], strict=False)
+    # Quantize a copy so the artifact never lands next to the user's checkpoint
+    shutil.copy(model_path, work_dir)
+    return net_g.eval(), str(Path(work_dir) / Path(model_path).name), version, if_f0, cpt["config"][-1]
+
+
+def make_inputs(seconds, version, if_f0, rng):
+    frames = int(seconds * SYNTH_FPS)
+    dim = 256 if version == "v1" else 768
+    inputs = {
+        "phone": torch.from_numpy(rng.standard_normal((1, frames, dim)).astype(np.float32)),
+        "phone_lengths": torch.tensor([frames]),
+        "sid": torch.tensor([0]),
+    }
+    if if_f0:
+        f0 = 120 * 2 ** (np.arange(frames) / frames) * (np.arange(frames) % 200 < 170)
+        f0_mel = 1127 * np.log(1 + f0 / 700)
+        mel_min, mel_max = 1127 * np.log(1 + 50 / 700), 1127 * np.log(1 + 1100 / 700)
+        voiced = f0_mel > 0
+        f0_mel[voiced] = (f0_mel[voiced] - mel_min) * 254 / (mel_max - mel_min) + 1
+        inputs["pitch"] = torch.from_numpy(np.clip(np.rint(f0_mel), 1, 255).astype(np.int64))[None]
+        inputs["nsff0"] = torch.from_numpy(f0.astype(np.float32))[None]
+    return inputs
+
+
+def run(net_g, inputs, repeats):
+    best, audio = float("inf"), None
+    with torch.no_grad():
+        for _ in range(repeats):
+            torch.manual_seed(1234)
+            start = time.perf_counter()
+            audio = net_g.infer(**inputs)[0][0, 0].numpy()
+            best = min(best, time.perf_counter() - start)
+    return best, audio
+
+
+def mel_cepstrum(audio, sr, n_fft=1024, n_mels=80, n_ceps=25):
+    hop = sr // SYNTH_FPS
+    frames = np.lib.stride_tricks.sliding_window_view(audio, n_fft)[::hop] * np.hanning(n_fft)
+    power = np.abs(np.fft.rfft(frames, axis=-1)) ** 2
+
+    # HTK mel filterbank up to Nyquist
+    mel = lambda hz: 2595 * np.log10(1 + hz / 700)
+    edges = 700 * (10 ** (np.linspace(0, mel(sr / 2), n_mels + 2) / 2595) - 1)
+    bins = np.fft.rfftfreq(n_fft, 1 / sr)
+    lower, center, upper = edges[:-2, None], edges[1:-1, None], edges[2:, None]
+    fbank = np.maximum(0, np.minimum((bins - lower) / (center - lower), (upper - bins) / (upper - center)))
+
+    log_mel = np.log(power @ fbank.T + 1e-10)
+    # Orthonormal DCT-II, dropping c0 (energy)
+    n = np.arange(n_mels)
+    dct = np.cos(np.pi / n_mels * (n + 0.5)[None, :] * np.arange(1, n_ceps + 1)[:, None]) * np.sqrt(2 / n_mels)
+    return log_mel @ dct.T
+
+
+def mel_cepstral_distortion(reference, test, sr):
+    length = min(len(reference), len(test))
+    diff = mel_cepstrum(reference[:length], sr) - mel_cepstrum(test[:length], sr)
+    return float(np.mean(10 / np.log(10) * np.sqrt(2 * np.sum(diff ** 2, axis=-1))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", help="RVC .pth checkpoint (default: random v2 40 kHz weights)")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--modules", default=",".join(DEFAULT_QUANTIZED_SUBMODULES))
+    args = parser.parse_args()
+    modules = tuple(m for m in args.modules.split(",") if m)
+
+    torch.set_grad_enabled(False)
+    with tempfile.TemporaryDirectory() as work_dir:
+        net_g, model_path, version, if_f0, sr = load_checkpoint(args.model, work_dir)
+        net_g.remove_weight_norm()
+        rng = np.random.default_rng(0)
+        inputs = make_inputs(args.seconds, version, if_f0, rng)
+        calibration = [make_inputs(4.0, version, if_f0, rng) for _ in range(2)]
+
+        start = time.perf_counter()
+        quantized = quantize_synthesizer(copy.deepcopy(net_g), model_path, calibration, modules)
+        print(f"{version} f0={if_f0} {sr} Hz, {args.seconds:g}s input; quantized {', '.join(modules)} "
+              f"in {time.perf_counter() - start:.1f}s")
+
+        fp32_time, fp32_audio = run(net_g, inputs, args.repeats)
+        int8_time, int8_audio = run(quantized, inputs, args.repeats)
+
+    print(f"fp32 {fp32_time * 1000:9.1f} ms  (RTF {fp32_time / args.seconds:.3f})")
+    print(f"int8 {int8_time * 1000:9.1f} ms  (RTF {int8_time / args.seconds:.3f})  {fp32_time / int8_time:.2f}x")
+    print(f"MCD int8 vs fp32: {mel_cepstral_distortion(fp32_audio, int8_audio, sr):.2f} dB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Live buffering benchmark: queue of chunks vs SampleRingBuffer
+
+A producer thread delivers --chunk sample chunks at real-time pace (like the
+audio device callback) for --seconds; a consumer converts --block-ms blocks
+with a stand-in converter that takes --rtf times the block duration. Two
+consumers are compared:
+
+  queue  chunks in a queue.Queue, concatenated onto a pending array and cut
+         into blocks (the previous live processing loops)
+  ring   SampleRingBuffer: wait for a block, drop input beyond
+         --max-latency, read it into one preallocated array
+
+and the delay between a block's last sample arriving and its conversion
+starting is printed (median, 99th percentile, max), with the most input
+ever waiting and the input dropped to keep up.
+
+Usage: python benchmarks/bench_ring_buffer.py [--seconds 8] [--rtf 0.5 1.3] [--max-latency 1.0]
+"""
+
+import argparse
+import queue
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.rvc_infer.ring_buffer import SampleRingBuffer  # noqa: E402
+
+
+def produce(write, args, arrivals, done):
+    """Deliver chunks at real-time pace, recording when each one arrived"""
+    chunk = np.random.default_rng(0).standard_normal(args.chunk).astype(np.float32) * 0.1
+    period = args.chunk / args.rate
+    start = time.perf_counter()
+    for i in range(int(args.seconds * args.rate / args.chunk)):
+        delay = start + i * period - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        arrivals.append(time.perf_counter())
+        write(chunk)
+    done.set()
+
+
+def delays_of(ends, starts, arrivals, args):
+    """Delay of each block: conversion start minus arrival of the chunk holding its last sample"""
+    return [start - arrivals[(end - 1) // args.chunk] for end, start in zip(ends, starts)]
+
+
+def run_queue(args, rtf, block):
+    buffer, arrivals, done = queue.Queue(), [], threading.Event()
+    producer = threading.Thread(target=produce, args=(buffer.put, args, arrivals, done))
+    producer.start()
+    pending = np.zeros(0, dtype=np.float32)
+    position, ends, starts, backlog = 0, [], [], 0
+    while not (done.is_set() and buffer.empty()):
+        try:
+            chunk = buffer.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        pending = np.concatenate([pending, chunk])
+        backlog = max(backlog, len(pending) + buffer.qsize() * args.chunk)
+        while len(pending) >= block:
+            pending = pending[block:]
+            position += block
+            ends.append(position)
+            starts.append(time.perf_counter())
+            time.sleep(rtf * block / args.rate)
+    producer.join()
+    return delays_of(ends, starts, arrivals, args), backlog, 0
+
+
+def run_ring(args, rtf, block):
+    max_backlog = int(args.max_latency * args.rate)
+    buffer, arrivals, done = SampleRingBuffer(2 * max_backlog), [], threading.Event()
+    producer = threading.Thread(target=produce, args=(buffer.write, args, arrivals, done))
+    producer.start()
+    out = np.empty(block, dtype=np.float32)
+    ends, starts, backlog, dropped = [], [], 0, 0
+    while not (done.is_set() and len(buffer) < block):
+        if not buffer.wait(block, timeout=0.1):
+            continue
+        backlog = max(backlog, len(buffer))
+        dropped += buffer.discard_oldest(max_backlog)
+        buffer.read_into(out)
+        ends.append(buffer._read)
+        starts.append(time.perf_counter())
+        time.sleep(rtf * block / args.rate)
+    producer.join()
+    return delays_of(ends, starts, arrivals, args), backlog, dropped + buffer.overruns
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=8.0, help="audio delivered per run")
+    parser.add_argument("--rate", type=int, default=16000, help="input sample rate")
+    parser.add_argument("--chunk", type=int, default=256, help="samples per device callback")
+    parser.add_argument("--block-ms", type=float, default=250.0, help="converter block (RVC_STREAM_BLOCK_SECONDS)")
+    parser.add_argument("--rtf", type=float, nargs="+", default=[0.5, 1.3], help="conversion time / block duration")
+    parser.add_argument("--max-latency", type=float, default=1.0, help="RVC_LIVE_MAX_BACKLOG_SECONDS")
+    args = parser.parse_args()
+
+    block = int(args.rate * args.block_ms / 1000)
+    print(f"{args.seconds:g}s at {args.rate} Hz in {args.chunk}-sample chunks, {block}-sample blocks")
+    for rtf in args.rtf:
+        for name, run in (("queue", run_queue), ("ring", run_ring)):
+            delays, backlog, dropped = run(args, rtf, block)
+            delays = np.array(delays) * 1000
+            print(
+                f"rtf {rtf:3.1f}  {name:5s}  delay median {np.median(delays):7.1f} ms  "
+                f"p99 {np.percentile(delays, 99):7.1f} ms  max {delays.max():7.1f} ms   "
+                f"max waiting {backlog / args.rate:5.2f} s   dropped {dropped / args.rate:5.2f} s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Scheduling benchmark for the inference executor
+
+Runs synthesizer `infer` calls on a randomly initialised v2 40 kHz model
+through InferenceExecutor in three scenarios and prints per-class latency
+(submit to finish) with plain FIFO order and with the scheduler:
+
+  interactive  --batch long jobs from one user are queued, then
+               --interactive short clips from other users arrive
+  fair share   user A queues 2 x --batch clips of twice the short length,
+               then user B queues two
+  retry-after  the queue is filled to its limit; the Retry-After estimate
+               of the rejected submit is compared with the time it
+               actually took for a place to open
+
+Usage: python benchmarks/bench_scheduler.py [--batch 4] [--batch-seconds 6] [--interactive 3] [--workers 1]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import torch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.rvc_infer.inference_executor import (  # noqa: E402
+    InferenceExecutor, InferenceQueueFull, PRIORITY_BATCH, PRIORITY_INTERACTIVE
+)
+from app.services.rvc_infer.infer_pack.models import SynthesizerTrnMs768NSFsid  # noqa: E402
+
+SYNTH_FPS = 100
+
+# Stock RVC v2 40 kHz configuration
+V2_40K_CONFIG = [
+    1025, 32, 192, 192, 768, 2, 6, 3, 0, "1", [3, 7, 11], [[1, 3, 5], [1, 3, 5], [1, 3, 5]],
+    [10, 10, 2, 2], 512, [16, 16, 4, 4], 109, 256, 40000,
+]
+
+
+def make_job(net_g, seconds):
+    frames = int(seconds * SYNTH_FPS)
+    inputs = {
+        "phone": torch.randn(1, frames, 768),
+        "phone_lengths": torch.tensor([frames]),
+        "pitch": torch.randint(1, 255, (1, frames)),
+        "nsff0": torch.rand(1, frames) * 300 + 80,
+        "sid": torch.tensor([0]),
+    }
+
+    def job():
+        with torch.no_grad():
+            net_g.infer(**inputs)
+
+    return job
+
+
+def timed(job, submitted):
+    """Run a job and return its latency from `submitted`"""
+    job()
+    return time.perf_counter() - submitted
+
+
+def submit(executor, job, seconds, priority, owner):
+    return executor.submit("model", timed, job, time.perf_counter(),
+                           priority=priority, owner=owner, audio_seconds=seconds)
+
+
+def mean(values):
+    return sum(values) / len(values)
+
+
+def interactive_scenario(net_g, args, scheduled):
+    executor = InferenceExecutor(workers=args.workers, max_queue=0, per_model=64)
+    long_job, short_job = make_job(net_g, args.batch_seconds), make_job(net_g, args.interactive_seconds)
+    batch = [submit(executor, long_job, args.batch_seconds, PRIORITY_BATCH, "batch-user") for _ in range(args.batch)]
+    time.sleep(0.2)
+    # Without the scheduler every job is batch work of one owner, i.e. plain FIFO
+    interactive = [
+        submit(
+            executor, short_job, args.interactive_seconds,
+            PRIORITY_INTERACTIVE if scheduled else PRIORITY_BATCH, f"user-{i}" if scheduled else "batch-user"
+        )
+        for i in range(args.interactive)
+    ]
+    latencies = ([f.result() for f in interactive], [f.result() for f in batch])
+    executor.shutdown()
+    return latencies
+
+
+def fair_share_scenario(net_g, args, scheduled):
+    executor = InferenceExecutor(workers=args.workers, max_queue=0, per_model=64)
+    job = make_job(net_g, args.interactive_seconds * 2)
+    seconds = args.interactive_seconds * 2
+    # Without fair share everything is one owner, i.e. plain FIFO
+    user_a = [submit(executor, job, seconds, PRIORITY_BATCH, "a") for _ in range(args.batch * 2)]
+    time.sleep(0.2)
+    user_b = [submit(executor, job, seconds, PRIORITY_BATCH, "b" if scheduled else "a") for _ in range(2)]
+    latencies = ([f.result() for f in user_b], [f.result() for f in user_a])
+    executor.shutdown()
+    return latencies
+
+
+def retry_after_scenario(net_g, args):
+    executor = InferenceExecutor(workers=args.workers, max_queue=3, per_model=64, interactive_reserve=0)
+    job = make_job(net_g, args.interactive_seconds * 2)
+    seconds = args.interactive_seconds * 2
+    # Measure the real-time factor first
+    for _ in range(2):
+        submit(executor, job, seconds, PRIORITY_BATCH, "warm-up").result()
+
+    # One job running, then fill the queue
+    futures = [submit(executor, job, seconds, PRIORITY_BATCH, "user")]
+    time.sleep(0.2)
+    while True:
+        try:
+            futures.append(submit(executor, job, seconds, PRIORITY_BATCH, "user"))
+        except InferenceQueueFull as e:
+            estimate, rejected = e.retry_after, time.perf_counter()
+            break
+    while True:
+        try:
+            executor.admit(PRIORITY_BATCH)
+            break
+        except InferenceQueueFull:
+            time.sleep(0.01)
+    actual = time.perf_counter() - rejected
+    for future in futures:
+        future.result()
+    rtf = executor.stats()["real_time_factor"]
+    executor.shutdown()
+    return estimate, actual, rtf
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch", type=int, default=4, help="long jobs queued first")
+    parser.add_argument("--batch-seconds", type=float, default=6.0, help="audio per long job")
+    parser.add_argument("--interactive", type=int, default=3, help="short clips arriving after them")
+    parser.add_argument("--interactive-seconds", type=float, default=1.0, help="audio per short clip")
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    net_g = SynthesizerTrnMs768NSFsid(*V2_40K_CONFIG, is_half=False).eval()
+    net_g.remove_weight_norm()
+    make_job(net_g, 1.0)()  # warm up allocator and thread pools
+    print(f"{args.workers} workers on {os.cpu_count()} cores")
+
+    for scheduled in (False, True):
+        name = "scheduled" if scheduled else "fifo"
+        short, long = interactive_scenario(net_g, args, scheduled)
+        print(
+            f"interactive  {name:9s}  short clips mean {mean(short):6.2f} s max {max(short):6.2f} s   "
+            f"batch mean {mean(long):6.2f} s max {max(long):6.2f} s"
+        )
+    for scheduled in (False, True):
+        name = "scheduled" if scheduled else "fifo"
+        user_b, user_a = fair_share_scenario(net_g, args, scheduled)
+        print(
+            f"fair share   {name:9s}  user B mean {mean(user_b):6.2f} s   "
+            f"user A mean {mean(user_a):6.2f} s max {max(user_a):6.2f} s"
+        )
+
+    estimate, actual, rtf = retry_after_scenario(net_g, args)
+    print(f"retry-after  estimate {estimate:5.2f} s   actual {actual:5.2f} s   (real-time factor {rtf})")
+
+
+if __name__ == "__main__":
+    main()
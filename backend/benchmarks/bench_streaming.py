@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Time-to-first-audio benchmark for streamed conversion
+
+Converts --seconds of random audio as overlapping segments with synthesizer
+`infer` calls on a randomly initialised v2 40 kHz model, stitching finished
+segments in order the way /api/process/stream does, and prints when the
+first output chunk was ready against the total conversion time:
+
+  whole      no segmentation, output only at the end
+  segmented  --segment second segments (RVC_SEGMENT_SECONDS)
+  streamed   the same with a --first second first segment
+             (RVC_STREAM_FIRST_SEGMENT_SECONDS)
+
+The streamed output is checked against joining all segments at the end.
+
+Usage: python benchmarks/bench_streaming.py [--seconds 40] [--segment 15] [--first 5] [--workers 1]
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import torch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.rvc_infer.segmenter import SegmentStitcher, crossfade_join, fit_length, plan_segments  # noqa: E402
+from app.services.rvc_infer.infer_pack.models import SynthesizerTrnMs768NSFsid  # noqa: E402
+
+SR = 40000
+SYNTH_FPS = 100
+
+# Stock RVC v2 40 kHz configuration
+V2_40K_CONFIG = [
+    1025, 32, 192, 192, 768, 2, 6, 3, 0, "1", [3, 7, 11], [[1, 3, 5], [1, 3, 5], [1, 3, 5]],
+    [10, 10, 2, 2], 512, [16, 16, 4, 4], 109, 256, 40000,
+]
+
+
+def convert(net_g, samples):
+    """Stand-in for segment conversion: one `infer` call sized to the segment"""
+    frames = max(len(samples) * SYNTH_FPS // SR, 1)
+    generator = torch.Generator().manual_seed(len(samples))
+    with torch.no_grad():
+        out = net_g.infer(
+            torch.randn(1, frames, 768, generator=generator), torch.tensor([frames]),
+            torch.randint(1, 255, (1, frames), generator=generator),
+            torch.rand(1, frames, generator=generator) * 300 + 80, torch.tensor([0])
+        )[0]
+    return fit_length(out[0, 0].numpy(), len(samples))
+
+
+def run(net_g, audio, pool, segments):
+    """Convert in order of `segments`; returns (first chunk time, total time, stitched output, pieces)"""
+    start = time.perf_counter()
+    futures = [pool.submit(convert, net_g, audio[s:e]) for s, e in segments]
+    stitcher = SegmentStitcher(segments)
+    first, chunks, pieces = None, [], []
+    for future in futures:
+        pieces.append(future.result())
+        chunks.append(stitcher.push(pieces[-1]))
+        if first is None and len(chunks[-1]):
+            first = time.perf_counter() - start
+    return first, time.perf_counter() - start, np.concatenate(chunks), pieces
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=40.0, help="input length")
+    parser.add_argument("--segment", type=float, default=15.0, help="segment length")
+    parser.add_argument("--first", type=float, default=5.0, help="first segment length when streaming")
+    parser.add_argument("--overlap", type=float, default=0.5)
+    parser.add_argument("--workers", type=int, default=1, help="segment workers")
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    net_g = SynthesizerTrnMs768NSFsid(*V2_40K_CONFIG, is_half=False).eval()
+    net_g.remove_weight_norm()
+    rng = np.random.default_rng(0)
+    # Noise with a slow envelope so the segmenter has quiet points to cut at
+    t = np.arange(int(args.seconds * SR)) / SR
+    audio = (rng.standard_normal(len(t)) * (0.55 + 0.45 * np.sin(2 * np.pi * 0.7 * t)) * 0.1).astype(np.float32)
+    convert(net_g, audio[:SR])  # warm up allocator and thread pools
+    print(f"{args.seconds:g}s input, {args.workers} segment workers on {os.cpu_count()} cores")
+
+    plans = {
+        "whole": [(0, len(audio))],
+        "segmented": plan_segments(audio, SR, args.segment, args.overlap),
+        "streamed": plan_segments(audio, SR, args.segment, args.overlap, first_segment_seconds=args.first),
+    }
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        for name, segments in plans.items():
+            first, total, output, pieces = run(net_g, audio, pool, segments)
+            line = (
+                f"{name:9s}  {len(segments):2d} segments   first audio {first:6.2f} s   "
+                f"total {total:6.2f} s   first/total {first / total:5.1%}"
+            )
+            if len(segments) > 1:
+                error = np.max(np.abs(output - crossfade_join(pieces, segments)))
+                line += f"   max diff vs join {error:.1e}"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
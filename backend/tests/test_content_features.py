@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from app.services.rvc_infer import content_features
+from app.services.rvc_infer.content_features import (
+    CONTENT_HOP, CONTENT_RECEPTIVE_FIELD, CONTENT_SR, ContentFeatureExtractor
+)
+
+
+class FakeContentVec:
+    """ContentVec stand-in with the real front end's frame count; each frame is its first input sample"""
+
+    def __init__(self):
+        self.lengths = []
+
+    def forward_batch(self, batch):
+        self.lengths.append(batch.shape[1])
+        frames = (batch.shape[1] - CONTENT_RECEPTIVE_FIELD) // CONTENT_HOP + 1
+        return batch[:, :frames * CONTENT_HOP:CONTENT_HOP, None]
+
+
+@pytest.fixture
+def extractor(monkeypatch, tmp_path):
+    model = FakeContentVec()
+    extractor = ContentFeatureExtractor(model_dir=str(tmp_path), window_seconds=10.0, context_seconds=0.5)
+    monkeypatch.setitem(content_features._sessions, str(extractor.model_path("v2")), model)
+    return extractor, model
+
+
+@pytest.mark.parametrize("seconds", [0.3, 9.99, 10.0, 10.5, 35.0])
+def test_frames_align_across_windows(extractor, seconds):
+    extractor, _ = extractor
+    # A ramp, so each feature tells which sample its frame starts at
+    audio = np.arange(1, int(seconds * CONTENT_SR) + 1, dtype=np.float32)
+
+    feats = extractor.extract(audio, "v2")
+
+    n_frames = len(audio) // CONTENT_HOP
+    assert feats.shape == (2 * n_frames, 1)
+    np.testing.assert_array_equal(feats[::2, 0], audio[::CONTENT_HOP][:n_frames])
+
+
+def test_short_input_runs_one_window_of_its_length(extractor):
+    extractor, model = extractor
+    audio = np.zeros(int(0.3 * CONTENT_SR), dtype=np.float32)
+
+    extractor.extract(audio, "v2")
+
+    assert model.lengths == [len(audio) + CONTENT_RECEPTIVE_FIELD - CONTENT_HOP]
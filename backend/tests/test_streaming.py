@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+import torch
+
+pytest.importorskip("librosa")
+pytest.importorskip("soundfile")
+
+from app.services.rvc_infer import content_features  # noqa: E402
+from app.services.rvc_infer.content_features import (  # noqa: E402
+    CONTENT_HOP, CONTENT_RECEPTIVE_FIELD, CONTENT_SR, ContentFeatureExtractor
+)
+from app.services.rvc_infer.simple_rvc import SimpleRVCProcessor  # noqa: E402
+from app.services.rvc_infer.streaming import StreamingConverter  # noqa: E402
+
+
+class FakeContentVec:
+    """ContentVec stand-in recording the length of every window it runs"""
+
+    def __init__(self):
+        self.lengths = []
+
+    def forward_batch(self, batch):
+        self.lengths.append(batch.shape[1])
+        frames = (batch.shape[1] - CONTENT_RECEPTIVE_FIELD) // CONTENT_HOP + 1
+        return np.zeros((len(batch), frames, 768), dtype=np.float32)
+
+
+class FakeSynthesizer:
+    def infer(self, phone, phone_lengths, sid, skip_head, return_length, return_length2, **kwargs):
+        return (torch.zeros(1, 1, int(return_length) * 400),)
+
+
+class FakeProcessor:
+    _extract_phone_features = SimpleRVCProcessor._extract_phone_features
+    f0_method = "harvest"
+    index_rate = 0.0
+    device = "cpu"
+
+    def __init__(self, model_dir):
+        self.content_extractor = ContentFeatureExtractor(model_dir=model_dir)
+
+
+@pytest.mark.parametrize("input_sr", [16000, 48000])
+def test_blocks_run_block_sized_content_windows(monkeypatch, tmp_path, input_sr):
+    processor = FakeProcessor(str(tmp_path))
+    model = FakeContentVec()
+    monkeypatch.setattr(ContentFeatureExtractor, "is_available", lambda self, version: True)
+    monkeypatch.setitem(content_features._sessions, str(processor.content_extractor.model_path("v2")), model)
+    converter = StreamingConverter(
+        processor, {"net_g": FakeSynthesizer(), "if_f0": False, "version": "v2", "tgt_sr": 40000},
+        input_sr, block_seconds=0.25, analysis_seconds=0.5
+    )
+
+    converter.push(np.zeros(input_sr * 2, dtype=np.float32))
+
+    # Each block runs ContentVec once on the block and its analysis context only
+    analyzed = (len(converter._analysis_tail) + converter.block_samples) * CONTENT_SR // input_sr
+    assert len(model.lengths) == 2 * input_sr // converter.block_samples
+    assert max(model.lengths) <= analyzed + CONTENT_RECEPTIVE_FIELD
@@ -103,30 +103,30 @@ export default function Dashboard() {
 
       const response = await apiClient.processAudio(uploadedFile, request);
       
-      const pollStatus = async () => {
-        try {
-          const status = await apiClient.getProcessingStatus(response.task_id);
+      apiClient.watchProgress({ tasks: [response.task_id] }, {
+        onTask: async (status) => {
           setProcessingStatus(status);
           
-          if (status.status === "completed" && status.result_file) {
-            const blob = await apiClient.downloadResult(status.result_file);
-            const audioUrl = URL.createObjectURL(blob);
-            setGeneratedAudioUrl(audioUrl);
+          if (status.status === "done" && status.result_file) {
+            try {
+              const blob = await apiClient.downloadResult(status.result_file);
+              const audioUrl = URL.createObjectURL(blob);
+              setGeneratedAudioUrl(audioUrl);
+            } catch (error) {
+              console.error("Download failed:", error);
+              setError("Failed to download the result");
+            }
             setIsProcessing(false);
           } else if (status.status === "failed") {
             setError(status.message);
             setIsProcessing(false);
-          } else {
-            setTimeout(pollStatus, 1000);
           }
-        } catch (error) {
-          console.error("Status check failed:", error);
+        },
+        onError: () => {
           setError("Failed to check processing status");
           setIsProcessing(false);
         }
-      };
-
-      pollStatus();
+      });
       
     } catch (error) {
       console.error("Processing failed:", error);
@@ -228,40 +228,38 @@ export default function VoiceClone() {
         // Set initial status
         setProcessingStatus({
           task_id: response.task_id,
-          status: "processing",
+          status: "queued",
           progress: 0,
           message: "Starting audio generation..."
         });
         
-        const pollStatus = async () => {
-          try {
-            const status = await apiClient.getProcessingStatus(response.task_id);
+        apiClient.watchProgress({ tasks: [response.task_id] }, {
+          onTask: async (status) => {
             setProcessingStatus(status);
+            setGenerationProgress(status.progress);
             
-            // Update progress
-            if (status.progress) {
-              setGenerationProgress(status.progress);
-            } else {
-              // Simulate progress if not provided
-              setGenerationProgress(prev => Math.min(prev + 10, 90));
-            }
-            
-            if (status.status === "completed" && status.result_file) {
+            if (status.status === "done" && status.result_file) {
               setGenerationProgress(100);
               setProcessingStatus({
                 ...status,
                 message: "Audio generation completed! Downloading..."
               });
               
-              // Download the generated audio
-              const blob = await apiClient.downloadResult(status.result_file);
-              const audioUrl = URL.createObjectURL(blob);
-              setGeneratedAudioUrl(audioUrl);
-              
-              setProcessingStatus({
-                ...status,
-                message: "Audio ready for playback!"
-              });
+              try {
+                // Download the generated audio
+                const blob = await apiClient.downloadResult(status.result_file);
+                const audioUrl = URL.createObjectURL(blob);
+                setGeneratedAudioUrl(audioUrl);
+                
+                setProcessingStatus({
+                  ...status,
+                  message: "Audio ready for playback!"
+                });
+              } catch (error) {
+                console.error("Download failed:", error);
+                const errorMessage = error instanceof Error ? error.message : "Unknown error occurred";
+                setError(`Download failed: ${errorMessage}. Please try again.`);
+              }
               
               setIsProcessing(false);
               setIsGenerating(false);
@@ -269,22 +267,14 @@ export default function VoiceClone() {
               setError(status.message || "TTS processing failed. Please try using the Audio Upload mode instead.");
               setIsProcessing(false);
               setIsGenerating(false);
-            } else {
-              // Continue polling
-              setTimeout(pollStatus, 1000);
             }
-          } catch (error) {
-            console.error("Status check failed:", error);
-            // Show the actual error message
-            const errorMessage = error instanceof Error ? error.message : "Unknown error occurred";
-            setError(`Status check failed: ${errorMessage}. Please try again.`);
+          },
+          onError: () => {
+            setError("Lost the connection to the progress stream. Please try again.");
             setIsProcessing(false);
             setIsGenerating(false);
           }
-        };
-
-        // Start polling after a short delay
-        setTimeout(pollStatus, 500);
+        });
       } catch (error) {
         console.error("Text-to-speech processing failed:", error);
         const errorMessage = error instanceof Error ? error.message : "Unknown error occurred";
@@ -312,30 +302,30 @@ export default function VoiceClone() {
 
         const response = await apiClient.processAudio(uploadedFile, request);
         
-        const pollStatus = async () => {
-          try {
-            const status = await apiClient.getProcessingStatus(response.task_id);
+        apiClient.watchProgress({ tasks: [response.task_id] }, {
+          onTask: async (status) => {
             setProcessingStatus(status);
             
-            if (status.status === "completed" && status.result_file) {
-              const blob = await apiClient.downloadResult(status.result_file);
-              const audioUrl = URL.createObjectURL(blob);
-              setGeneratedAudioUrl(audioUrl);
+            if (status.status === "done" && status.result_file) {
+              try {
+                const blob = await apiClient.downloadResult(status.result_file);
+                const audioUrl = URL.createObjectURL(blob);
+                setGeneratedAudioUrl(audioUrl);
+              } catch (error) {
+                console.error("Download failed:", error);
+                setError("Failed to download the result");
+              }
               setIsProcessing(false);
             } else if (status.status === "failed") {
               setError(status.message);
               setIsProcessing(false);
-            } else {
-              setTimeout(pollStatus, 1000);
             }
-          } catch (error) {
-            console.error("Status check failed:", error);
+          },
+          onError: () => {
             setError("Failed to check processing status");
             setIsProcessing(false);
           }
-        };
-
-        pollStatus();
+        });
         
       } catch (error) {
         console.error("Processing failed:", error);
@@ -804,7 +794,7 @@ export default function VoiceClone() {
                   <div className="flex items-center justify-between">
                     <span className="text-white font-medium">Status:</span>
                     <span className={`font-semibold ${
-                      processingStatus.status === 'completed' ? 'text-green-400' :
+                      processingStatus.status === 'done' ? 'text-green-400' :
                       processingStatus.status === 'failed' ? 'text-red-400' :
                       'text-yellow-400'
                     }`}>
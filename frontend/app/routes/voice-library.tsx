@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useCallback } from "react";
+import React, { useState, useEffect, useCallback, useRef } from "react";
 import { motion } from "framer-motion";
 import { Link } from "@remix-run/react";
 import { 
@@ -20,7 +20,7 @@ import {
   CheckCircle
 } from "lucide-react";
 import GlassCard from "~/components/GlassCard";
-import { apiClient, type VoiceModel } from "~/utils/api";
+import { apiClient, type VoiceModel, type DownloadStatus } from "~/utils/api";
 import { useAuth } from "~/contexts/AuthContext";
 import LoadingSpinner from "~/components/LoadingSpinner";
 
@@ -123,55 +123,49 @@ export default function VoiceLibrary() {
     }, 6000);
   }, []);
 
-  // Function to poll download status for models that are downloading
-  const pollDownloadStatus = useCallback(async (modelId: number) => {
-    try {
-      const status = await apiClient.getDownloadStatus(modelId);
-      
-      // Get the model name for notifications
-      const model = voiceModels.find(m => m.id === modelId);
-      const modelName = model?.name || 'Model';
-      
-      // Update the model in the state
-      setVoiceModels(prev => prev.map(model => 
-        model.id === modelId 
-          ? { ...model, ...status }
-          : model
-      ));
-      
-      // If download is complete or failed, remove from downloading set and show notification
-      if (status.is_downloaded) {
-        setDownloadingModels(prev => {
-          const newSet = new Set(prev);
-          newSet.delete(modelId);
-          return newSet;
-        });
+  // Latest models for notifications, without reopening the progress stream on every update
+  const voiceModelsRef = useRef(voiceModels);
+  voiceModelsRef.current = voiceModels;
+
+  // Apply a download progress event from the server
+  const handleDownloadStatus = useCallback((status: DownloadStatus) => {
+    const modelId = status.model_id;
+    
+    // Get the model name for notifications
+    const model = voiceModelsRef.current.find(m => m.id === modelId);
+    const modelName = model?.name || 'Model';
+    
+    // Update the model in the state
+    setVoiceModels(prev => prev.map(model => 
+      model.id === modelId 
+        ? { ...model, ...status }
+        : model
+    ));
+    
+    // If download is complete or failed, remove from downloading set and show notification
+    if (status.status === "done" || status.status === "failed") {
+      setDownloadingModels(prev => {
+        const newSet = new Set(prev);
+        newSet.delete(modelId);
+        return newSet;
+      });
+      if (status.status === "done") {
         addNotification(`${modelName} downloaded successfully!`, 'success');
-      } else if (status.download_error) {
-        setDownloadingModels(prev => {
-          const newSet = new Set(prev);
-          newSet.delete(modelId);
-          return newSet;
-        });
+      } else {
         addNotification(`Failed to download ${modelName}`, 'error');
       }
-    } catch (error) {
-      console.error("Failed to poll download status:", error);
     }
-  }, [voiceModels, addNotification]);
+  }, [addNotification]);
 
-  // Poll download status for models that are currently downloading
+  // Stream download progress for models that are currently downloading (one connection for all of them)
   useEffect(() => {
     if (downloadingModels.size === 0) return;
 
-    const interval = setInterval(() => {
-      downloadingModels.forEach(modelId => {
-        pollDownloadStatus(modelId);
-      });
-    }, 2000); // Poll every 2 seconds
-
-    return () => clearInterval(interval);
-  }, [downloadingModels, pollDownloadStatus]);
+    return apiClient.watchProgress(
+      { downloads: Array.from(downloadingModels) },
+      { onDownload: handleDownloadStatus }
+    );
+  }, [downloadingModels, handleDownloadStatus]);
 
   // Load voice models on component mount - only if authenticated
   useEffect(() => {
@@ -47,12 +47,65 @@ export interface ProcessingRequest {
 
 export interface ProcessingStatus {
   task_id: string;
-  status: "processing" | "completed" | "failed";
+  status: "queued" | "running" | "done" | "failed";
+  stage?: string;
   progress: number;
   message: string;
   result_file?: string;
 }
 
+export interface DownloadStatus {
+  model_id: number;
+  status: "idle" | "downloading" | "done" | "failed";
+  is_downloaded: boolean;
+  download_progress: number;
+  download_error?: string;
+  local_path?: string;
+  index_path?: string;
+}
+
+export interface ProgressHandlers {
+  onTask?: (status: ProcessingStatus) => void;
+  onDownload?: (status: DownloadStatus) => void;
+  onError?: () => void;
+}
+
+export interface LiveFrame {
+  sequence: number;
+  inputSequence: number;
+  serverTime: number;
+  queueMs: number;
+  convertMs: number;
+  samples: Float32Array;
+}
+
+export interface LiveConversionOptions {
+  sampleRate: number;
+  format?: "f32" | "s16";
+  pitchShift?: number;
+  f0Method?: string;
+  token?: string;
+}
+
+export interface LiveConversionHandlers {
+  onReady?: (info: { sample_rate: number; block_samples: number }) => void;
+  onFrame: (frame: LiveFrame) => void;
+  onBusy?: (retryAfter: number) => void;
+  onError?: (message: string) => void;
+  onClose?: () => void;
+}
+
+export interface LiveConversion {
+  send: (samples: Float32Array) => void;
+  flush: () => void;
+  reset: () => void;
+  close: () => void;
+}
+
+// Header of converted live frames: uint32 sequence, uint32 input sequence,
+// float64 server time, float32 queue ms, float32 convert ms (little-endian)
+const LIVE_FRAME_HEADER_BYTES = 24;
+
 export interface Model {
   name: string;
   path: string;
@@ -166,6 +219,96 @@ class ApiClient {
     return this.request<ProcessingStatus>(`/api/status/${taskId}`);
   }
 
+  // Stream task and download progress over one Server-Sent Events connection.
+  // Returns a function that closes the stream; it also closes once everything is done or failed.
+  watchProgress(ids: { tasks?: string[]; downloads?: number[] }, handlers: ProgressHandlers): () => void {
+    const params = new URLSearchParams();
+    if (ids.tasks?.length) params.set("tasks", ids.tasks.join(","));
+    if (ids.downloads?.length) params.set("downloads", ids.downloads.join(","));
+
+    const source = new EventSource(`${this.baseUrl}/api/events?${params}`);
+    source.addEventListener("task", (event) => {
+      handlers.onTask?.(JSON.parse((event as MessageEvent).data));
+    });
+    source.addEventListener("download", (event) => {
+      handlers.onDownload?.(JSON.parse((event as MessageEvent).data));
+    });
+    source.addEventListener("end", () => source.close());
+    source.onerror = () => {
+      // EventSource reconnects by itself unless the server refused the stream
+      if (source.readyState === EventSource.CLOSED) {
+        handlers.onError?.();
+      }
+    };
+
+    return () => source.close();
+  }
+
+  openLiveConversion(
+    modelName: string,
+    options: LiveConversionOptions,
+    handlers: LiveConversionHandlers
+  ): LiveConversion {
+    const format = options.format ?? "f32";
+    const params = new URLSearchParams({
+      model_name: modelName,
+      sample_rate: String(options.sampleRate),
+      format,
+      pitch_shift: String(options.pitchShift ?? 0),
+    });
+    if (options.f0Method) params.set("f0_method", options.f0Method);
+    if (options.token) params.set("token", options.token);
+
+    const socket = new WebSocket(`${this.baseUrl.replace(/^http/, "ws")}/ws/live-convert?${params}`);
+    socket.binaryType = "arraybuffer";
+    socket.onmessage = (event) => {
+      if (typeof event.data === "string") {
+        const message = JSON.parse(event.data);
+        if (message.type === "ready") handlers.onReady?.(message);
+        else if (message.type === "busy") handlers.onBusy?.(message.retry_after);
+        else if (message.type === "error") handlers.onError?.(message.message);
+        return;
+      }
+      const view = new DataView(event.data as ArrayBuffer);
+      const payload = (event.data as ArrayBuffer).slice(LIVE_FRAME_HEADER_BYTES);
+      let samples: Float32Array;
+      if (format === "s16") {
+        const pcm = new Int16Array(payload);
+        samples = new Float32Array(pcm.length);
+        for (let i = 0; i < pcm.length; i++) samples[i] = pcm[i] / 32768;
+      } else {
+        samples = new Float32Array(payload);
+      }
+      handlers.onFrame({
+        sequence: view.getUint32(0, true),
+        inputSequence: view.getUint32(4, true),
+        serverTime: view.getFloat64(8, true),
+        queueMs: view.getFloat32(16, true),
+        convertMs: view.getFloat32(20, true),
+        samples,
+      });
+    };
+    socket.onclose = () => handlers.onClose?.();
+
+    return {
+      send: (samples) => {
+        if (socket.readyState !== WebSocket.OPEN) return;
+        if (format === "s16") {
+          const pcm = new Int16Array(samples.length);
+          for (let i = 0; i < samples.length; i++) {
+            pcm[i] = Math.max(-32768, Math.min(32767, Math.round(samples[i] * 32767)));
+          }
+          socket.send(pcm.buffer);
+        } else {
+          socket.send(samples);
+        }
+      },
+      flush: () => socket.readyState === WebSocket.OPEN && socket.send(JSON.stringify({ type: "flush" })),
+      reset: () => socket.readyState === WebSocket.OPEN && socket.send(JSON.stringify({ type: "reset" })),
+      close: () => socket.close(),
+    };
+  }
+
   async downloadResult(filename: string): Promise<Blob> {
     const response = await fetch(`${this.baseUrl}/api/download/${filename}`);
     